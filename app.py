@@ -1,18 +1,22 @@
 import argparse
-import csv
-import json
 import sys
 from typing import List, Dict, Any
 import time
 import os
+from datetime import datetime
 
-from scrapers.zillow_scraper import ZillowScraper
-from scrapers.realtor_scraper import RealtorScraper
-from scrapers.redfin_scraper import RedfinScraper
+from scrapers.orchestrator import run_search
 from database.db_handler import DatabaseHandler
 from models.property import Property
-from config.settings import DEFAULT_LOCATION, DEFAULT_MIN_PRICE, DEFAULT_MAX_PRICE
-from utils.helpers import format_price, format_address, validate_price_range
+from utils.dedupe import merge_properties
+from utils.exporters import EXPORT_FORMATS, export_filename, write_export
+from utils.columnar import COLUMNAR_FORMATS, write_columnar
+from utils.property_filter import PropertyFilter, SORT_KEYS, filter_properties
+from config.settings import (
+    DEFAULT_LOCATION, DEFAULT_MIN_PRICE, DEFAULT_MAX_PRICE, SEARCH_MAX_PAGES, SEARCH_MAX_RESULTS
+)
+from utils.helpers import format_price, format_address, validate_price_range, search_key
+from utils.single_flight import get_single_flight
 
 def parse_arguments():
     """Parse command-line arguments"""
@@ -25,23 +29,46 @@ def parse_arguments():
                         help=f'Maximum price (default: {DEFAULT_MAX_PRICE})')
     parser.add_argument('--sources', type=str, default='zillow,realtor,redfin',
                         help='Comma-separated list of sources to scrape (default: zillow,realtor,redfin)')
-    parser.add_argument('--export', type=str, choices=['csv', 'json'], 
-                        help='Export results to CSV or JSON file')
+    parser.add_argument('--export', type=str, choices=list(EXPORT_FORMATS) + list(COLUMNAR_FORMATS), 
+                        help='Export results to a CSV, JSON, NDJSON, Parquet or Arrow file')
     parser.add_argument('--output', type=str, default='properties',
                         help='Output filename (without extension)')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Gzip the exported file (CSV, JSON and NDJSON only)')
     parser.add_argument('--filter-beds', type=float, default=None,
                         help='Filter results by minimum number of bedrooms')
     parser.add_argument('--filter-baths', type=float, default=None,
                         help='Filter results by minimum number of bathrooms')
+    parser.add_argument('--filter-min-sqft', type=float, default=None,
+                        help='Filter results by minimum square footage')
+    parser.add_argument('--filter-max-sqft', type=float, default=None,
+                        help='Filter results by maximum square footage')
+    parser.add_argument('--filter-max-price-per-sqft', type=float, default=None,
+                        help='Filter results by maximum price per square foot')
+    parser.add_argument('--filter-min-year', type=int, default=None,
+                        help='Filter results by earliest year built')
+    parser.add_argument('--filter-types', type=str, default=None,
+                        help='Comma-separated property types to keep, e.g. single_family,condo')
+    parser.add_argument('--filter-zips', type=str, default=None,
+                        help='Comma-separated ZIP codes to keep')
+    parser.add_argument('--sort', type=str, choices=SORT_KEYS, default=None,
+                        help='Rank results by this field')
+    parser.add_argument('--descending', action='store_true',
+                        help='Rank results from highest to lowest')
     parser.add_argument('--limit', type=int, default=None,
-                        help='Limit the number of results')
+                        help='Limit the number of results; with --sort, only the top results are kept')
+    parser.add_argument('--max-pages', type=int, default=SEARCH_MAX_PAGES,
+                        help=f'Maximum result pages to crawl per source (default: {SEARCH_MAX_PAGES})')
+    parser.add_argument('--max-results', type=int, default=SEARCH_MAX_RESULTS,
+                        help='Stop crawling a source after this many listings')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Show each home once, even if several sources list it')
     
     return parser.parse_args()
 
-def scrape_properties(location: str, min_price: float, max_price: float, sources: List[str]) -> List[Property]:
+def scrape_properties(location: str, min_price: float, max_price: float, sources: List[str],
+                      max_pages: int = None, max_results: int = None) -> List[Property]:
     """Scrape properties from all specified sources"""
-    all_properties = []
-    
     # Validate price range
     price_range = validate_price_range(min_price, max_price)
     min_price = price_range['min_price']
@@ -50,103 +77,34 @@ def scrape_properties(location: str, min_price: float, max_price: float, sources
     # Initialize the database handler
     db = DatabaseHandler()
     
-    # Scrape from Zillow if specified
-    if 'zillow' in sources:
-        print(f"Scraping Zillow for properties in {location} between {format_price(min_price)} and {format_price(max_price)}...")
-        
-        try:
-            zillow = ZillowScraper()
-            zillow_properties = zillow.search(location, min_price, max_price)
-            
-            print(f"Found {len(zillow_properties)} properties on Zillow")
-            
-            # Save to database
-            for prop in zillow_properties:
-                db.insert_property(prop)
-                
-            all_properties.extend(zillow_properties)
-            
-            # Clean up
-            zillow.close()
-            
-        except Exception as e:
-            print(f"Error scraping Zillow: {e}")
+    # Scrape all sources concurrently, sharing the scrape with any identical search already running
+    key = f"cli:{search_key(location, min_price, max_price, sources)}|{max_pages}|{max_results}"
+    started_at = datetime.now()
+    result, shared = get_single_flight().do(key, run_search, location, min_price, max_price, sources,
+                                            max_pages=max_pages, max_results=max_results)
     
-    # Scrape from Realtor.com if specified
-    if 'realtor' in sources:
-        print(f"Scraping Realtor.com for properties in {location} between {format_price(min_price)} and {format_price(max_price)}...")
-        
-        try:
-            realtor = RealtorScraper()
-            realtor_properties = realtor.search(location, min_price, max_price)
-            
-            print(f"Found {len(realtor_properties)} properties on Realtor.com")
-            
-            # Save to database
-            for prop in realtor_properties:
-                db.insert_property(prop)
-                
-            all_properties.extend(realtor_properties)
-            
-        except Exception as e:
-            print(f"Error scraping Realtor.com: {e}")
+    if shared:
+        print("Reused the results of an identical search that was already running")
+    elif result.sources:
+        print(f"Search finished in {result.elapsed:.1f} seconds")
     
-    # Scrape from Redfin if specified
-    if 'redfin' in sources:
-        print(f"Scraping Redfin for properties in {location} between {format_price(min_price)} and {format_price(max_price)}...")
-        
-        try:
-            redfin = RedfinScraper()
-            redfin_properties = redfin.search(location, min_price, max_price)
-            
-            print(f"Found {len(redfin_properties)} properties on Redfin")
-            
-            # Save to database
-            for prop in redfin_properties:
-                db.insert_property(prop)
-                
-            all_properties.extend(redfin_properties)
-            
-            # Clean up
-            redfin.close()
-            
-        except Exception as e:
-            print(f"Error scraping Redfin: {e}")
+    # Save to database, noting which sources were crawled to the end so the web app can reuse them
+    db.insert_properties(result.properties)
+    for source_result in result.sources.values():
+        if source_result.status == 'ok' and source_result.complete:
+            db.record_scrape(location, min_price, max_price, source_result.source, started_at)
     
-    return all_properties
+    return result.properties
 
-def export_properties(properties: List[Property], format_type: str, filename: str):
+def export_properties(properties: List[Property], format_type: str, filename: str, compress: bool = False):
     """Export properties to the specified format"""
-    if format_type == 'csv':
-        filename = f"{filename}.csv"
-        
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            # Get all possible fields
-            fieldnames = [
-                'id', 'source', 'url', 'address', 'city', 'state', 'zip_code',
-                'price', 'bedrooms', 'bathrooms', 'square_feet', 'lot_size',
-                'year_built', 'property_type', 'description', 'features',
-                'image_urls', 'date_listed', 'date_scraped'
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for prop in properties:
-                writer.writerow(prop.to_dict())
-                
-        print(f"Exported {len(properties)} properties to {filename}")
-        
-    elif format_type == 'json':
-        filename = f"{filename}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as jsonfile:
-            # Convert all properties to dictionaries
-            property_dicts = [prop.to_dict() for prop in properties]
-            
-            json.dump(property_dicts, jsonfile, indent=2)
-                
-        print(f"Exported {len(properties)} properties to {filename}")
+    if format_type in COLUMNAR_FORMATS:
+        path = f"{filename}.{COLUMNAR_FORMATS[format_type][1]}"
+        count = write_columnar(properties, format_type, path)
+    else:
+        path = export_filename(filename, format_type, compress)
+        count = write_export(properties, format_type, path, compress)
+    print(f"Exported {count} properties to {path}")
 
 def display_properties(properties: List[Property], limit: int = None):
     """Display properties in a readable format"""
@@ -174,18 +132,6 @@ def display_properties(properties: List[Property], limit: int = None):
         print(f"URL: {prop.url}")
         print("-" * 80)
 
-def filter_properties(properties: List[Property], min_beds: float = None, min_baths: float = None) -> List[Property]:
-    """Filter properties by criteria"""
-    result = properties
-    
-    if min_beds is not None:
-        result = [p for p in result if p.bedrooms >= min_beds]
-        
-    if min_baths is not None:
-        result = [p for p in result if p.bathrooms >= min_baths]
-    
-    return result
-
 def main():
     """Main entry point"""
     # Parse command-line arguments
@@ -199,22 +145,38 @@ def main():
         location=args.location,
         min_price=args.min_price,
         max_price=args.max_price,
-        sources=sources
+        sources=sources,
+        max_pages=args.max_pages,
+        max_results=args.max_results
     )
     
-    # Apply filters
-    filtered_properties = filter_properties(
-        properties=properties,
+    # Apply filters and ranking
+    criteria = PropertyFilter(
         min_beds=args.filter_beds,
-        min_baths=args.filter_baths
+        min_baths=args.filter_baths,
+        min_sqft=args.filter_min_sqft,
+        max_sqft=args.filter_max_sqft,
+        max_price_per_sqft=args.filter_max_price_per_sqft,
+        min_year_built=args.filter_min_year,
+        property_types=args.filter_types.split(',') if args.filter_types else None,
+        zip_codes=args.filter_zips.split(',') if args.filter_zips else None
     )
+    # Ranking keeps just the top --limit listings, unless merging may still shrink the list
+    top_k = args.limit if args.sort and not args.dedupe else None
+    filtered_properties = filter_properties(properties, criteria, args.sort, args.descending, top_k)
+    
+    # Merge listings of the same home, keeping the most trusted source's details
+    if args.dedupe:
+        merged = merge_properties(filtered_properties)
+        print(f"Merged {len(filtered_properties)} listings into {len(merged)} homes")
+        filtered_properties = [home.primary for home in merged]
     
     # Display properties
     display_properties(filtered_properties, args.limit)
     
     # Export if requested
     if args.export:
-        export_properties(filtered_properties, args.export, args.output)
+        export_properties(filtered_properties, args.export, args.output, args.gzip)
 
 if __name__ == "__main__":
     try:
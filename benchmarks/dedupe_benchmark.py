@@ -0,0 +1,111 @@
+"""Benchmark cross-source deduplication on synthetic listings.
+
+Generates homes, lists each on one to three sources with the address
+spelled the way different sites spell it, then reports how fast the
+resolver merges them and its pairwise precision and recall.
+
+    python benchmarks/dedupe_benchmark.py --homes 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.property import Property
+from utils.address import normalize_address
+from utils.dedupe import merge_properties
+
+STREETS = ['Main', 'Oak', 'Pine', 'Maple', 'Cedar', 'Elm', 'Washington', 'Lake', 'Hill', 'Park',
+           'Sunset', 'Highland', 'Ridge', 'Meadow', 'Forest', 'Willow', 'Spring', 'River', 'Church', 'Mill']
+SUFFIXES = [('Street', 'St'), ('Avenue', 'Ave'), ('Drive', 'Dr'), ('Road', 'Rd'), ('Lane', 'Ln'), ('Court', 'Ct')]
+DIRECTIONS = [('North', 'N'), ('South', 'S'), ('East', 'E'), ('West', 'W')]
+SOURCES = ['zillow', 'realtor', 'redfin']
+
+def make_home(rng: random.Random) -> dict:
+    """Pick a random home; numbers are drawn from a small range so blocks hold several streets"""
+    return {
+        'zip_code': f"{rng.randint(80000, 80999)}",
+        'number': str(rng.randint(1, 400)),
+        'direction': rng.choice(DIRECTIONS) if rng.random() < 0.3 else None,
+        'street': rng.choice(STREETS),
+        'suffix': rng.choice(SUFFIXES),
+        'unit': str(rng.randint(1, 30)) if rng.random() < 0.2 else None,
+    }
+
+def spell_address(home: dict, rng: random.Random) -> str:
+    """Write a home's address the way one of the sites might"""
+    words = [home['number']]
+    if home['direction']:
+        long_form, short_form = home['direction']
+        words.append(rng.choice([long_form, short_form, short_form + '.']))
+    words.append(home['street'] if rng.random() < 0.9 else home['street'].upper())
+
+    long_form, short_form = home['suffix']
+    suffix = rng.choice([long_form, short_form, short_form + '.', None if rng.random() < 0.5 else short_form])
+    if suffix:
+        words.append(suffix)
+
+    address = ' '.join(words)
+    if home['unit']:
+        address += rng.choice([f" #{home['unit']}", f" Apt {home['unit']}", f", Unit {home['unit']}", f" Apt. {home['unit']}"])
+    return address
+
+def generate_listings(homes: int, seed: int):
+    """Return synthetic listings and the index of the home each one belongs to"""
+    rng = random.Random(seed)
+    listings, truth = [], []
+
+    for home_index in range(homes):
+        home = make_home(rng)
+        for source in rng.sample(SOURCES, rng.randint(1, 3)):
+            address = spell_address(home, rng)
+            listings.append(Property(
+                id=f"{source}-{home_index}", source=source, url=f"https://{source}.example/{home_index}",
+                address=address, city='Denver', state='CO', zip_code=home['zip_code'],
+                price=rng.randint(200, 900) * 1000, bedrooms=3, bathrooms=2
+            ))
+            truth.append(home_index)
+
+    # Sites list homes in their own order
+    order = list(range(len(listings)))
+    rng.shuffle(order)
+    return [listings[i] for i in order], [truth[i] for i in order]
+
+def pair_count(sizes) -> int:
+    """Number of pairs within groups of the given sizes"""
+    return sum(n * (n - 1) // 2 for n in sizes)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cross-source deduplication')
+    parser.add_argument('--homes', type=int, default=100000, help='Number of synthetic homes')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    listings, truth = generate_listings(args.homes, args.seed)
+    print(f"Generated {len(listings)} listings of {args.homes} homes")
+
+    normalize_address.cache_clear()
+    start = time.perf_counter()
+    merged = merge_properties(listings)
+    elapsed = time.perf_counter() - start
+
+    predicted = {prop.id: home.canonical_id for home in merged for prop in home.listings}
+    labels = [predicted[prop.id] for prop in listings]
+
+    true_pairs = pair_count(Counter(truth).values())
+    predicted_pairs = pair_count(Counter(labels).values())
+    correct_pairs = pair_count(Counter(zip(truth, labels)).values())
+
+    precision = correct_pairs / predicted_pairs if predicted_pairs else 1.0
+    recall = correct_pairs / true_pairs if true_pairs else 1.0
+
+    print(f"Merged into {len(merged)} homes in {elapsed:.2f}s ({len(listings) / elapsed:,.0f} listings/s)")
+    print(f"Pairwise precision: {precision:.4f}")
+    print(f"Pairwise recall:    {recall:.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark the columnar filter and top-k engine against list comprehensions.
+
+The baseline filters a list of Property objects once per criterion and
+sorts every match; the engine evaluates all criteria over PropertyBatch
+columns and partially selects the top results. Building the columns is
+timed as well: from Property objects, as the CLI does once per search,
+and from stored job results, as a job poll does. Polls used to turn every
+stored row back into a Property first; the job store now decodes rows
+straight into columns and reuses the batch until the job changes.
+
+    python benchmarks/filter_benchmark.py --rows 100000 500000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.property import Property
+from models.property_batch import PropertyBatch
+from utils.property_filter import PropertyFilter, select
+
+PROPERTY_TYPES = ['single_family', 'condo', 'townhouse', 'multi_family', None]
+ZIP_CODES = [f"{80200 + i}" for i in range(40)]
+
+CRITERIA = PropertyFilter(
+    min_price=250000, max_price=900000, min_beds=2, min_baths=1.5,
+    min_sqft=900, max_price_per_sqft=450, min_year_built=1970,
+    property_types=['single_family', 'townhouse'], zip_codes=ZIP_CODES[:20]
+)
+TOP_K = 50
+
+def generate(rows: int, seed: int):
+    """Return synthetic listings with realistic gaps in optional fields"""
+    rng = random.Random(seed)
+    return [
+        Property(
+            id=str(i), source=rng.choice(['zillow', 'realtor', 'redfin']), url='', address=f"{i} Main St",
+            city='Denver', state='CO', zip_code=rng.choice(ZIP_CODES),
+            price=float(rng.randint(100, 1500) * 1000), bedrooms=float(rng.randint(1, 6)),
+            bathrooms=rng.choice([1.0, 1.5, 2.0, 2.5, 3.0]),
+            square_feet=float(rng.randint(500, 4000)) if rng.random() < 0.9 else None,
+            year_built=rng.randint(1900, 2023) if rng.random() < 0.8 else None,
+            property_type=rng.choice(PROPERTY_TYPES)
+        )
+        for i in range(rows)
+    ]
+
+def baseline(properties):
+    """Filter one criterion at a time, then sort everything, as the app used to"""
+    c = CRITERIA
+    result = [p for p in properties if p.price >= c.min_price]
+    result = [p for p in result if p.price <= c.max_price]
+    result = [p for p in result if p.bedrooms >= c.min_beds]
+    result = [p for p in result if p.bathrooms >= c.min_baths]
+    result = [p for p in result if p.square_feet is not None and p.square_feet >= c.min_sqft]
+    result = [p for p in result if p.square_feet and p.price / p.square_feet <= c.max_price_per_sqft]
+    result = [p for p in result if p.year_built is not None and p.year_built >= c.min_year_built]
+    result = [p for p in result if p.property_type in c.property_types]
+    result = [p for p in result if p.zip_code[:5] in c.zip_codes]
+    return sorted(result, key=lambda p: -p.price)[:TOP_K]
+
+def timed(fn, repeat: int = 5) -> float:
+    """Best wall time of several runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the filter and ranking engine')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 500000], help='Result set sizes')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        properties = generate(rows, args.seed)
+        stored = [p.to_dict() for p in properties]
+        batch = PropertyBatch.from_properties(properties)
+
+        expected = [p.id for p in baseline(properties)]
+        actual = [properties[i].id for i in select(batch, CRITERIA, 'price', True, TOP_K)]
+        assert [properties[int(i)].price for i in expected] == [properties[int(i)].price for i in actual]
+
+        list_ms = timed(lambda: baseline(properties))
+        engine_ms = timed(lambda: select(batch, CRITERIA, 'price', True, TOP_K))
+        built_ms = timed(lambda: select(PropertyBatch.from_properties(properties), CRITERIA, 'price', True, TOP_K),
+                         repeat=1)
+        print(f"{rows:>9,} rows: list comprehensions {list_ms:8.1f} ms | engine {engine_ms:7.1f} ms "
+              f"({list_ms / engine_ms:5.1f}x), building the batch first {built_ms:8.1f} ms")
+
+        old_poll_ms = timed(lambda: select(PropertyBatch.from_properties([Property.from_dict(d) for d in stored]),
+                                           CRITERIA, 'price', True, TOP_K), repeat=1)
+        new_poll_ms = timed(lambda: select(PropertyBatch.from_dicts(stored), CRITERIA, 'price', True, TOP_K),
+                            repeat=1)
+        print(f"{'':>15}job poll: via Property objects {old_poll_ms:8.1f} ms | decoded into columns "
+              f"{new_poll_ms:8.1f} ms | batch reused {engine_ms:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
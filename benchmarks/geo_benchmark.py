@@ -0,0 +1,92 @@
+"""Benchmark radius and map-view searches: the R*Tree index against a table scan.
+
+Fills a scratch database with listings scattered around a few metro
+areas, then times map views and radius searches through the R*Tree
+(get_properties(bounds=...) and near=/radius_miles=) and the same boxes
+as latitude/longitude range filters over the whole table.
+
+    python benchmarks/geo_benchmark.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_handler import DatabaseHandler
+from models.property import Property
+
+# Metro centers listings are scattered around, and how far (in degrees)
+METROS = [(39.74, -104.99), (47.61, -122.33), (30.27, -97.74), (33.45, -112.07), (35.23, -80.84)]
+SPREAD = 0.6
+
+# Map views of about 3 x 4 miles and radius searches, around Denver
+MAP_VIEWS = [(39.72, -105.01, 39.765, -104.935), (39.60, -105.10, 39.645, -105.025)]
+RADII = [((39.7392, -104.9903), 1.0), ((39.7392, -104.9903), 5.0)]
+LIMIT = 500
+BATCH_SIZE = 20000
+
+def generate(start: int, count: int, rng: random.Random):
+    """Return synthetic listings with coordinates near one of the metros"""
+    now = datetime.now()
+    properties = []
+    for i in range(start, start + count):
+        lat, lon = rng.choice(METROS)
+        properties.append(Property(
+            id=str(i), source='zillow', url='', address=f"{i} Main St", city='Denver', state='CO',
+            zip_code=f"{80200 + i % 40}", price=float(rng.randint(100, 1500) * 1000),
+            bedrooms=float(rng.randint(1, 6)), bathrooms=2.0, date_scraped=now,
+            latitude=lat + rng.gauss(0, SPREAD / 3), longitude=lon + rng.gauss(0, SPREAD / 3)
+        ))
+    return properties
+
+def timed(fn, repeat: int = 10) -> float:
+    """Best wall time of several runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark spatial searches against table scans')
+    parser.add_argument('--rows', type=int, default=1000000, help='Listings to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseHandler(os.path.join(directory, 'geo.db'))
+
+        start = time.perf_counter()
+        for offset in range(0, args.rows, BATCH_SIZE):
+            db.insert_properties(generate(offset, min(BATCH_SIZE, args.rows - offset), rng))
+        print(f"Loaded {args.rows:,} listings in {time.perf_counter() - start:.1f} s")
+
+        def scan(bounds):
+            with db.pool.connection() as conn:
+                return conn.execute(
+                    'SELECT * FROM properties WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ? LIMIT ?',
+                    (bounds[0], bounds[2], bounds[1], bounds[3], LIMIT)
+                ).fetchall()
+
+        for bounds in MAP_VIEWS:
+            matches = len(db.get_properties(bounds=bounds))
+            index_ms = timed(lambda: db.get_properties(bounds=bounds, limit=LIMIT))
+            page_ms = timed(lambda: db.get_properties_page(bounds=bounds, limit=50))
+            scan_ms = timed(lambda: scan(bounds), repeat=3)
+            print(f"map view {bounds}: {matches:>6,} listings | R*Tree first {LIMIT} {index_ms:6.1f} ms, "
+                  f"cheapest 50 {page_ms:6.1f} ms | range scan {scan_ms:7.1f} ms")
+
+        for center, miles in RADII:
+            matches = len(db.get_properties(near=center, radius_miles=miles))
+            index_ms = timed(lambda: db.get_properties(near=center, radius_miles=miles, limit=50))
+            print(f"{miles:>4} miles of {center}: {matches:>6,} listings | nearest 50 {index_ms:6.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark keyword search over listing descriptions: FTS5 against LIKE scans.
+
+Fills a scratch database with synthetic listings, then times the same
+searches through the full-text index (get_properties(keywords=...)) and
+as LIKE '%...%' scans of the properties table.
+
+    python benchmarks/search_benchmark.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_handler import DatabaseHandler, PROPERTY_COLUMNS
+from models.property import Property
+
+PHRASES = ['updated kitchen', 'hardwood floors', 'quiet street', 'mountain views', 'open floor plan',
+           'walk-in closet', 'large backyard', 'new roof', 'close to schools', 'vaulted ceilings',
+           'finished basement', 'stainless appliances', 'corner lot', 'covered patio', 'fresh paint']
+RARE_PHRASES = ['detached garage', 'wine cellar', 'solar panels', 'guest casita']
+FEATURES = ['Garage', 'Pool', 'Fireplace', 'Central Air', 'Deck', 'Hot tub', 'Workshop']
+
+# Keyword search, equivalent LIKE pattern
+SEARCHES = [
+    ('garage', '%garage%'),
+    ('"finished basement"', '%finished basement%'),
+    ('"wine cellar"', '%wine cellar%'),
+    ('solar*', '%solar%'),
+]
+LIMIT = 50
+BATCH_SIZE = 20000
+
+def generate(start: int, count: int, rng: random.Random):
+    """Return synthetic listings with a few sentences of description each"""
+    now = datetime.now()
+    properties = []
+    for i in range(start, start + count):
+        phrases = rng.sample(PHRASES, 4)
+        if rng.random() < 0.01:
+            phrases.append(rng.choice(RARE_PHRASES))
+        properties.append(Property(
+            id=str(i), source='zillow', url='', address=f"{i} Main St", city='Denver', state='CO',
+            zip_code=f"{80200 + i % 40}", price=float(rng.randint(100, 1500) * 1000),
+            bedrooms=float(rng.randint(1, 6)), bathrooms=2.0,
+            description='. '.join(f"Home has {p}" for p in phrases) + '.',
+            features=rng.sample(FEATURES, 2), date_scraped=now
+        ))
+    return properties
+
+def timed(fn, repeat: int = 5) -> float:
+    """Best wall time of several runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-text search against LIKE scans')
+    parser.add_argument('--rows', type=int, default=1000000, help='Listings to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseHandler(os.path.join(directory, 'search.db'))
+
+        start = time.perf_counter()
+        for offset in range(0, args.rows, BATCH_SIZE):
+            db.insert_properties(generate(offset, min(BATCH_SIZE, args.rows - offset), rng))
+        print(f"Loaded {args.rows:,} listings in {time.perf_counter() - start:.1f} s")
+
+        columns = ', '.join(PROPERTY_COLUMNS)
+        for keywords, pattern in SEARCHES:
+            def like():
+                with db.pool.connection() as conn:
+                    return conn.execute(
+                        f"SELECT {columns} FROM properties WHERE description LIKE ? OR features LIKE ? LIMIT ?",
+                        (pattern, pattern, LIMIT)
+                    ).fetchall()
+
+            def like_count():
+                with db.pool.connection() as conn:
+                    return conn.execute('SELECT COUNT(*) FROM properties WHERE description LIKE ? OR features LIKE ?',
+                                        (pattern, pattern)).fetchone()[0]
+
+            search_ms = timed(lambda: db.get_properties(keywords=keywords, limit=LIMIT))
+            price_ms = timed(lambda: db.get_properties(keywords=keywords, sort='price', limit=LIMIT))
+            like_ms = timed(like)
+            scan_ms = timed(like_count, repeat=1)
+
+            print(f"{keywords:<22} {like_count():>9,} matches | FTS5 top {LIMIT} by rank {search_ms:8.1f} ms, "
+                  f"by price {price_ms:8.1f} ms | LIKE first {LIMIT} {like_ms:7.1f} ms, all {scan_ms:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -9,12 +9,100 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # Database settings
 DATABASE_PATH = os.path.join(BASE_DIR, 'database', 'properties.db')
+DATABASE_POOL_SIZE = 5  # Long-lived connections kept open per database file
+DATABASE_TIMEOUT = 30  # Seconds to wait for a database lock
+LISTING_TOUCH_INTERVAL = 15 * 60  # Seconds before an unchanged listing's date_scraped is refreshed
 
 # Scraper settings
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
 REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 2  # Seconds between requests to avoid rate limiting
 
+# Per-host rate limiting: (requests per second, burst size)
+RATE_LIMIT_DEFAULT = (1.0 / REQUEST_DELAY, 3)
+RATE_LIMITS = {
+    'www.zillow.com': (0.5, 2),
+    'www.realtor.com': (1.0, 3),
+    'www.redfin.com': (1.0, 3),
+}
+RATE_LIMIT_SHARED = os.getenv('RATE_LIMIT_SHARED', '0') == '1'  # Share buckets across worker processes
+RATE_LIMIT_STATE_PATH = os.path.join(BASE_DIR, 'database', 'rate_limits.db')
+RATE_LIMIT_MAX_RETRIES = 2  # Retries after a 429/503 response
+RATE_LIMIT_MAX_WAIT = 60  # Longest Retry-After we will wait out before giving up
+
+# Shared HTTP connection pool settings
+HTTP_POOL_MAXSIZE = 10  # Keep-alive connections kept open per host
+HTTP_MAX_CONNECTIONS = 50  # Connections open at once across all hosts (async client)
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', '1') != '0'  # Negotiate HTTP/2 when h2 is installed
+ASYNC_FETCH_ENABLED = os.getenv('ASYNC_FETCH_ENABLED', '1') != '0'  # Fetch pages with httpx when installed
+
+# HTTP response cache settings
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') != '0'
+HTTP_CACHE_PATH = os.path.join(BASE_DIR, 'database', 'http_cache.db')
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used pages are evicted past this size
+HTTP_CACHE_DEFAULT_TTL = 300  # Seconds a cached page is served without revalidation
+HTTP_CACHE_TTL = {
+    'zillow': 300,
+    'realtor': 600,
+    'redfin': 600,
+}
+
+# Selenium WebDriver pool settings
+SELENIUM_POOL_SIZE = int(os.getenv('SELENIUM_POOL_SIZE', 2))  # Browsers per process
+SELENIUM_PREWARM = int(os.getenv('SELENIUM_PREWARM', 1))  # Browsers started ahead of the first search
+SELENIUM_LEASE_TIMEOUT = 60  # Seconds to wait for a free browser
+SELENIUM_MAX_PAGES = 50  # Pages a browser loads before it is replaced
+SELENIUM_MAX_MEMORY_MB = 512  # JS heap size at which a browser is replaced
+SELENIUM_PAGE_TIMEOUT = 20  # Seconds to wait for search results to render
+SELENIUM_PROBE_INTERVAL = 3600  # Seconds before browser availability is checked again
+CHROME_BINARY_NAMES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+# Search orchestration settings
+SEARCH_TIMEOUT = 90  # Seconds to wait for a source before returning partial results
+SOURCE_TIMEOUTS = {
+    'zillow': SEARCH_TIMEOUT,
+    'realtor': SEARCH_TIMEOUT,
+    'redfin': SEARCH_TIMEOUT,
+}
+
+# Coalescing of identical concurrent searches
+SINGLE_FLIGHT_SHARED = os.getenv('SINGLE_FLIGHT_SHARED', '0') == '1'  # Coalesce across worker processes too
+SINGLE_FLIGHT_LEASE_PATH = os.path.join(BASE_DIR, 'database', 'leases.db')
+SINGLE_FLIGHT_LEASE_TTL = 2 * SEARCH_TIMEOUT  # Seconds before a crashed worker's lease is ignored
+
+# Background scrape job settings
+JOBS_DATABASE_PATH = os.path.join(BASE_DIR, 'database', 'jobs.db')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # Searches scraped at once per process
+JOB_QUEUE_MAX = 100  # Searches waiting for a worker before new ones are rejected
+JOB_RETENTION = 24 * 60 * 60  # Seconds finished jobs and their results are kept
+JOB_EVENT_HEARTBEAT = 15  # Seconds between keep-alive comments on idle event streams
+JOB_BATCH_CACHE_SIZE = 32  # Jobs whose results are kept in memory as columns between polls
+
+# Search results kept for export, keyed by result id
+RESULT_STORE_MAX_ROWS = 100000  # Properties held in memory across all result sets per process
+RESULT_STORE_TTL = 60 * 60  # Seconds a result set can be exported after the search
+RESULT_STORE_SPILL = os.getenv('RESULT_STORE_SPILL', '1') == '1'  # Also keep result sets in SQLite for other workers
+RESULT_STORE_PATH = os.path.join(BASE_DIR, 'database', 'results.db')
+
+# Answer searches from stored listings when a source was scraped recently
+SEARCH_CACHE_MODE = os.getenv('SEARCH_CACHE_MODE', 'auto')  # 'auto', 'refresh' (always scrape) or 'only' (never scrape)
+SEARCH_CACHE_MAX_AGE = 60 * 60  # Seconds stored listings count as fresh
+
+# Cross-source deduplication settings
+DEDUPE_STREET_SIMILARITY = 0.85  # Street name similarity (0-1) at which listings in a block are merged
+SOURCE_PRIORITY = ['zillow', 'redfin', 'realtor']  # Whose details represent a home listed on several sites
+
+# HTML parsing settings
+HTML_PARSER = 'lxml'  # BeautifulSoup tree builder; falls back to html.parser if unavailable
+
+# Read listings from the JSON embedded in static pages before starting a browser
+EMBEDDED_DATA_FIRST = True
+
+# Result pagination settings
+SEARCH_MAX_PAGES = 5  # Result pages crawled per source
+SEARCH_MAX_RESULTS = None  # Stop crawling a source after this many listings (None for no limit)
+PAGE_FETCH_CONCURRENCY = 2  # Pages fetched ahead while earlier pages are parsed
+
 # Default search parameters
 DEFAULT_MIN_PRICE = 0
 DEFAULT_MAX_PRICE = 1000000
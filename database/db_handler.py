@@ -1,22 +1,464 @@
 import sqlite3
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import re
+import queue
+import threading
+import atexit
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from datetime import datetime, timedelta
+import base64
 import json
 
-from config.settings import DATABASE_PATH
+from config.settings import DATABASE_PATH, DATABASE_POOL_SIZE, DATABASE_TIMEOUT, LISTING_TOUCH_INTERVAL
 from models.property import Property
+from utils.address import NormalizedAddress, normalize_address
+from utils.dedupe import EntityResolver
+from utils.geo import Bounds, check_bounds, distance_miles, radius_bounds
+from utils.helpers import normalize_location_part, normalize_search_location, normalize_state
+
+# Column order used for bulk inserts, matching Property.to_dict()
+PROPERTY_COLUMNS = [
+    'id', 'source', 'url', 'address', 'city', 'state', 'zip_code',
+    'price', 'bedrooms', 'bathrooms', 'square_feet', 'lot_size',
+    'year_built', 'property_type', 'description', 'features',
+    'image_urls', 'date_listed', 'date_scraped', 'status', 'canonical_id',
+    'latitude', 'longitude'
+]
+
+# Columns compared on rescrape; a row is only rewritten when one of these changed
+TRACKED_COLUMNS = [c for c in PROPERTY_COLUMNS if c not in ('id', 'date_scraped', 'canonical_id')]
+
+# Columns only some pages report; a rescrape that lacks them never clears a stored value
+KEEP_STORED_COLUMNS = ['status', 'latitude', 'longitude']
+
+# Derived columns maintained alongside PROPERTY_COLUMNS for indexed lookups
+NORMALIZED_COLUMNS = ['city_norm', 'state_norm', 'street_number', 'street_norm', 'unit_norm']
+
+# Columns that get_properties can sort by; rank is the BM25 score of a keyword search, best first,
+# and distance the miles from the center of a radius search
+SORT_COLUMNS = ['price', 'bedrooms', 'bathrooms', 'square_feet', 'date_scraped', 'rank', 'distance']
+
+# Sort columns that support keyset pagination; they must be NOT NULL
+KEYSET_SORT_COLUMNS = ['price', 'date_scraped', 'rank', 'distance']
+
+ZIP_CODE_PATTERN = re.compile(r'^\d{1,5}(?:-\d{0,4})?$')
+
+# A quoted phrase or a single word of a keyword search
+SEARCH_TERM_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+SEARCH_WORD_PATTERN = re.compile(r'\w+')
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Return the smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def _migration_1_location_indexes(conn: sqlite3.Connection):
+    """Add normalized location columns and the indexes used by get_properties"""
+    conn.execute('ALTER TABLE properties ADD COLUMN city_norm TEXT')
+    conn.execute('ALTER TABLE properties ADD COLUMN state_norm TEXT')
+
+    rows = conn.execute('SELECT id, city, state FROM properties').fetchall()
+    conn.executemany(
+        'UPDATE properties SET city_norm = ?, state_norm = ? WHERE id = ?',
+        [(normalize_location_part(row['city']), normalize_state(row['state']), row['id']) for row in rows]
+    )
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_city ON properties(city_norm, state_norm, price)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_state ON properties(state_norm, price)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_zip ON properties(zip_code, price)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_price ON properties(price, bedrooms, bathrooms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_rooms ON properties(bedrooms, bathrooms, price)')
+
+def _migration_2_keyset_indexes(conn: sqlite3.Connection):
+    """Add indexes that serve keyset pagination on (price, id) and (date_scraped, id)"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_price_id ON properties(price, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_date_scraped_id ON properties(date_scraped, id)')
+
+def _migration_3_listing_events(conn: sqlite3.Connection):
+    """Add listing status and a log of new listings, price changes and status changes"""
+    conn.execute('ALTER TABLE properties ADD COLUMN status TEXT')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS listing_events (
+        id INTEGER PRIMARY KEY,
+        property_id TEXT NOT NULL,
+        event TEXT NOT NULL,
+        old_price REAL,
+        new_price REAL,
+        old_status TEXT,
+        new_status TEXT,
+        occurred_at TEXT NOT NULL
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_listing_events_event ON listing_events(event, occurred_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_listing_events_property ON listing_events(property_id, occurred_at)')
+
+    # Triggers keep the log complete whichever code path writes the row
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_listed AFTER INSERT ON properties
+    BEGIN
+        INSERT INTO listing_events (property_id, event, new_price, new_status, occurred_at)
+        VALUES (new.id, 'listed', new.price, new.status, new.date_scraped);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_price_change AFTER UPDATE OF price ON properties
+    WHEN old.price IS NOT new.price
+    BEGIN
+        INSERT INTO listing_events (property_id, event, old_price, new_price, occurred_at)
+        VALUES (new.id, 'price_change', old.price, new.price, new.date_scraped);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_status_change AFTER UPDATE OF status ON properties
+    WHEN old.status IS NOT new.status
+    BEGIN
+        INSERT INTO listing_events (property_id, event, old_status, new_status, occurred_at)
+        VALUES (new.id, 'status_change', old.status, new.status, new.date_scraped);
+    END
+    ''')
+
+def _migration_4_canonical_ids(conn: sqlite3.Connection):
+    """Add normalized address columns and link listings of the same home across sources"""
+    conn.execute('ALTER TABLE properties ADD COLUMN canonical_id TEXT')
+    conn.execute('ALTER TABLE properties ADD COLUMN street_number TEXT')
+    conn.execute('ALTER TABLE properties ADD COLUMN street_norm TEXT')
+    conn.execute('ALTER TABLE properties ADD COLUMN unit_norm TEXT')
+
+    # Oldest listings first, so each home keeps the id derived from its first address
+    resolver = EntityResolver()
+    updates = []
+    for row in conn.execute('SELECT id, address, zip_code FROM properties ORDER BY date_scraped, id'):
+        address = normalize_address(row['address'])
+        canonical_id = resolver.resolve_address(row['zip_code'], address) or row['id']
+        updates.append((canonical_id, address.number, address.street, address.unit, row['id']))
+
+    conn.executemany(
+        'UPDATE properties SET canonical_id = ?, street_number = ?, street_norm = ?, unit_norm = ? WHERE id = ?',
+        updates
+    )
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_address ON properties(street_number, zip_code)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_properties_canonical ON properties(canonical_id)')
+
+def _migration_5_full_text_search(conn: sqlite3.Connection):
+    """Index descriptions and features for keyword search, kept in sync by triggers"""
+    # External content: the index stores only tokens and reads the text back from properties by rowid
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5(
+        description, features, content='properties', tokenize='porter unicode61'
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_fts_insert AFTER INSERT ON properties
+    BEGIN
+        INSERT INTO properties_fts (rowid, description, features)
+        VALUES (new.rowid, new.description, new.features);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_fts_delete AFTER DELETE ON properties
+    BEGIN
+        INSERT INTO properties_fts (properties_fts, rowid, description, features)
+        VALUES ('delete', old.rowid, old.description, old.features);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_fts_update AFTER UPDATE OF description, features ON properties
+    WHEN old.description IS NOT new.description OR old.features IS NOT new.features
+    BEGIN
+        INSERT INTO properties_fts (properties_fts, rowid, description, features)
+        VALUES ('delete', old.rowid, old.description, old.features);
+        INSERT INTO properties_fts (rowid, description, features)
+        VALUES (new.rowid, new.description, new.features);
+    END
+    ''')
+
+    conn.execute("INSERT INTO properties_fts (properties_fts) VALUES ('rebuild')")
+
+def _migration_6_coordinates(conn: sqlite3.Connection):
+    """Add coordinates and an R*Tree index for radius and map-view searches, kept in sync by triggers"""
+    conn.execute('ALTER TABLE properties ADD COLUMN latitude REAL')
+    conn.execute('ALTER TABLE properties ADD COLUMN longitude REAL')
+
+    # Each listing is a zero-size box keyed by its properties rowid; listings without coordinates are left out
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS properties_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon)
+    ''')
+
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_geo_insert AFTER INSERT ON properties
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+    BEGIN
+        INSERT INTO properties_geo VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_geo_delete AFTER DELETE ON properties
+    BEGIN
+        DELETE FROM properties_geo WHERE id = old.rowid;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_geo_update AFTER UPDATE OF latitude, longitude ON properties
+    WHEN old.latitude IS NOT new.latitude OR old.longitude IS NOT new.longitude
+    BEGIN
+        DELETE FROM properties_geo WHERE id = old.rowid;
+        INSERT INTO properties_geo
+        SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    ''')
+
+def _migration_7_prefix_search(conn: sqlite3.Connection):
+    """Index descriptions and features unstemmed, for prefix searches, kept in sync by triggers"""
+    # The porter index stores 'renovated' as 'renov', so a prefix like 'renovat*' would never match there
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS properties_prefix_fts USING fts5(
+        description, features, content='properties', tokenize='unicode61'
+    )
+    ''')
+
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_prefix_fts_insert AFTER INSERT ON properties
+    BEGIN
+        INSERT INTO properties_prefix_fts (rowid, description, features)
+        VALUES (new.rowid, new.description, new.features);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_prefix_fts_delete AFTER DELETE ON properties
+    BEGIN
+        INSERT INTO properties_prefix_fts (properties_prefix_fts, rowid, description, features)
+        VALUES ('delete', old.rowid, old.description, old.features);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS properties_prefix_fts_update AFTER UPDATE OF description, features ON properties
+    WHEN old.description IS NOT new.description OR old.features IS NOT new.features
+    BEGIN
+        INSERT INTO properties_prefix_fts (properties_prefix_fts, rowid, description, features)
+        VALUES ('delete', old.rowid, old.description, old.features);
+        INSERT INTO properties_prefix_fts (rowid, description, features)
+        VALUES (new.rowid, new.description, new.features);
+    END
+    ''')
+
+    conn.execute("INSERT INTO properties_prefix_fts (properties_prefix_fts) VALUES ('rebuild')")
+
+def _migration_8_scrape_coverage(conn: sqlite3.Connection):
+    """Record which searches each source was scraped to the end for, so freshness doesn't hinge on date_scraped"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS scrapes (
+        location TEXT NOT NULL,
+        source TEXT NOT NULL,
+        min_price REAL NOT NULL,
+        max_price REAL NOT NULL,
+        started_at TEXT NOT NULL,
+        completed_at TEXT NOT NULL
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_scrapes_location ON scrapes(location, source, started_at)')
+
+def _migration_9_stable_listing_keys(conn: sqlite3.Connection):
+    """Give properties an INTEGER PRIMARY KEY, so VACUUM can't renumber the rowids its indexes point at"""
+    # The full-text and R*Tree indexes are keyed by rowid, which VACUUM may reassign unless it's declared
+    # as a column; SQLite can't add one in place, so the table is rebuilt keeping its rowids
+    definitions = ['listing_key INTEGER PRIMARY KEY']
+    columns = []
+    for column in conn.execute('PRAGMA table_info(properties)').fetchall():
+        definition = f"{column['name']} {column['type']}"
+        if column['pk']:
+            definition += ' NOT NULL UNIQUE'
+        elif column['notnull']:
+            definition += ' NOT NULL'
+        if column['dflt_value'] is not None:
+            definition += f" DEFAULT {column['dflt_value']}"
+        definitions.append(definition)
+        columns.append(column['name'])
+
+    # Indexes and triggers are dropped with the old table and recreated on the new one
+    schema = [row['sql'] for row in conn.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = 'properties' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''')]
+
+    column_list = ', '.join(columns)
+    conn.execute(f"CREATE TABLE properties_rebuilt ({', '.join(definitions)})")
+    conn.execute(f'''
+    INSERT INTO properties_rebuilt (listing_key, {column_list}) SELECT rowid, {column_list} FROM properties
+    ''')
+    conn.execute('DROP TABLE properties')
+    conn.execute('ALTER TABLE properties_rebuilt RENAME TO properties')
+    for sql in schema:
+        conn.execute(sql)
+
+    # Re-key the indexes in case a VACUUM already moved rows
+    conn.execute("INSERT INTO properties_fts (properties_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO properties_prefix_fts (properties_prefix_fts) VALUES ('rebuild')")
+    conn.execute('DELETE FROM properties_geo')
+    conn.execute('''
+    INSERT INTO properties_geo
+    SELECT listing_key, latitude, latitude, longitude, longitude FROM properties
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    ''')
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    _migration_1_location_indexes,
+    _migration_2_keyset_indexes,
+    _migration_3_listing_events,
+    _migration_4_canonical_ids,
+    _migration_5_full_text_search,
+    _migration_6_coordinates,
+    _migration_7_prefix_search,
+    _migration_8_scrape_coverage,
+    _migration_9_stable_listing_keys,
+]
+
+def search_expressions(keywords: str) -> Tuple[str, str]:
+    """Turn a keyword search into FTS5 queries for its whole words and for its prefixes.
+    
+    Every word must appear, text in double quotes must appear as a phrase,
+    and a word ending in * matches any word starting with it, so
+    'garage "finished basement" renovat*' finds listings mentioning all
+    three. Words and phrases are matched against the stemmed index, so
+    'garage' also finds 'garages'; prefixes against the unstemmed one.
+    Either query is empty if the search has no terms of that kind.
+    Operators and punctuation are matched as plain text.
+    """
+    words, prefixes = [], []
+    for phrase, word in SEARCH_TERM_PATTERN.findall(keywords or ''):
+        tokens = SEARCH_WORD_PATTERN.findall(phrase or word)
+        if tokens:
+            if word.endswith('*'):
+                prefixes.append(f'"{" ".join(tokens)}"*')
+            else:
+                words.append(f'"{" ".join(tokens)}"')
+    
+    if not words and not prefixes:
+        raise ValueError(f"No words to search for in: {keywords!r}")
+    return ' '.join(words), ' '.join(prefixes)
+
+def encode_cursor(sort_value: Any, property_id: str) -> str:
+    """Encode the last row of a page as an opaque pagination cursor"""
+    raw = json.dumps([sort_value, property_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        sort_value, property_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return sort_value, property_id
+
+class ConnectionPool:
+    """A pool of long-lived SQLite connections to a single database file"""
+
+    def __init__(self, db_path: str, size: int = DATABASE_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for concurrent readers and one writer"""
+        conn = sqlite3.connect(self.db_path, timeout=DATABASE_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.create_function('distance_miles', 4, distance_miles, deterministic=True)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one if the pool isn't full"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                conn = self._connect()
+                self._created += 1
+                self._connections.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=DATABASE_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Connection pool exhausted: no connection free after {DATABASE_TIMEOUT} s")
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, discarding any open transaction"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Lease a connection for the duration of a with block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close every connection opened by this pool"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._created = 0
+            self._idle = queue.LifoQueue()
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_initialized_paths = set()
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Return the process-wide connection pool for a database file"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[db_path] = pool
+        return pool
+
+@atexit.register
+def close_pools():
+    """Close all pooled connections"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
 
 class DatabaseHandler:
-    def __init__(self):
-        self.db_path = DATABASE_PATH
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DATABASE_PATH
+        self.pool = get_pool(self.db_path)
         self._ensure_db_exists()
         
     def _ensure_db_exists(self):
         """Create the database and tables if they don't exist"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        if self.db_path in _initialized_paths:
+            return
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
+        with self.pool.connection() as conn:
+            self._create_schema(conn)
+            self._migrate(conn)
+        
+        _initialized_paths.add(self.db_path)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Create the tables used by the application"""
         cursor = conn.cursor()
         
         # Create properties table
@@ -45,85 +487,534 @@ class DatabaseHandler:
         ''')
         
         conn.commit()
-        conn.close()
+    
+    def _migrate(self, conn: sqlite3.Connection):
+        """Apply any schema migrations this database hasn't seen yet"""
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= len(MIGRATIONS):
+            return
+        
+        # Take the write lock first so concurrent processes migrate only once
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {target}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
     
     def insert_property(self, property_data: Property) -> bool:
         """Insert a new property or update if it already exists"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.insert_properties([property_data]) == 1
+    
+    def insert_properties(self, properties: Iterable[Property]) -> int:
+        """Insert new properties and update changed ones in a single transaction.
         
-        data = property_data.to_dict()
+        Rows whose tracked columns are unchanged are left alone, apart from
+        refreshing date_scraped once it is LISTING_TOUCH_INTERVAL old, so a
+        rescrape of mostly unchanged listings writes almost nothing. A
+        missing status or coordinates never overwrite stored ones. Price and
+        status changes are logged to listing_events by triggers.
         
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['?' for _ in data.keys()])
-        values = tuple(data.values())
+        Each property's canonical_id is set to that of any stored or incoming
+        listing of the same home, so the same house found on several sites
+        can be shown once. A stored canonical_id is never changed.
         
-        try:
-            cursor.execute(f'''
-            INSERT OR REPLACE INTO properties ({columns})
-            VALUES ({placeholders})
-            ''', values)
+        Returns the number of properties processed, or 0 if the batch failed.
+        """
+        properties = list(properties)
+        if not properties:
+            return 0
+        
+        insert_columns = PROPERTY_COLUMNS + NORMALIZED_COLUMNS
+        columns = ', '.join(insert_columns)
+        placeholders = ', '.join(['?' for _ in insert_columns])
+        touch_before = (datetime.now() - timedelta(seconds=LISTING_TOUCH_INTERVAL)).isoformat()
+        
+        updates = ', '.join(
+            f"{column} = COALESCE(excluded.{column}, {column})" if column in KEEP_STORED_COLUMNS
+            else f"{column} = COALESCE({column}, excluded.{column})" if column == 'canonical_id'
+            else f"{column} = excluded.{column}"
+            for column in insert_columns if column != 'id'
+        )
+        changed = ' OR '.join(
+            f"(excluded.{column} IS NOT NULL AND excluded.{column} IS NOT {column})" if column in KEEP_STORED_COLUMNS
+            else f"excluded.{column} IS NOT {column}"
+            for column in TRACKED_COLUMNS
+        )
+        
+        with self.pool.connection() as conn:
+            try:
+                # Hold the write lock while resolving so concurrent writers agree on canonical ids
+                conn.execute('BEGIN IMMEDIATE')
+                self._resolve_canonical_ids(conn, properties)
+                rows = [self._property_params(prop) + (touch_before,) for prop in properties]
+                
+                conn.executemany(f'''
+                INSERT INTO properties ({columns})
+                VALUES ({placeholders})
+                ON CONFLICT(id) DO UPDATE SET {updates}
+                WHERE {changed} OR date_scraped < ?
+                ''', rows)
+                
+                conn.commit()
+                return len(rows)
+            except Exception as e:
+                print(f"Error inserting properties: {e}")
+                conn.rollback()
+                return 0
+    
+    def _resolve_canonical_ids(self, conn: sqlite3.Connection, properties: List[Property]):
+        """Set canonical_id on each property, matching against stored listings at the same address"""
+        resolver = EntityResolver()
+        seen_blocks = set()
+        
+        for prop in properties:
+            address = normalize_address(prop.address)
+            zip5 = (prop.zip_code or '')[:5]
+            block = (address.number, zip5)
             
-            conn.commit()
-            result = True
-        except Exception as e:
-            print(f"Error inserting property: {e}")
-            conn.rollback()
-            result = False
-        finally:
-            conn.close()
+            if address.number and zip5 and block not in seen_blocks:
+                seen_blocks.add(block)
+                stored = conn.execute('''
+                SELECT zip_code, street_number, street_norm, unit_norm, canonical_id FROM properties
+                WHERE street_number = ? AND zip_code >= ? AND zip_code < ? AND canonical_id IS NOT NULL
+                ORDER BY date_scraped, id
+                ''', (address.number, zip5, _prefix_upper_bound(zip5))).fetchall()
+                
+                for row in stored:
+                    stored_address = NormalizedAddress(row['street_number'], row['street_norm'], row['unit_norm'])
+                    resolver.add_known(row['zip_code'], stored_address, row['canonical_id'])
             
-        return result
+            prop.canonical_id = resolver.resolve(prop)
+    
+    def _property_params(self, property_data: Property) -> tuple:
+        """Convert a property into a parameter tuple matching the insert columns"""
+        data = property_data.to_dict()
+        values = [data[column] for column in PROPERTY_COLUMNS]
+        address = normalize_address(property_data.address)
+        values.append(normalize_location_part(property_data.city))
+        values.append(normalize_state(property_data.state))
+        values.extend([address.number, address.street, address.unit])
+        return tuple(values)
+    
+    def _location_filter(self, location: str) -> tuple:
+        """Turn a free-form location into an index-friendly WHERE clause.
+        
+        "Denver, CO" becomes an exact city/state match, a ZIP code (or its
+        prefix) a range on zip_code, a bare state a state match, and anything
+        else a prefix match on the normalized city.
+        """
+        parts = [p.strip() for p in location.split(',') if p.strip()]
+        if not parts:
+            return "", []
+        
+        # A trailing ZIP code is the most selective part of the location
+        last_words = parts[-1].split()
+        if last_words and ZIP_CODE_PATTERN.match(last_words[-1]):
+            zip_code = last_words[-1]
+            if len(zip_code) >= 5:
+                return "zip_code >= ? AND zip_code < ?", [zip_code[:5], _prefix_upper_bound(zip_code[:5])]
+            return "zip_code >= ? AND zip_code < ?", [zip_code, _prefix_upper_bound(zip_code)]
+        
+        if len(parts) >= 2:
+            # "City, ST" or "City, State"
+            city = normalize_location_part(parts[0])
+            state = normalize_state(parts[1])
+            return "city_norm = ? AND state_norm = ?", [city, state]
+        
+        text = normalize_location_part(parts[0])
+        city_clause = "city_norm >= ? AND city_norm < ?"
+        city_params = [text, _prefix_upper_bound(text)]
+        
+        state = normalize_state(text)
+        if len(state) == 2:
+            return f"(state_norm = ? OR ({city_clause}))", [state] + city_params
+        
+        return city_clause, city_params
+    
+    def _bounds_filter(self, bounds: Bounds) -> tuple:
+        """Turn a (south, west, north, east) box into a WHERE clause served by the R*Tree index.
+        
+        The R*Tree stores coordinates as 32-bit floats rounded outwards, so
+        it only finds the candidates and the stored coordinates decide.
+        """
+        check_bounds(bounds)
+        south, west, north, east = bounds
+        
+        if west <= east:
+            box_clause = "max_lon >= ? AND min_lon <= ?"
+            longitude_clause = "longitude >= ? AND longitude <= ?"
+        else:
+            # The box crosses the 180th meridian
+            box_clause = "(max_lon >= ? OR min_lon <= ?)"
+            longitude_clause = "(longitude >= ? OR longitude <= ?)"
+        
+        clause = ("properties.listing_key IN "
+                  f"(SELECT id FROM properties_geo WHERE max_lat >= ? AND min_lat <= ? AND {box_clause})"
+                  f" AND latitude >= ? AND latitude <= ? AND {longitude_clause}")
+        return clause, [south, north, west, east] * 2
+    
+    def _keyword_join(self, keywords: str) -> tuple:
+        """Turn a keyword search into a JOIN on the full-text indexes that adds each match's BM25 rank"""
+        words, prefixes = search_expressions(keywords)
+        
+        # Whole words rank the results when there are any; prefixes then only narrow them down
+        index = 'properties_fts' if words else 'properties_prefix_fts'
+        join = f'''JOIN (
+                SELECT rowid AS match_rowid, bm25({index}) AS rank
+                FROM {index} WHERE {index} MATCH ?
+            ) ON match_rowid = properties.listing_key'''
+        params = [words or prefixes]
+        if words and prefixes:
+            join += (" AND properties.listing_key IN "
+                     "(SELECT rowid FROM properties_prefix_fts WHERE properties_prefix_fts MATCH ?)")
+            params.append(prefixes)
+        return join, params
+    
+    def _radius_filter(self, near: Tuple[float, float], radius_miles: float) -> tuple:
+        """Turn a radius search into a WHERE clause on the distance column, served by the R*Tree index"""
+        clause, params = self._bounds_filter(radius_bounds(near[0], near[1], radius_miles))
+        return f"{clause} AND distance <= ?", params + [radius_miles]
+    
+    def _listing_filters(self,
+                         location: Optional[str],
+                         min_price: Optional[float],
+                         max_price: Optional[float],
+                         min_beds: Optional[float],
+                         min_baths: Optional[float],
+                         sources: Optional[List[str]],
+                         scraped_since: Optional[datetime]) -> List[tuple]:
+        """Turn location, price, room, source and freshness criteria into (clause, params) pairs"""
+        filters = []
+        
+        if location:
+            clause, location_params = self._location_filter(location)
+            if clause:
+                filters.append((clause, location_params))
+        
+        for clause, value in (("price >= ?", min_price), ("price <= ?", max_price),
+                              ("bedrooms >= ?", min_beds), ("bathrooms >= ?", min_baths)):
+            if value is not None:
+                filters.append((clause, [value]))
+        
+        if sources is not None:
+            filters.append((f"source IN ({', '.join(['?' for _ in sources])})", list(sources)))
+        
+        if scraped_since is not None:
+            filters.append(("date_scraped >= ?", [scraped_since.isoformat()]))
+        
+        return filters
+    
+    def _keyset_filter(self, sort: Optional[str], descending: bool, after: Tuple[Any, str]) -> tuple:
+        """Turn a (sort_value, id) cursor into a WHERE clause that starts just past that row"""
+        if sort not in KEYSET_SORT_COLUMNS:
+            raise ValueError(f"Unsupported pagination sort column: {sort}")
+        return f"({sort}, id) {'<' if descending else '>'} (?, ?)", list(after)
+    
+    def _build_query(self,
+                     location: Optional[str] = None,
+                     min_price: Optional[float] = None,
+                     max_price: Optional[float] = None,
+                     min_beds: Optional[float] = None,
+                     min_baths: Optional[float] = None,
+                     sort: Optional[str] = None,
+                     descending: bool = False,
+                     limit: Optional[int] = None,
+                     after: Optional[Tuple[Any, str]] = None,
+                     sources: Optional[List[str]] = None,
+                     scraped_since: Optional[datetime] = None,
+                     keywords: Optional[str] = None,
+                     near: Optional[Tuple[float, float]] = None,
+                     radius_miles: Optional[float] = None,
+                     bounds: Optional[Bounds] = None) -> tuple:
+        """Build the SELECT statement and parameters for a property search.
+        
+        Results are ordered by the sort column with id as a tiebreaker, and
+        after=(sort_value, id) starts the results just past that row.
+        sources and scraped_since restrict the results to listings that the
+        given sites returned recently.
+        
+        keywords restricts the results to listings whose description or
+        features match (see search_expressions), looked up in the full-text
+        indexes; each row then has a BM25 rank, and results are ordered by it
+        unless another sort is given.
+        
+        near=(latitude, longitude) with radius_miles keeps listings within
+        that many miles, and bounds=(south, west, north, east) those inside
+        a map view, both looked up in the R*Tree index. A radius search adds
+        each row's distance in miles and is nearest first unless sorted
+        otherwise.
+        """
+        columns = ', '.join(PROPERTY_COLUMNS)
+        tables = 'properties'
+        params = []
+        
+        if (near is None) != (radius_miles is None):
+            raise ValueError("near and radius_miles must be given together")
+        if near is not None:
+            columns += ", distance_miles(latitude, longitude, ?, ?) AS distance"
+            params.extend(near)
+        elif sort == 'distance':
+            raise ValueError("Sorting by distance requires a radius search")
+        
+        if keywords is not None:
+            join, join_params = self._keyword_join(keywords)
+            columns += ", rank"
+            tables += f" {join}"
+            params.extend(join_params)
+            sort = sort or 'rank'
+        elif sort == 'rank':
+            raise ValueError("Sorting by rank requires keywords")
+        
+        # (clause, params) pairs, ANDed together in this order
+        filters = []
+        if near is not None:
+            filters.append(self._radius_filter(near, radius_miles))
+            sort = sort or 'distance'
+        if bounds is not None:
+            filters.append(self._bounds_filter(bounds))
+        filters.extend(self._listing_filters(location, min_price, max_price, min_beds, min_baths,
+                                             sources, scraped_since))
+        if after is not None:
+            filters.append(self._keyset_filter(sort, descending, after))
+        
+        query = f"SELECT {columns} FROM {tables} WHERE 1=1"
+        for clause, clause_params in filters:
+            query += f" AND {clause}"
+            params.extend(clause_params)
+        
+        if sort:
+            if sort not in SORT_COLUMNS:
+                raise ValueError(f"Unsupported sort column: {sort}")
+            direction = 'DESC' if descending else 'ASC'
+            query += f" ORDER BY {sort} {direction}, id {direction}"
+        
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        
+        return query, params
+    
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a database row into a property dictionary"""
+        data = dict(row)
+        
+        # Convert string lists back to actual lists
+        if data['features']:
+            data['features'] = data['features'].split(',')
+        
+        if data['image_urls']:
+            data['image_urls'] = data['image_urls'].split(',')
+        
+        return data
     
     def get_properties(self, 
                       location: Optional[str] = None, 
                       min_price: Optional[float] = None, 
                       max_price: Optional[float] = None, 
                       min_beds: Optional[float] = None,
-                      min_baths: Optional[float] = None) -> List[Dict[str, Any]]:
-        """Retrieve properties with optional filters"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+                      min_baths: Optional[float] = None,
+                      sort: Optional[str] = None,
+                      descending: bool = False,
+                      limit: Optional[int] = None,
+                      sources: Optional[List[str]] = None,
+                      scraped_since: Optional[datetime] = None,
+                      keywords: Optional[str] = None,
+                      near: Optional[Tuple[float, float]] = None,
+                      radius_miles: Optional[float] = None,
+                      bounds: Optional[Bounds] = None) -> List[Dict[str, Any]]:
+        """Retrieve properties with optional filters.
         
-        query = "SELECT * FROM properties WHERE 1=1"
-        params = []
+        keywords searches descriptions and features, e.g. 'garage' or
+        '"finished basement"', best matches first unless sorted otherwise.
+        near=(latitude, longitude) and radius_miles find listings within a
+        distance, nearest first unless sorted otherwise, and bounds=(south,
+        west, north, east) the listings in a map view.
+        """
+        query, params = self._build_query(location, min_price, max_price, min_beds, min_baths,
+                                          sort, descending, limit, sources=sources,
+                                          scraped_since=scraped_since, keywords=keywords,
+                                          near=near, radius_miles=radius_miles, bounds=bounds)
+        
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        return [self._row_to_dict(row) for row in rows]
+    
+    def record_scrape(self, location: str, min_price: float, max_price: float, source: str,
+                      started_at: datetime, completed_at: Optional[datetime] = None):
+        """Record that a source's results for a search were crawled to the last page.
+        
+        Only record scrapes that reached the end of the results; one cut
+        short by a page or result limit doesn't cover the search.
+        """
+        location = normalize_search_location(location)
+        completed_at = completed_at or datetime.now()
+        
+        with self.pool.connection() as conn:
+            # Older scrapes within this one's price range can no longer be the latest cover for any search
+            conn.execute('''
+            DELETE FROM scrapes WHERE location = ? AND source = ? AND min_price >= ? AND max_price <= ?
+            AND started_at <= ?
+            ''', (location, source, min_price, max_price, started_at.isoformat()))
+            conn.execute(
+                'INSERT INTO scrapes (location, source, min_price, max_price, started_at, completed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (location, source, min_price, max_price, started_at.isoformat(), completed_at.isoformat())
+            )
+            conn.commit()
+    
+    def last_scraped(self,
+                     location: str,
+                     min_price: float,
+                     max_price: float,
+                     sources: Optional[List[str]] = None) -> Dict[str, datetime]:
+        """Return when each source last started a complete scrape covering a search.
+        
+        A scrape of the same location covers every search whose price range
+        falls inside its own. Sources with no such scrape are left out.
+        """
+        query = '''
+        SELECT source, MAX(started_at) AS started_at FROM scrapes
+        WHERE location = ? AND min_price <= ? AND max_price >= ?
+        '''
+        params = [normalize_search_location(location), min_price, max_price]
+        
+        if sources is not None:
+            query += f" AND source IN ({', '.join(['?' for _ in sources])})"
+            params.extend(sources)
+        
+        with self.pool.connection() as conn:
+            rows = conn.execute(f"{query} GROUP BY source", params).fetchall()
+        
+        return {row['source']: datetime.fromisoformat(row['started_at']) for row in rows}
+    
+    def get_listing_events(self, property_id: str) -> List[Dict[str, Any]]:
+        """Return a listing's history, oldest first"""
+        with self.pool.connection() as conn:
+            rows = conn.execute('''
+            SELECT event, old_price, new_price, old_status, new_status, occurred_at
+            FROM listing_events WHERE property_id = ? ORDER BY occurred_at, id
+            ''', (property_id,)).fetchall()
+        
+        return [dict(row) for row in rows]
+    
+    def get_price_changes(self,
+                          since: datetime,
+                          drops_only: bool = False,
+                          location: Optional[str] = None,
+                          limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return listings whose price changed since a point in time, newest change first.
+        
+        With drops_only, e.g. get_price_changes(now - 7 days, drops_only=True)
+        answers "price drops in the last week".
+        """
+        query = '''
+        SELECT e.old_price, e.new_price, e.occurred_at AS changed_at, p.*
+        FROM listing_events e JOIN properties p ON p.id = e.property_id
+        WHERE e.event = 'price_change' AND e.occurred_at >= ?
+        '''
+        params = [since.isoformat()]
+        
+        if drops_only:
+            query += " AND e.new_price < e.old_price"
         
         if location:
-            query += " AND (city LIKE ? OR state LIKE ? OR zip_code LIKE ?)"
-            params.extend([f"%{location}%", f"%{location}%", f"%{location}%"])
-            
-        if min_price is not None:
-            query += " AND price >= ?"
-            params.append(min_price)
-            
-        if max_price is not None:
-            query += " AND price <= ?"
-            params.append(max_price)
-            
-        if min_beds is not None:
-            query += " AND bedrooms >= ?"
-            params.append(min_beds)
-            
-        if min_baths is not None:
-            query += " AND bathrooms >= ?"
-            params.append(min_baths)
+            clause, location_params = self._location_filter(location)
+            if clause:
+                query += f" AND {clause}"
+                params.extend(location_params)
+        
+        query += " ORDER BY e.occurred_at DESC"
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
         
-        result = []
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        changes = []
         for row in rows:
-            data = dict(row)
-            
-            # Convert string lists back to actual lists
-            if data['features']:
-                data['features'] = data['features'].split(',')
-            
-            if data['image_urls']:
-                data['image_urls'] = data['image_urls'].split(',')
-                
-            result.append(data)
+            data = self._row_to_dict(row)
+            data.pop('listing_key', None)
+            for column in NORMALIZED_COLUMNS:
+                data.pop(column, None)
+            changes.append(data)
+        
+        return changes
+    
+    def get_properties_page(self,
+                            location: Optional[str] = None,
+                            min_price: Optional[float] = None,
+                            max_price: Optional[float] = None,
+                            min_beds: Optional[float] = None,
+                            min_baths: Optional[float] = None,
+                            sort: str = 'price',
+                            descending: bool = False,
+                            limit: int = 50,
+                            cursor: Optional[str] = None,
+                            keywords: Optional[str] = None,
+                            near: Optional[Tuple[float, float]] = None,
+                            radius_miles: Optional[float] = None,
+                            bounds: Optional[Bounds] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Retrieve one page of properties using keyset pagination.
+        
+        Returns the page and the cursor for the next page, which is None on
+        the last page.
+        """
+        if sort not in KEYSET_SORT_COLUMNS:
+            raise ValueError(f"Unsupported pagination sort column: {sort}")
+        
+        after = decode_cursor(cursor) if cursor else None
+        
+        # Fetch one extra row to find out whether another page follows
+        query, params = self._build_query(location, min_price, max_price, min_beds, min_baths,
+                                          sort, descending, limit + 1, after, keywords=keywords,
+                                          near=near, radius_miles=radius_miles, bounds=bounds)
+        
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][sort], rows[-1]['id'])
+        
+        return [self._row_to_dict(row) for row in rows], next_cursor
+    
+    def iter_properties(self,
+                        location: Optional[str] = None,
+                        min_price: Optional[float] = None,
+                        max_price: Optional[float] = None,
+                        min_beds: Optional[float] = None,
+                        min_baths: Optional[float] = None,
+                        sort: str = 'price',
+                        descending: bool = False,
+                        page_size: int = 500,
+                        keywords: Optional[str] = None,
+                        near: Optional[Tuple[float, float]] = None,
+                        radius_miles: Optional[float] = None,
+                        bounds: Optional[Bounds] = None) -> Iterator[Dict[str, Any]]:
+        """Stream every matching property, one keyset page at a time.
+        
+        The first page is read before returning, so invalid filters raise
+        ValueError here rather than partway through a streamed response.
+        """
+        def fetch(cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            return self.get_properties_page(location, min_price, max_price, min_beds, min_baths,
+                                            sort, descending, page_size, cursor, keywords,
+                                            near, radius_miles, bounds)
+        
+        def rows(page: List[Dict[str, Any]], cursor: Optional[str]) -> Iterator[Dict[str, Any]]:
+            while True:
+                yield from page
+                if cursor is None:
+                    break
+                page, cursor = fetch(cursor)
         
-        conn.close()
-        return result
+        return rows(*fetch(None))
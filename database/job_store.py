@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from config.settings import JOBS_DATABASE_PATH, JOB_RETENTION, JOB_BATCH_CACHE_SIZE
+from database.db_handler import get_pool
+from models.property_batch import PropertyBatch
+
+class JobStore:
+    """Status and per-source results of background scrape jobs.
+
+    Jobs live in SQLite so any worker process can answer a status poll for
+    a job that another worker is running. The results of recently polled
+    jobs are also kept in memory as PropertyBatch columns, so each poll
+    only decodes the sources that finished since the last one.
+    """
+
+    def __init__(self, path: str = JOBS_DATABASE_PATH, batch_cache_size: int = JOB_BATCH_CACHE_SIZE):
+        self.path = path
+        self.pool = get_pool(path)
+        self.batch_cache_size = batch_cache_size
+        # job id -> ((source, finished_at) of each source in the batch, batch)
+        self._batches: 'OrderedDict[str, Tuple[List[Tuple[str, float]], PropertyBatch]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._ensure_tables()
+
+    def _ensure_tables(self):
+        """Create the job tables if they don't exist"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        with self.pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS scrape_jobs (
+                id TEXT PRIMARY KEY,
+                search_key TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS scrape_job_sources (
+                job_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                error TEXT,
+                elapsed REAL NOT NULL,
+                properties TEXT NOT NULL,
+                finished_at REAL NOT NULL,
+                served_from TEXT NOT NULL DEFAULT 'live',
+                scraped_at TEXT,
+                PRIMARY KEY (job_id, source)
+            )
+            ''')
+
+            # Job databases created before cached results were recorded lack these columns
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(scrape_job_sources)')}
+            if 'served_from' not in columns:
+                conn.execute("ALTER TABLE scrape_job_sources ADD COLUMN served_from TEXT NOT NULL DEFAULT 'live'")
+                conn.execute('ALTER TABLE scrape_job_sources ADD COLUMN scraped_at TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_scrape_jobs_created ON scrape_jobs(created_at)')
+            conn.commit()
+
+    def create(self, job_id: str, search_key: str, params: Dict[str, Any]):
+        """Record a newly queued job and drop jobs past their retention period"""
+        now = time.time()
+
+        with self.pool.connection() as conn:
+            conn.execute(
+                'INSERT INTO scrape_jobs (id, search_key, params, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, search_key, json.dumps(params), 'queued', now)
+            )
+
+            expired = 'SELECT id FROM scrape_jobs WHERE created_at < ?'
+            conn.execute(f'DELETE FROM scrape_job_sources WHERE job_id IN ({expired})', (now - JOB_RETENTION,))
+            conn.execute('DELETE FROM scrape_jobs WHERE created_at < ?', (now - JOB_RETENTION,))
+            conn.commit()
+
+    def delete(self, job_id: str):
+        """Remove a job and its results, e.g. one that was never queued"""
+        with self.pool.connection() as conn:
+            conn.execute('DELETE FROM scrape_job_sources WHERE job_id = ?', (job_id,))
+            conn.execute('DELETE FROM scrape_jobs WHERE id = ?', (job_id,))
+            conn.commit()
+
+    def start(self, job_id: str):
+        """Mark a job as running"""
+        with self.pool.connection() as conn:
+            conn.execute('UPDATE scrape_jobs SET status = ?, started_at = ? WHERE id = ?',
+                         ('running', time.time(), job_id))
+            conn.commit()
+
+    def record_source(self, job_id: str, source: str, status: str, properties: List[Dict[str, Any]],
+                      error: Optional[str] = None, elapsed: float = 0.0,
+                      served_from: str = 'live', scraped_at: Optional[str] = None):
+        """Store the outcome of one source as soon as it finishes.
+
+        served_from is 'cache' for sources answered from stored listings, in
+        which case scraped_at says when they were last scraped.
+        """
+        with self.pool.connection() as conn:
+            conn.execute('''
+            INSERT OR REPLACE INTO scrape_job_sources
+                (job_id, source, status, count, error, elapsed, properties, finished_at, served_from, scraped_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job_id, source, status, len(properties), error, elapsed, json.dumps(properties), time.time(),
+                  served_from, scraped_at))
+            conn.commit()
+
+    def finish(self, job_id: str, status: str = 'done', error: Optional[str] = None):
+        """Mark a job as done or failed"""
+        with self.pool.connection() as conn:
+            conn.execute('UPDATE scrape_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                         (status, error, time.time(), job_id))
+            conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's status and a summary of each finished source"""
+        with self.pool.connection() as conn:
+            job = conn.execute('SELECT * FROM scrape_jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None:
+                return None
+
+            sources = conn.execute('''
+            SELECT source, status, count, error, elapsed, served_from, scraped_at FROM scrape_job_sources
+            WHERE job_id = ? ORDER BY finished_at
+            ''', (job_id,)).fetchall()
+
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'params': json.loads(job['params']),
+            'error': job['error'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at'],
+            'sources': {
+                row['source']: {
+                    'status': row['status'],
+                    'count': row['count'],
+                    'error': row['error'],
+                    'elapsed': round(row['elapsed'], 3),
+                    'served_from': row['served_from'],
+                    'scraped_at': row['scraped_at'],
+                }
+                for row in sources
+            },
+        }
+
+    def get_properties(self, job_id: str, sources: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Return the properties found so far, optionally only from some sources"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                'SELECT source, properties FROM scrape_job_sources WHERE job_id = ? ORDER BY finished_at',
+                (job_id,)
+            ).fetchall()
+
+        properties = []
+        for row in rows:
+            if sources is None or row['source'] in sources:
+                properties.extend(json.loads(row['properties']))
+        return properties
+
+    def get_batch(self, job_id: str) -> PropertyBatch:
+        """Return the properties found so far as a PropertyBatch.
+
+        The batch is cached per job and reused until another source finishes;
+        it is then copied and extended with just the new sources. Cached
+        batches are shared, so callers must not modify them.
+        """
+        with self.pool.connection() as conn:
+            finished = [(row['source'], row['finished_at']) for row in conn.execute(
+                'SELECT source, finished_at FROM scrape_job_sources WHERE job_id = ? ORDER BY finished_at',
+                (job_id,)
+            )]
+
+        with self._lock:
+            cached = self._batches.get(job_id)
+            if cached is not None:
+                self._batches.move_to_end(job_id)
+        if cached is not None and cached[0] == finished:
+            return cached[1]
+
+        if cached is not None and cached[0] == finished[:len(cached[0])]:
+            # Sources are only ever added while a job runs, so decode just the new ones
+            batch = cached[1].take(range(len(cached[1])))
+            new_sources = [source for source, _ in finished[len(cached[0]):]]
+        else:
+            batch = PropertyBatch()
+            new_sources = [source for source, _ in finished]
+
+        if new_sources:
+            with self.pool.connection() as conn:
+                rows = {row['source']: row['properties'] for row in conn.execute(
+                    f"SELECT source, properties FROM scrape_job_sources WHERE job_id = ? "
+                    f"AND source IN ({', '.join('?' * len(new_sources))})",
+                    (job_id, *new_sources)
+                )}
+            for source in new_sources:
+                batch.extend_dicts(json.loads(rows.get(source, '[]')))
+
+        with self._lock:
+            self._batches[job_id] = (finished, batch)
+            self._batches.move_to_end(job_id)
+            while len(self._batches) > self.batch_cache_size:
+                self._batches.popitem(last=False)
+        return batch
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+from config.settings import RESULT_STORE_MAX_ROWS, RESULT_STORE_TTL, RESULT_STORE_SPILL, RESULT_STORE_PATH
+from database.db_handler import get_pool
+from models.property import Property
+from models.property_batch import PropertyBatch, PropertyRow
+
+# Rows read from disk at a time while streaming a spilled result set
+SPILL_READ_SIZE = 1000
+
+class ResultStore:
+    """Search result sets kept for export, keyed by result id.
+
+    Recently used result sets are held in memory, as compact PropertyBatch
+    columns, up to max_rows properties in total, evicting the least
+    recently used first, and every result set expires ttl seconds after it
+    was stored. With a spill path, result sets are also written to SQLite,
+    so one that was evicted, or was stored by another worker process, can
+    still be exported.
+    """
+
+    def __init__(self, max_rows: int = RESULT_STORE_MAX_ROWS, ttl: float = RESULT_STORE_TTL,
+                 spill_path: Optional[str] = None):
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.spill_path = spill_path
+        self._entries: 'OrderedDict[str, Tuple[float, PropertyBatch]]' = OrderedDict()  # id -> (expires, rows)
+        self._rows = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'spill_hits': 0, 'misses': 0, 'evictions': 0}
+
+        self.pool = get_pool(spill_path) if spill_path else None
+        if self.pool:
+            self._ensure_tables()
+
+    def _ensure_tables(self):
+        """Create the spill tables if they don't exist"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+
+        with self.pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS result_sets (
+                id TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            ''')
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS result_rows (
+                result_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (result_id, position)
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_result_sets_expires ON result_sets(expires_at)')
+            conn.commit()
+
+    def put(self, result_id: str, properties: Iterable[Property]):
+        """Store a result set, replacing any earlier one with the same id"""
+        expires_at = time.time() + self.ttl
+        batch = properties if isinstance(properties, PropertyBatch) else PropertyBatch.from_properties(properties)
+
+        with self._lock:
+            self._drop(result_id)
+            self._entries[result_id] = (expires_at, batch)
+            self._rows += len(batch)
+            self._evict()
+
+        if self.pool:
+            self._spill(result_id, batch, expires_at)
+
+    def _drop(self, result_id: str):
+        """Remove a result set from memory; the lock must be held"""
+        entry = self._entries.pop(result_id, None)
+        if entry is not None:
+            self._rows -= len(entry[1])
+
+    def _evict(self):
+        """Drop expired result sets, then least recently used ones until under max_rows; the lock must be held"""
+        now = time.time()
+        for result_id in [r for r, (expires_at, _) in self._entries.items() if expires_at < now]:
+            self._drop(result_id)
+
+        # The newest result set is kept even if it alone exceeds the budget
+        while self._rows > self.max_rows and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def _spill(self, result_id: str, batch: PropertyBatch, expires_at: float):
+        """Write a result set to SQLite and drop expired ones"""
+        with self.pool.connection() as conn:
+            expired = 'SELECT id FROM result_sets WHERE expires_at < ?'
+            conn.execute(f'DELETE FROM result_rows WHERE result_id IN ({expired})', (time.time(),))
+            conn.execute('DELETE FROM result_sets WHERE expires_at < ?', (time.time(),))
+
+            conn.execute('DELETE FROM result_rows WHERE result_id = ?', (result_id,))
+            conn.executemany(
+                'INSERT INTO result_rows (result_id, position, data) VALUES (?, ?, ?)',
+                ((result_id, i, json.dumps(data)) for i, data in enumerate(batch.iter_dicts()))
+            )
+            conn.execute('INSERT OR REPLACE INTO result_sets (id, count, expires_at) VALUES (?, ?, ?)',
+                         (result_id, len(batch), expires_at))
+            conn.commit()
+
+    def _spilled_count(self, result_id: str) -> Optional[int]:
+        """Return the size of an unexpired spilled result set, or None if there isn't one"""
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT count FROM result_sets WHERE id = ? AND expires_at >= ?',
+                               (result_id, time.time())).fetchone()
+        return row['count'] if row else None
+
+    def _iter_spilled(self, result_id: str) -> Iterator[Property]:
+        """Stream a spilled result set in order, a few rows at a time"""
+        position = -1
+
+        while True:
+            with self.pool.connection() as conn:
+                rows = conn.execute('''
+                SELECT position, data FROM result_rows WHERE result_id = ? AND position > ?
+                ORDER BY position LIMIT ?
+                ''', (result_id, position, SPILL_READ_SIZE)).fetchall()
+
+            for row in rows:
+                yield Property.from_dict(json.loads(row['data']))
+
+            if len(rows) < SPILL_READ_SIZE:
+                break
+            position = rows[-1]['position']
+
+    def iter(self, result_id: str) -> Optional[Iterator[Union[PropertyRow, Property]]]:
+        """Return an iterator over a result set, or None if it is unknown or has expired"""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is not None and entry[0] >= time.time():
+                self._entries.move_to_end(result_id)
+                self._stats['hits'] += 1
+                return iter(entry[1])
+
+        if self.pool and self._spilled_count(result_id) is not None:
+            with self._lock:
+                self._stats['spill_hits'] += 1
+            return self._iter_spilled(result_id)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def exists(self, result_id: str) -> bool:
+        """True if a result set can still be exported"""
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is not None and entry[0] >= time.time():
+                return True
+        return self.pool is not None and self._spilled_count(result_id) is not None
+
+    def get(self, result_id: str) -> Optional[List[Union[PropertyRow, Property]]]:
+        """Return a whole result set, or None if it is unknown or has expired"""
+        properties = self.iter(result_id)
+        return list(properties) if properties is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Report memory use and hit counts"""
+        with self._lock:
+            return {
+                'result_sets': len(self._entries),
+                'rows': self._rows,
+                'max_rows': self.max_rows,
+                'spill': self.pool is not None,
+                **self._stats
+            }
+
+_result_store: Optional[ResultStore] = None
+_result_store_lock = threading.Lock()
+
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store"""
+    global _result_store
+
+    with _result_store_lock:
+        if _result_store is None:
+            _result_store = ResultStore(spill_path=RESULT_STORE_PATH if RESULT_STORE_SPILL else None)
+        return _result_store
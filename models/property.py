@@ -1,8 +1,12 @@
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, List
 
-@dataclass
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__, roughly halving a Property's size
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_SLOTS)
 class Property:
     id: str
     source: str  # Which site this was scraped from
@@ -23,6 +27,10 @@ class Property:
     image_urls: Optional[List[str]] = None
     date_listed: Optional[datetime] = None
     date_scraped: datetime = datetime.now()
+    status: Optional[str] = None  # Listing status such as 'for_sale' or 'pending', if the site reports it
+    canonical_id: Optional[str] = None  # Shared by listings of the same home on different sites
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     
     def to_dict(self):
         """Convert to dictionary for database storage"""
@@ -45,5 +53,73 @@ class Property:
             'features': ','.join(self.features) if self.features else None,
             'image_urls': ','.join(self.image_urls) if self.image_urls else None,
             'date_listed': self.date_listed.isoformat() if self.date_listed else None,
-            'date_scraped': self.date_scraped.isoformat()
+            'date_scraped': self.date_scraped.isoformat(),
+            'status': self.status,
+            'canonical_id': self.canonical_id,
+            'latitude': self.latitude,
+            'longitude': self.longitude
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Property':
+        """Build a property from the dictionary produced by to_dict()"""
+        def split(value):
+            # Database rows already hold lists; to_dict() output holds comma-separated strings
+            if isinstance(value, list):
+                return value or None
+            return value.split(',') if value else None
+        
+        def parse_date(value):
+            return datetime.fromisoformat(value) if value else None
+        
+        return cls(
+            id=data['id'],
+            source=data['source'],
+            url=data['url'],
+            address=data['address'],
+            city=data['city'],
+            state=data['state'],
+            zip_code=data['zip_code'],
+            price=data['price'],
+            bedrooms=data['bedrooms'],
+            bathrooms=data['bathrooms'],
+            square_feet=data.get('square_feet'),
+            lot_size=data.get('lot_size'),
+            year_built=data.get('year_built'),
+            property_type=data.get('property_type'),
+            description=data.get('description'),
+            features=split(data.get('features')),
+            image_urls=split(data.get('image_urls')),
+            date_listed=parse_date(data.get('date_listed')),
+            date_scraped=parse_date(data.get('date_scraped')) or datetime.now(),
+            status=data.get('status'),
+            canonical_id=data.get('canonical_id'),
+            latitude=data.get('latitude'),
+            longitude=data.get('longitude')
+        )
+
+@dataclass
+class CanonicalProperty:
+    """One home and its listings on every site it was found on"""
+    canonical_id: str
+    listings: List[Property]  # Most trusted source first
+    
+    @property
+    def primary(self) -> Property:
+        """The listing whose details represent the home"""
+        return self.listings[0]
+    
+    @property
+    def sources(self) -> List[str]:
+        """The sites the home is listed on"""
+        return [listing.source for listing in self.listings]
+    
+    def to_dict(self):
+        """Convert to a dictionary: the primary listing plus a link to each source"""
+        data = self.primary.to_dict()
+        data['canonical_id'] = self.canonical_id
+        data['sources'] = [
+            {'source': listing.source, 'id': listing.id, 'url': listing.url, 'price': listing.price}
+            for listing in self.listings
+        ]
+        return data
@@ -0,0 +1,287 @@
+import sys
+from dataclasses import fields
+from operator import attrgetter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.property import Property
+
+# Property fields in declaration order, which is also the database column order
+PROPERTY_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(Property))
+
+FLOAT_FIELDS = ('price', 'bedrooms', 'bathrooms', 'square_feet', 'lot_size', 'latitude', 'longitude')  # float64, NaN when missing
+DATE_FIELDS = ('date_listed', 'date_scraped')  # datetime64[us], NaT when missing; aware times are stored as UTC
+INTERNED_FIELDS = ('source', 'city', 'state', 'zip_code', 'property_type', 'status')  # Few distinct values
+LIST_FIELDS = ('features', 'image_urls')  # Tuples of strings
+STRING_FIELDS = ('id', 'url', 'address', 'description', 'canonical_id')
+
+MISSING_YEAR = 0  # year_built is an int32 column, so a missing year is stored as 0
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+NAT = np.datetime64('NaT', 'us')
+NAT_VALUE = np.iinfo(np.int64).min  # NaT as a raw datetime64 integer
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC so it can share a column with naive ones"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+class PropertyRow:
+    """A view of one row of a PropertyBatch that reads like a Property.
+
+    Attributes are read from the batch's columns on access, so creating a
+    row copies nothing; setting one writes through to the batch.
+    """
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch: 'PropertyBatch', index: int):
+        object.__setattr__(self, '_batch', batch)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in PROPERTY_FIELDS:
+            raise AttributeError(name)
+        return self._batch._get(name, self._index)
+
+    def __setattr__(self, name: str, value: Any):
+        if name not in PROPERTY_FIELDS:
+            raise AttributeError(name)
+        self._batch._set(name, self._index, value)
+
+    def __repr__(self) -> str:
+        return f"PropertyRow({self._index}, id={self.id!r}, address={self.address!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the same dictionary as Property.to_dict()"""
+        return self._batch._row_dict(self._index)
+
+    def to_property(self) -> Property:
+        """Copy the row into a standalone Property"""
+        return Property(**{name: self._batch._get(name, self._index) for name in PROPERTY_FIELDS})
+
+class PropertyBatch:
+    """A column-oriented collection of properties.
+
+    Numeric fields and dates live in NumPy arrays, low-cardinality strings
+    such as city, state and source are interned so each distinct value is
+    stored once, and rows are read through PropertyRow views instead of one
+    object per listing. A batch holding 100k listings takes a fraction of
+    the memory of the equivalent list of Property objects.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._size = 0
+        self._capacity = max(capacity, 1)
+        self._floats = {name: np.full(self._capacity, np.nan) for name in FLOAT_FIELDS}
+        self._years = np.full(self._capacity, MISSING_YEAR, dtype=np.int32)
+        self._dates = {name: np.full(self._capacity, NAT) for name in DATE_FIELDS}
+        self._objects: Dict[str, List[Any]] = {name: [] for name in INTERNED_FIELDS + LIST_FIELDS + STRING_FIELDS}
+        self._codes: Dict[str, Tuple[np.ndarray, List[Any]]] = {}  # Interned field -> (codes, categories)
+
+    @classmethod
+    def from_properties(cls, properties: Iterable[Property]) -> 'PropertyBatch':
+        """Build a batch from Property objects or anything with the same attributes"""
+        properties = properties if isinstance(properties, (list, tuple)) else list(properties)
+        batch = cls(len(properties))
+        batch.extend(properties)
+        return batch
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[Dict[str, Any]]) -> 'PropertyBatch':
+        """Build a batch from Property.to_dict() dictionaries"""
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        batch = cls(len(rows))
+        batch.extend_dicts(rows)
+        return batch
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> PropertyRow:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('PropertyBatch index out of range')
+        return PropertyRow(self, index)
+
+    def __iter__(self) -> Iterator[PropertyRow]:
+        return (PropertyRow(self, i) for i in range(self._size))
+
+    def _grow(self, needed: int):
+        """Make room for at least needed rows, doubling the numeric columns"""
+        if needed <= self._capacity:
+            return
+
+        capacity = max(needed, self._capacity * 2)
+        extra = capacity - self._capacity
+        for name in FLOAT_FIELDS:
+            self._floats[name] = np.concatenate([self._floats[name], np.full(extra, np.nan)])
+        self._years = np.concatenate([self._years, np.full(extra, MISSING_YEAR, dtype=np.int32)])
+        for name in DATE_FIELDS:
+            self._dates[name] = np.concatenate([self._dates[name], np.full(extra, NAT)])
+        self._capacity = capacity
+
+    def append(self, prop: Property):
+        """Add a property to the end of the batch"""
+        self.extend([prop])
+
+    def extend(self, properties: Iterable[Property]):
+        """Add several properties to the end of the batch, filling each column in one step"""
+        properties = properties if isinstance(properties, (list, tuple)) else list(properties)
+        self._extend(len(properties), lambda name: list(map(attrgetter(name), properties)))
+
+    def extend_dicts(self, rows: Iterable[Dict[str, Any]]):
+        """Add Property.to_dict() dictionaries, such as stored job results, without a Property for each"""
+        rows = rows if isinstance(rows, (list, tuple)) else list(rows)
+        now = datetime.now()
+
+        def column(name: str) -> List[Any]:
+            values = [row.get(name) for row in rows]
+            if name in DATE_FIELDS:
+                default = now if name == 'date_scraped' else None
+                return [datetime.fromisoformat(v) if v else default for v in values]
+            if name in LIST_FIELDS:
+                return [(v or None) if isinstance(v, list) else v.split(',') if v else None for v in values]
+            return values
+
+        self._extend(len(rows), column)
+
+    def _extend(self, count: int, column: Callable[[str], List[Any]]):
+        """Append count rows given a function returning each field's values for them"""
+        if not count:
+            return
+
+        start = self._size
+        end = start + count
+        self._grow(end)
+
+        # Assigning a list converts it in C; missing values are only replaced when there are any
+        for name in FLOAT_FIELDS:
+            values = column(name)
+            self._floats[name][start:end] = [np.nan if v is None else v for v in values] if None in values else values
+        years = column('year_built')
+        self._years[start:end] = [MISSING_YEAR if v is None else v for v in years] if None in years else years
+        for name in DATE_FIELDS:
+            # Microseconds since the epoch in plain integer math, much faster than np.array on datetimes
+            micros = ((_naive_utc(d) - EPOCH) // ONE_MICROSECOND if d is not None else NAT_VALUE
+                      for d in column(name))
+            self._dates[name][start:end] = np.fromiter(micros, dtype=np.int64, count=count).view('datetime64[us]')
+
+        intern = sys.intern
+        for name in INTERNED_FIELDS:
+            self._objects[name].extend([intern(v) if v.__class__ is str else v for v in column(name)])
+        for name in LIST_FIELDS:
+            self._objects[name].extend([tuple(v) if v is not None else None for v in column(name)])
+        for name in STRING_FIELDS:
+            self._objects[name].extend(column(name))
+
+        self._size = end
+        self._codes.clear()
+
+    def take(self, indices: Sequence[int]) -> 'PropertyBatch':
+        """Copy the given rows, in the given order, into a new batch"""
+        indices = np.asarray(indices, dtype=np.intp)
+        batch = PropertyBatch(len(indices))
+        count = len(indices)
+
+        for name in FLOAT_FIELDS:
+            batch._floats[name][:count] = self._floats[name][indices]
+        batch._years[:count] = self._years[indices]
+        for name in DATE_FIELDS:
+            batch._dates[name][:count] = self._dates[name][indices]
+        for name, values in self._objects.items():
+            batch._objects[name] = [values[i] for i in indices.tolist()]
+
+        batch._size = count
+        return batch
+
+    def _set(self, name: str, index: int, value: Any):
+        """Store one field of one row in its column"""
+        self._codes.pop(name, None)
+        if name in self._floats:
+            self._floats[name][index] = np.nan if value is None else value
+        elif name == 'year_built':
+            self._years[index] = MISSING_YEAR if value is None else value
+        elif name in self._dates:
+            self._dates[name][index] = NAT if value is None else np.datetime64(_naive_utc(value), 'us')
+        elif name in INTERNED_FIELDS:
+            self._objects[name][index] = _intern(value)
+        elif name in LIST_FIELDS:
+            self._objects[name][index] = tuple(value) if value is not None else None
+        else:
+            self._objects[name][index] = value
+
+    def _get(self, name: str, index: int) -> Any:
+        """Read one field of one row as the Python value a Property would hold"""
+        if name in self._floats:
+            value = self._floats[name][index]
+            return None if np.isnan(value) else float(value)
+        if name == 'year_built':
+            value = self._years[index]
+            return None if value == MISSING_YEAR else int(value)
+        if name in self._dates:
+            value = self._dates[name][index]
+            return None if np.isnat(value) else EPOCH + timedelta(microseconds=int(value.astype(np.int64)))
+        if name in LIST_FIELDS:
+            value = self._objects[name][index]
+            return list(value) if value is not None else None
+        return self._objects[name][index]
+
+    def _row_dict(self, index: int) -> Dict[str, Any]:
+        """Build the Property.to_dict() dictionary for one row"""
+        data = {}
+        for name in PROPERTY_FIELDS:
+            if name in LIST_FIELDS:
+                value = self._objects[name][index]
+                data[name] = ','.join(value) if value else None
+            elif name in self._dates:
+                value = self._get(name, index)
+                data[name] = value.isoformat() if value else None
+            else:
+                data[name] = self._get(name, index)
+        return data
+
+    def column(self, name: str) -> Any:
+        """Return a field for every row: a NumPy array for numbers and dates, otherwise a list.
+
+        Numeric columns are views of the batch's storage, not copies.
+        """
+        if name in self._floats:
+            return self._floats[name][:self._size]
+        if name == 'year_built':
+            return self._years[:self._size]
+        if name in self._dates:
+            return self._dates[name][:self._size]
+        if name in self._objects:
+            return self._objects[name]
+        raise KeyError(name)
+
+    def codes(self, name: str) -> Tuple[np.ndarray, List[Any]]:
+        """Return an interned field as integer codes into a list of its distinct values.
+
+        Filters on fields like zip_code or property_type then test each
+        distinct value once instead of every row.
+        """
+        if name not in INTERNED_FIELDS:
+            raise KeyError(name)
+
+        cached = self._codes.get(name)
+        if cached is None:
+            index: Dict[Any, int] = {}
+            codes = np.fromiter((index.setdefault(v, len(index)) for v in self._objects[name]),
+                                dtype=np.int32, count=self._size)
+            cached = self._codes[name] = (codes, list(index))
+        return cached
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Yield each row as a Property.to_dict() dictionary, e.g. for JSON"""
+        return (self._row_dict(i) for i in range(self._size))
+
+    def to_properties(self) -> List[Property]:
+        """Copy every row into a standalone Property"""
+        return [row.to_property() for row in self]
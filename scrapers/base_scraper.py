@@ -1,83 +1,291 @@
-import time
+import asyncio
 import requests
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Dict, List, Optional, Callable, Awaitable
 from datetime import datetime
+from urllib.parse import urlparse
 import hashlib
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
 
-from config.settings import USER_AGENT, REQUEST_TIMEOUT, REQUEST_DELAY
+from config.settings import (
+    REQUEST_TIMEOUT, SELENIUM_PAGE_TIMEOUT, HTTP_CACHE_ENABLED,
+    RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_MAX_WAIT, SEARCH_MAX_PAGES, PAGE_FETCH_CONCURRENCY,
+    EMBEDDED_DATA_FIRST
+)
 from models.property import Property
+from scrapers.driver_pool import (
+    get_driver_pool, get_browser_capability, DriverStartError, DriverUnavailableError
+)
+from scrapers.http_cache import get_http_cache, CacheEntry
+from scrapers.http_client import (
+    httpx, get_session, get_async_client, get_fetch_loop, async_fetch_available
+)
+from scrapers.rate_limiter import get_rate_limiter, THROTTLE_STATUSES
 
 class BaseScraper(ABC):
+    source = ''  # Name of the site, set by each scraper
+
     def __init__(self):
         self.session = self._init_session()
-        self.driver = None
+        self.crawl_complete = False  # Set by _crawl: whether the last crawl reached the end of the results
 
     def _init_session(self) -> requests.Session:
-        """Initialize a requests session with headers"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        })
-        return session
-
-    def _init_selenium(self) -> Optional[webdriver.Chrome]:
-        """Initialize Selenium WebDriver for JavaScript-heavy sites"""
-        if self.driver is None:
+        """Use the process-wide requests session so connections are reused between searches"""
+        return get_session()
+
+    def is_selenium_available(self) -> bool:
+        """Check if Selenium/Chrome is available, using the cached process-wide probe"""
+        return get_browser_capability().selenium_available()
+
+    def _render_html(self, url: str, wait_selector: str) -> Optional[str]:
+        """Load a page in a pooled browser until wait_selector appears.
+
+        Returns None if no browser could be used, so the caller can fall back
+        to a plain request. This blocks, so async callers run it in a thread.
+        """
+        # Rendered pages are cached separately from raw responses
+        cache_key = f"selenium:{url}"
+        if HTTP_CACHE_ENABLED:
+            cached = get_http_cache().lookup(cache_key, self.source)
+            if cached:
+                return cached.text
+
+        pool = get_driver_pool()
+        try:
+            driver = pool.acquire()
+        except DriverStartError as e:
+            get_browser_capability().mark_unavailable(str(e))
+            return None
+        except DriverUnavailableError as e:
+            # Every browser is busy (or the pool is shutting down); Chrome itself still works
+            print(f"{e}; fetching {url} without a browser")
+            return None
+
+        try:
+            get_rate_limiter().acquire(urlparse(url).netloc)
+            driver.get(url)
+
+            # Wait for the results to load
             try:
-                chrome_options = Options()
-                chrome_options.add_argument("--headless")
-                chrome_options.add_argument("--no-sandbox")
-                chrome_options.add_argument("--disable-dev-shm-usage")
-                chrome_options.add_argument(f"user-agent={USER_AGENT}")
-
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                WebDriverWait(driver, SELENIUM_PAGE_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+                )
             except Exception as e:
-                print(f"Failed to initialize Selenium: {e}")
-                print("Falling back to requests-only mode")
-                self.driver = None
+                # If we timeout waiting for elements, still try to parse what we have
+                print(f"Error waiting for {self.source} results to load: {e}")
 
-        return self.driver
+            html = driver.page_source
+            if HTTP_CACHE_ENABLED:
+                get_http_cache().put(cache_key, url, self.source, html.encode('utf-8'), 'utf-8')
+            return html
+        except Exception as e:
+            print(f"Error using Selenium for {self.source}: {e}")
+            return None
+        finally:
+            pool.release(driver)
 
-    def is_selenium_available(self) -> bool:
-        """Check if Selenium/Chrome is available"""
-        try:
-            driver = self._init_selenium()
-            return driver is not None
-        except:
-            return False
+    async def _fetch_html(self, url: str, wait_selector: Optional[str] = None) -> Optional[str]:
+        """Fetch a page's HTML, rendering it in a pooled browser when one is available.
+
+        Pages with a wait_selector are loaded with Selenium until that element
+        appears, unless the static page already embeds its results as JSON;
+        everything else, and every page in requests-only mode, is fetched
+        with a plain request.
+        """
+        html = None
+
+        if wait_selector and EMBEDDED_DATA_FIRST:
+            # Pages that carry their results as JSON don't need a browser
+            html = await self._make_request_async(url)
+            if html and self._has_embedded_data(html):
+                return html
+
+        if wait_selector and await asyncio.to_thread(self.is_selenium_available):
+            rendered = await asyncio.to_thread(self._render_html, url, wait_selector)
+            if rendered is not None:
+                return rendered
+
+        # Fall back to a plain request
+        if html is None:
+            html = await self._make_request_async(url)
+        return html
+
+    def _has_embedded_data(self, html: str) -> bool:
+        """Check whether a page embeds its search results as JSON"""
+        return False
+
+    def _conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Ask the site to confirm a stale copy instead of sending the page again"""
+        headers = {}
+        if entry and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
 
     def _make_request(self, url: str) -> Optional[requests.Response]:
-        """Make an HTTP request with error handling and rate limiting"""
+        """Make an HTTP request with caching, error handling and rate limiting"""
+        cache = get_http_cache() if HTTP_CACHE_ENABLED else None
+        headers = {}
+        entry = None
+
+        if cache:
+            entry = cache.get(url)
+            if entry and cache.is_fresh(entry, self.source):
+                cache.record_hit()
+                return entry.to_response()
+            cache.record_miss()
+
+            headers = self._conditional_headers(entry)
+
+        limiter = get_rate_limiter()
+        host = urlparse(url).netloc
+
         try:
-            time.sleep(REQUEST_DELAY)  # Rate limiting
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+            for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                limiter.acquire(host)
+                response = self.session.get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+                backoff = limiter.record_response(host, response.status_code, response.headers.get('Retry-After'))
+
+                # Retry throttled requests once the host's backoff has passed
+                if response.status_code not in THROTTLE_STATUSES or backoff > RATE_LIMIT_MAX_WAIT:
+                    break
+                if attempt < RATE_LIMIT_MAX_RETRIES:
+                    print(f"{host} is throttling requests, retrying in {backoff:.1f} seconds")
+
+            if response.status_code == 304 and entry:
+                cache.revalidated(url)
+                return entry.to_response()
+
             response.raise_for_status()
+
+            if cache:
+                cache.put_response(url, self.source, response)
             return response
         except requests.exceptions.RequestException as e:
             print(f"Request error for {url}: {e}")
             return None
 
-    def _generate_property_id(self, property_data: Dict[str, Any]) -> str:
-        """Generate a unique ID for a property based on its data"""
-        id_string = f"{property_data.get('address', '')}-{property_data.get('city', '')}-{property_data.get('zip_code', '')}"
-        return hashlib.md5(id_string.encode()).hexdigest()
+    async def _make_request_async(self, url: str) -> Optional[str]:
+        """Fetch a page's text on the shared async client, with the same caching and rate limiting as _make_request"""
+        if not async_fetch_available():
+            response = await asyncio.to_thread(self._make_request, url)
+            return response.text if response else None
+
+        cache = get_http_cache() if HTTP_CACHE_ENABLED else None
+        headers = {}
+        entry = None
+
+        if cache:
+            entry = await asyncio.to_thread(cache.get, url)
+            if entry and cache.is_fresh(entry, self.source):
+                cache.record_hit()
+                return entry.text
+            cache.record_miss()
+
+            headers = self._conditional_headers(entry)
+
+        limiter = get_rate_limiter()
+        host = urlparse(url).netloc
+        client = get_async_client()
+
+        try:
+            for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                await limiter.acquire_async(host)
+                response = await client.get(url, headers=headers)
+                backoff = await limiter.record_response_async(host, response.status_code,
+                                                              response.headers.get('Retry-After'))
+
+                # Retry throttled requests once the host's backoff has passed
+                if response.status_code not in THROTTLE_STATUSES or backoff > RATE_LIMIT_MAX_WAIT:
+                    break
+                if attempt < RATE_LIMIT_MAX_RETRIES:
+                    print(f"{host} is throttling requests, retrying in {backoff:.1f} seconds")
+
+            if response.status_code == 304 and entry:
+                await asyncio.to_thread(cache.revalidated, url)
+                return entry.text
+
+            response.raise_for_status()
+
+            if cache:
+                await asyncio.to_thread(
+                    cache.put, url, str(response.url), self.source, response.content, response.encoding,
+                    response.headers.get('ETag'), response.headers.get('Last-Modified')
+                )
+            return response.text
+        except httpx.HTTPError as e:
+            print(f"Request error for {url}: {e}")
+            return None
+
+    async def _crawl(self, fetch_page: Callable[[int], Awaitable[Optional[str]]],
+                     parse_page: Callable[[str], List[Property]],
+                     max_pages: Optional[int] = None,
+                     max_results: Optional[int] = None) -> List[Property]:
+        """Collect properties from consecutive result pages.
+
+        Up to PAGE_FETCH_CONCURRENCY pages are fetched ahead while the current
+        page is parsed in a worker thread. Crawling stops at max_pages, once
+        max_results properties have been found, or at the first page that is
+        missing or adds no new listings. crawl_complete is then True only if
+        listings were found and a later page was fetched with nothing new,
+        i.e. every result was seen.
+        """
+        max_pages = max_pages or SEARCH_MAX_PAGES
+        self.crawl_complete = False
+        properties = []
+        seen_ids = set()
+        pending = deque()
+        next_page = 1
+
+        while next_page <= min(max_pages, PAGE_FETCH_CONCURRENCY):
+            pending.append(asyncio.ensure_future(fetch_page(next_page)))
+            next_page += 1
+
+        try:
+            while pending:
+                html = await pending.popleft()
+                page_properties = await asyncio.to_thread(parse_page, html) if html else []
+
+                new_properties = [p for p in page_properties if p.id not in seen_ids]
+                if not new_properties:
+                    # A page that failed to load may have had more results, and a first page without
+                    # any is more likely a block page than an empty search
+                    self.crawl_complete = html is not None and bool(properties)
+                    break
+
+                seen_ids.update(p.id for p in new_properties)
+                properties.extend(new_properties)
+
+                if max_results and len(properties) >= max_results:
+                    properties = properties[:max_results]
+                    break
+
+                if next_page <= max_pages:
+                    pending.append(asyncio.ensure_future(fetch_page(next_page)))
+                    next_page += 1
+        finally:
+            # Don't fetch pages queued past the point where we stopped
+            for task in pending:
+                task.cancel()
+
+        return properties
+
+    def _generate_property_id(self, address: str, city: str, zip_code: str) -> str:
+        """Generate a unique ID for a property from its address"""
+        return hashlib.md5(f"{address or ''}-{city or ''}-{zip_code or ''}".encode()).hexdigest()
 
-    def close(self):
-        """Close any open resources"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+    def search(self, location: str, min_price: float, max_price: float,
+               max_pages: Optional[int] = None, max_results: Optional[int] = None) -> List[Property]:
+        """Search for properties with the given criteria, blocking until the crawl finishes"""
+        return get_fetch_loop().run(self.search_async(location, min_price, max_price, max_pages, max_results))
 
     @abstractmethod
-    def search(self, location: str, min_price: float, max_price: float) -> List[Property]:
+    async def search_async(self, location: str, min_price: float, max_price: float,
+                           max_pages: Optional[int] = None, max_results: Optional[int] = None) -> List[Property]:
         """Search for properties with the given criteria"""
         pass
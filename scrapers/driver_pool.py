@@ -0,0 +1,389 @@
+import atexit
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config.settings import (
+    USER_AGENT, SELENIUM_POOL_SIZE, SELENIUM_PREWARM, SELENIUM_LEASE_TIMEOUT,
+    SELENIUM_MAX_PAGES, SELENIUM_MAX_MEMORY_MB, SELENIUM_PROBE_INTERVAL, CHROME_BINARY_NAMES
+)
+
+class DriverUnavailableError(RuntimeError):
+    """Raised when no browser can be leased, e.g. because the pool has shut down"""
+
+class LeaseTimeoutError(DriverUnavailableError):
+    """Raised when every browser stayed busy for the whole lease timeout"""
+
+class DriverStartError(DriverUnavailableError):
+    """Raised when Chrome could not be started"""
+
+class _PooledDriver:
+    """Bookkeeping for a browser owned by the pool"""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+class WebDriverPool:
+    """A process-wide pool of headless Chrome instances.
+
+    Scrapers lease a browser, load pages with it and hand it back. Browsers
+    are health-checked when they are leased and replaced after
+    SELENIUM_MAX_PAGES pages or once their JS heap grows past
+    SELENIUM_MAX_MEMORY_MB.
+    """
+
+    def __init__(self, size: int = SELENIUM_POOL_SIZE,
+                 max_pages: int = SELENIUM_MAX_PAGES,
+                 max_memory_mb: int = SELENIUM_MAX_MEMORY_MB):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self._idle: List[_PooledDriver] = []
+        self._leased: Dict[int, _PooledDriver] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._driver_path = None
+        self._closed = False
+        self._stats = {'created': 0, 'recycled': 0, 'failed': 0}
+
+    def _create_driver(self) -> webdriver.Chrome:
+        """Start a new headless Chrome"""
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument(f"user-agent={USER_AGENT}")
+
+        # Resolving the driver binary is slow, so only do it once per process
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+
+        service = Service(self._driver_path)
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+    def _start(self) -> _PooledDriver:
+        """Start a browser in a slot reserved by the caller, raising DriverStartError if Chrome fails"""
+        try:
+            entry = _PooledDriver(self._create_driver())
+        except Exception as e:
+            print(f"Failed to initialize Selenium: {e}")
+            with self._lock:
+                self._count -= 1
+                self._stats['failed'] += 1
+                self._available.notify()
+            raise DriverStartError(f"Chrome could not be started: {e}") from e
+
+        with self._lock:
+            self._stats['created'] += 1
+        return entry
+
+    def _reserve_slot(self) -> bool:
+        """Claim room for one more browser if the pool isn't full"""
+        with self._lock:
+            if self._closed or self._count >= self.size:
+                return False
+            self._count += 1
+            return True
+
+    def _discard(self, entry: _PooledDriver):
+        """Quit a browser and free its slot"""
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+        with self._lock:
+            self._count -= 1
+            self._available.notify()
+
+    def _put_idle(self, entry: _PooledDriver):
+        """Make a browser available to the next lease"""
+        with self._lock:
+            self._idle.append(entry)
+            self._available.notify()
+
+    def _is_healthy(self, entry: _PooledDriver) -> bool:
+        """Check that the browser session still responds"""
+        try:
+            entry.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _needs_recycling(self, entry: _PooledDriver) -> bool:
+        """Decide whether a browser has done enough work to be replaced"""
+        if entry.pages >= self.max_pages:
+            return True
+
+        try:
+            heap = entry.driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0"
+            )
+            return (heap or 0) / (1024 * 1024) >= self.max_memory_mb
+        except Exception:
+            return True
+
+    def acquire(self, timeout: float = SELENIUM_LEASE_TIMEOUT) -> webdriver.Chrome:
+        """Lease a browser, starting one if needed.
+
+        Raises DriverStartError if Chrome can't be started, LeaseTimeoutError
+        if no browser frees up in time and DriverUnavailableError once the
+        pool has shut down. Only the first says anything about whether this
+        host can run Selenium.
+        """
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._available:
+                # Wait for an idle browser or a free slot to start one in
+                while not self._closed and not self._idle and self._count >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LeaseTimeoutError(f"No Selenium browser was free within {timeout} seconds")
+                    self._available.wait(remaining)
+
+                if self._closed:
+                    raise DriverUnavailableError('The Selenium browser pool has shut down')
+
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    self._count += 1
+                    entry = None
+
+            if entry is None:
+                entry = self._start()
+            elif not self._is_healthy(entry):
+                self._discard(entry)
+                continue
+
+            with self._lock:
+                self._leased[id(entry.driver)] = entry
+            return entry.driver
+
+    def release(self, driver: webdriver.Chrome, pages: int = 1):
+        """Return a leased browser after it loaded the given number of pages"""
+        with self._lock:
+            entry = self._leased.pop(id(driver), None)
+
+        if entry is None:
+            return
+
+        entry.pages += pages
+
+        if self._closed or not self._is_healthy(entry) or self._needs_recycling(entry):
+            with self._lock:
+                self._stats['recycled'] += 1
+            self._discard(entry)
+            return
+
+        try:
+            # Drop the previous page so idle browsers don't hold its memory
+            driver.get('about:blank')
+        except Exception:
+            self._discard(entry)
+            return
+
+        self._put_idle(entry)
+
+    @contextmanager
+    def lease(self, timeout: float = SELENIUM_LEASE_TIMEOUT):
+        """Lease a browser for a with block, raising like acquire if none is available"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def warm(self, count: int = SELENIUM_PREWARM):
+        """Start up to count idle browsers so the first searches don't wait"""
+        for _ in range(max(0, count - len(self._idle))):
+            if not self._reserve_slot():
+                break
+
+            try:
+                entry = self._start()
+            except DriverStartError:
+                break
+
+            self._put_idle(entry)
+
+    def warm_in_background(self, count: int = SELENIUM_PREWARM) -> threading.Thread:
+        """Pre-warm the pool without blocking the caller"""
+        thread = threading.Thread(target=self.warm, args=(count,), name='webdriver-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the pool size and lifetime counters"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'running': self._count,
+                'idle': len(self._idle),
+                'leased': len(self._leased),
+                **self._stats
+            }
+
+    def shutdown(self):
+        """Quit every idle browser; leased ones are quit when they are released"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+
+        for entry in idle:
+            self._discard(entry)
+
+_pool: Optional[WebDriverPool] = None
+_pool_lock = threading.Lock()
+
+def get_driver_pool() -> WebDriverPool:
+    """Return the process-wide WebDriver pool"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+def find_chrome_binary() -> Optional[str]:
+    """Locate a Chrome or Chromium executable without starting it"""
+    configured = os.getenv('GOOGLE_CHROME_BIN')
+    if configured and os.path.exists(configured):
+        return configured
+
+    for name in CHROME_BINARY_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+
+    return None
+
+class BrowserCapability:
+    """Cached answer to "can this process run Selenium?".
+
+    The probe runs once (at startup in the web app, or on first use) and again
+    after SELENIUM_PROBE_INTERVAL seconds. Hosts without a Chrome binary are
+    put in requests-only mode without trying to install or start a driver.
+    """
+
+    def __init__(self, pool: WebDriverPool, interval: float = SELENIUM_PROBE_INTERVAL):
+        self.pool = pool
+        self.interval = interval
+        self._probe_lock = threading.Lock()
+        self._result: Optional[Dict[str, Any]] = None
+
+    def _run_probe(self) -> Dict[str, Any]:
+        """Check for Chrome and start one pooled browser to confirm it works"""
+        start = time.monotonic()
+        binary = find_chrome_binary()
+        error = None
+        available = False
+
+        if binary is None:
+            error = 'No Chrome or Chromium binary found'
+        else:
+            # A successful probe leaves a warm browser in the pool
+            try:
+                with self.pool.lease():
+                    available = True
+            except LeaseTimeoutError:
+                # Every browser is busy, which shows Chrome starts fine
+                available = True
+            except DriverUnavailableError as e:
+                error = str(e)
+
+        self._result = {
+            'mode': 'selenium' if available else 'requests',
+            'chrome_binary': binary,
+            'error': error,
+            'probed_at': time.time(),
+            'probe_seconds': round(time.monotonic() - start, 3),
+        }
+
+        print(f"Browser capability: {self._result['mode']} mode"
+              + (f" ({error})" if error else ""))
+        return self._result
+
+    def probe(self) -> Dict[str, Any]:
+        """Probe now, replacing any cached result"""
+        with self._probe_lock:
+            return self._run_probe()
+
+    def _refresh(self):
+        """Re-probe unless another thread is already doing it"""
+        if not self._probe_lock.acquire(blocking=False):
+            return
+        try:
+            if self._is_stale():
+                self._run_probe()
+        finally:
+            self._probe_lock.release()
+
+    def probe_in_background(self, warm: int = SELENIUM_PREWARM) -> threading.Thread:
+        """Probe, then pre-warm the pool if a browser is available, off the caller's thread"""
+        def run():
+            if self.probe()['mode'] == 'selenium' and warm > 0:
+                self.pool.warm(warm)
+
+        thread = threading.Thread(target=run, name='browser-probe', daemon=True)
+        thread.start()
+        return thread
+
+    def _is_stale(self) -> bool:
+        """True if there is no result yet or the last probe has expired"""
+        if self._result is None:
+            return True
+        return self.interval > 0 and time.time() - self._result['probed_at'] >= self.interval
+
+    def selenium_available(self) -> bool:
+        """Return the cached probe result, probing only when it has expired"""
+        if self._result is None:
+            with self._probe_lock:
+                if self._result is None:
+                    self._run_probe()
+        elif self._is_stale():
+            # Re-probe in the background and keep serving the previous answer
+            threading.Thread(target=self._refresh, name='browser-probe', daemon=True).start()
+
+        return self._result['mode'] == 'selenium'
+
+    def mark_unavailable(self, error: str):
+        """Switch to requests-only mode after a browser failed mid-search"""
+        self._result = {
+            **(self._result or {'chrome_binary': None, 'probe_seconds': 0.0}),
+            'mode': 'requests',
+            'error': error,
+            'probed_at': time.time(),
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """Report the chosen mode and when it was last probed"""
+        if self._result is None:
+            return {'mode': 'unknown', 'probed_at': None, 'probe_seconds': None}
+        return dict(self._result)
+
+_capability: Optional[BrowserCapability] = None
+
+def get_browser_capability() -> BrowserCapability:
+    """Return the process-wide browser capability cache"""
+    global _capability
+
+    pool = get_driver_pool()
+    with _pool_lock:
+        if _capability is None:
+            _capability = BrowserCapability(pool)
+        return _capability
@@ -0,0 +1,137 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+JSON_LD_PATTERN = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+# Zillow also ships its search state inside an HTML comment in a script tag
+COMMENT_JSON_PATTERN = re.compile(r'<!--\s*(\{.*?\})\s*-->', re.S)
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-z0-9]+')
+CAMEL_CASE_PATTERN = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+
+# Square feet per acre, for lot sizes reported in acres
+SQFT_PER_ACRE = 43560
+
+def _loads(text: str) -> Optional[Any]:
+    """Decode JSON, returning None for malformed payloads"""
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return None
+
+def extract_next_data(html: str) -> Optional[dict]:
+    """Return the decoded __NEXT_DATA__ payload of a Next.js page"""
+    match = NEXT_DATA_PATTERN.search(html)
+    return _loads(match.group(1)) if match else None
+
+def extract_comment_json(html: str, marker: str) -> Optional[dict]:
+    """Return the first JSON object embedded in an HTML comment that contains marker"""
+    for match in COMMENT_JSON_PATTERN.finditer(html):
+        if marker in match.group(1):
+            data = _loads(match.group(1))
+            if data is not None:
+                return data
+    return None
+
+def extract_json_ld(html: str) -> List[dict]:
+    """Return every JSON-LD object on a page, flattening lists and @graph blocks"""
+    objects = []
+
+    for match in JSON_LD_PATTERN.finditer(html):
+        data = _loads(match.group(1))
+        stack = data if isinstance(data, list) else [data]
+
+        for item in stack:
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get('@graph'), list):
+                objects.extend(i for i in item['@graph'] if isinstance(i, dict))
+            else:
+                objects.append(item)
+
+    return objects
+
+def dig(data: Any, *path, default: Any = None) -> Any:
+    """Follow a path of keys and list indexes, returning default if any step is missing"""
+    for key in path:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+        if data is None:
+            return default
+    return data
+
+def iter_key(data: Any, key: str) -> Iterator[Any]:
+    """Yield every value stored under key anywhere in a decoded JSON document"""
+    stack = [data]
+
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if key in item:
+                yield item[key]
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+def to_float(value: Any) -> Optional[float]:
+    """Convert numbers and strings like "$450,000" or "2.5 ba" to a float"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = NUMBER_PATTERN.search(str(value).replace(',', ''))
+    return float(match.group(0)) if match else None
+
+def to_int(value: Any) -> Optional[int]:
+    """Convert a number or numeric string to an int"""
+    number = to_float(value)
+    return int(number) if number is not None else None
+
+def to_coordinates(latitude: Any, longitude: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Convert a latitude and longitude, returning (None, None) unless both are valid.
+    
+    Some Zillow payloads give coordinates in millionths of a degree.
+    """
+    lat, lon = to_float(latitude), to_float(longitude)
+    if lat is None or lon is None:
+        return None, None
+
+    if abs(lat) > 1000 or abs(lon) > 1000:
+        lat, lon = lat / 1e6, lon / 1e6
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None, None
+    return lat, lon
+
+def to_datetime(value: Any) -> Optional[datetime]:
+    """Parse an ISO 8601 date or timestamp"""
+    if not value:
+        return None
+
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def _snake_case(value: Any) -> Optional[str]:
+    """Convert labels like "SINGLE_FAMILY", "Single Family" or "SingleFamilyResidence" to snake case"""
+    value = CAMEL_CASE_PATTERN.sub('_', str(value).strip())
+    return NON_ALPHANUMERIC_PATTERN.sub('_', value.lower()).strip('_') or None
+
+def normalize_property_type(value: Any) -> Optional[str]:
+    """Normalize types like "SINGLE_FAMILY" or "Single Family" to snake case"""
+    if not value:
+        return None
+    if isinstance(value, list):
+        value = next((v for v in value if v not in ('Product', 'Offer')), None)
+        if not value:
+            return None
+    return _snake_case(value)
+
+def normalize_status(value: Any) -> Optional[str]:
+    """Normalize listing statuses like "FOR_SALE" or "Pending" to snake case"""
+    return _snake_case(value) if value else None
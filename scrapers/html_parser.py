@@ -0,0 +1,54 @@
+from typing import Dict, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer, FeatureNotFound
+from bs4.element import Tag
+
+from config.settings import HTML_PARSER
+
+_parser_backend: Optional[str] = None
+
+def get_parser_backend() -> str:
+    """Return the configured tree builder, or html.parser if it isn't installed"""
+    global _parser_backend
+
+    if _parser_backend is None:
+        try:
+            BeautifulSoup('', HTML_PARSER)
+            _parser_backend = HTML_PARSER
+        except FeatureNotFound:
+            print(f"HTML parser '{HTML_PARSER}' is not available, falling back to html.parser")
+            _parser_backend = 'html.parser'
+
+    return _parser_backend
+
+def parse_html(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse a document with the configured backend"""
+    return BeautifulSoup(html, get_parser_backend(), parse_only=parse_only)
+
+def class_strainer(class_name: str) -> SoupStrainer:
+    """Build a strainer for elements having a class, whatever other classes they carry"""
+    # Class attributes aren't split into lists until after straining, so match the raw value
+    return SoupStrainer(class_=lambda value: bool(value) and class_name in value.split())
+
+class CardParser:
+    """Extracts listing cards from a search results page.
+
+    Only the card containers matched by the strainer are built into the tree,
+    and the card and field selectors are compiled once per source instead of
+    on every select() call.
+    """
+
+    def __init__(self, strainer: SoupStrainer, card_selector: str, fields: Dict[str, str]):
+        self.strainer = strainer
+        self.card_selector = soupsieve.compile(card_selector)
+        self.fields = {name: soupsieve.compile(selector) for name, selector in fields.items()}
+
+    def cards(self, html: str) -> List[Tag]:
+        """Return the listing cards on a page"""
+        soup = parse_html(html, self.strainer)
+        return self.card_selector.select(soup)
+
+    def field(self, card: Tag, name: str) -> Optional[Tag]:
+        """Return the first element in a card matching a field's selector"""
+        return self.fields[name].select_one(card)
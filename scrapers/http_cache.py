@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config.settings import (
+    HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_DEFAULT_TTL, HTTP_CACHE_TTL
+)
+from database.db_handler import get_pool
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    body: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def text(self) -> str:
+        """Decode the cached body"""
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    def to_response(self) -> requests.Response:
+        """Rebuild a requests.Response so callers can't tell it came from the cache"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response._content = self.body
+        response.encoding = self.encoding
+        response.headers = CaseInsensitiveDict({
+            k: v for k, v in (('ETag', self.etag), ('Last-Modified', self.last_modified)) if v
+        })
+        return response
+
+class HttpCache:
+    """An on-disk cache of fetched pages with per-source TTLs and LRU eviction.
+
+    Entries past their TTL are kept so they can be revalidated with
+    If-None-Match/If-Modified-Since instead of being downloaded again.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.pool = get_pool(path)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+        self._ensure_table()
+
+    def _ensure_table(self):
+        """Create the cache table if it doesn't exist"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        with self.pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                source TEXT,
+                body BLOB NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed_at)')
+            conn.commit()
+
+    def _count(self, stat: str):
+        """Increment one of the hit/miss counters"""
+        with self._lock:
+            self._stats[stat] += 1
+
+    def record_hit(self):
+        """Count a request answered from the cache"""
+        self._count('hits')
+
+    def record_miss(self):
+        """Count a request that had to go to the site"""
+        self._count('misses')
+
+    def ttl(self, source: str) -> float:
+        """Return how long pages from a source stay fresh"""
+        return HTTP_CACHE_TTL.get(source, HTTP_CACHE_DEFAULT_TTL)
+
+    def is_fresh(self, entry: CacheEntry, source: str) -> bool:
+        """True if an entry can be served without contacting the site"""
+        return time.time() - entry.stored_at < self.ttl(source)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry, fresh or not, and mark it as recently used"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                'SELECT key, url, body, encoding, etag, last_modified, stored_at FROM http_cache WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            conn.execute('UPDATE http_cache SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            conn.commit()
+
+        return CacheEntry(**dict(row))
+
+    def lookup(self, key: str, source: str) -> Optional[CacheEntry]:
+        """Return a fresh entry, counting the hit or miss"""
+        entry = self.get(key)
+
+        if entry is not None and self.is_fresh(entry, source):
+            self.record_hit()
+            return entry
+
+        self.record_miss()
+        return None
+
+    def put(self, key: str, url: str, source: str, body: bytes, encoding: Optional[str] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a page, evicting least recently used pages if the cache is full"""
+        now = time.time()
+
+        with self.pool.connection() as conn:
+            conn.execute('''
+            INSERT OR REPLACE INTO http_cache
+                (key, url, source, body, encoding, etag, last_modified, stored_at, accessed_at, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, url, source, body, encoding, etag, last_modified, now, now, len(body)))
+            self._evict(conn)
+            conn.commit()
+
+        self._count('stores')
+
+    def put_response(self, key: str, source: str, response: requests.Response):
+        """Store a successful response along with its validators"""
+        self.put(key, response.url or key, source, response.content, response.encoding,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def revalidated(self, key: str):
+        """Restart an entry's TTL after the site answered 304 Not Modified"""
+        with self.pool.connection() as conn:
+            conn.execute('UPDATE http_cache SET stored_at = ? WHERE key = ?', (time.time(), key))
+            conn.commit()
+
+        self._count('revalidated')
+
+    def _evict(self, conn):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for row in conn.execute('SELECT key, size FROM http_cache ORDER BY accessed_at'):
+            victims.append((row['key'],))
+            freed += row['size']
+            if freed >= excess:
+                break
+
+        conn.executemany('DELETE FROM http_cache WHERE key = ?', victims)
+        with self._lock:
+            self._stats['evictions'] += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report hit/miss counters for this process"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+def get_http_cache() -> HttpCache:
+    """Return the process-wide HTTP cache"""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
@@ -0,0 +1,159 @@
+import asyncio
+import atexit
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Dict, Any, Coroutine, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    USER_AGENT, REQUEST_TIMEOUT, HTTP_POOL_MAXSIZE, HTTP_MAX_CONNECTIONS, HTTP2_ENABLED,
+    ASYNC_FETCH_ENABLED
+)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - httpx only needs it importable to negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Return the process-wide requests session, so connections outlive a single search"""
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(DEFAULT_HEADERS)
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def async_fetch_available() -> bool:
+    """True if pages can be fetched with the async client"""
+    return ASYNC_FETCH_ENABLED and httpx is not None
+
+# httpx clients are bound to the event loop they were first used on
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+
+def get_async_client() -> 'httpx.AsyncClient':
+    """Return the async client for the running event loop, creating it on first use.
+
+    The client keeps a keep-alive pool per host and negotiates HTTP/2 with
+    servers that support it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            http2=HTTP2_ENABLED and HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+        )
+
+    return client
+
+class FetchLoop:
+    """An event loop on a background thread that runs every scraper's crawl.
+
+    Blocking callers hand it coroutines and wait on the result, so all
+    searches in the process share the loop's async client and its
+    connections, and one worker can keep many fetches in flight.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='fetch-loop', daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the loop; cancelling the future cancels the coroutine"""
+        loop = self._ensure_started()
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("Blocking scraper calls can't be made from the fetch loop; await the async API instead")
+
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block until it finishes"""
+        return self.submit(coro).result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report whether the loop is running and which HTTP versions it can use"""
+        return {
+            'async': async_fetch_available(),
+            'http2': HTTP2_ENABLED and HTTP2_AVAILABLE and async_fetch_available(),
+            'running': self._loop is not None,
+        }
+
+    def shutdown(self):
+        """Close the loop's client and stop the loop thread"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+
+        if loop is None:
+            return
+
+        async def close_client():
+            client = _clients.pop(loop, None)
+            if client is not None:
+                await client.aclose()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_client(), loop).result(5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        if not thread.is_alive():
+            loop.close()
+
+_fetch_loop: Optional[FetchLoop] = None
+_fetch_loop_lock = threading.Lock()
+
+def get_fetch_loop() -> FetchLoop:
+    """Return the process-wide fetch loop"""
+    global _fetch_loop
+
+    with _fetch_loop_lock:
+        if _fetch_loop is None:
+            _fetch_loop = FetchLoop()
+            atexit.register(_fetch_loop.shutdown)
+        return _fetch_loop
@@ -0,0 +1,227 @@
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Any, Optional, Tuple
+
+from config.settings import JOB_WORKERS, JOB_QUEUE_MAX, LISTING_TOUCH_INTERVAL
+from database.db_handler import DatabaseHandler
+from database.job_store import JobStore
+from models.property import Property
+from scrapers.orchestrator import run_search, SourceResult
+from utils.helpers import search_key
+from utils.single_flight import SingleFlight, get_single_flight
+
+# How a search may use stored listings: fresh ones only, never, or exclusively
+SEARCH_CACHE_MODES = ('auto', 'refresh', 'only')
+
+# Jobs whose update counters are kept for wait_for_change
+MAX_TRACKED_JOBS = 1000
+
+class QueueFullError(RuntimeError):
+    """Raised when too many searches are already waiting for a worker"""
+
+@dataclass
+class SearchParams:
+    location: str
+    min_price: float
+    max_price: float
+    sources: List[str] = field(default_factory=list)
+    max_pages: Optional[int] = None
+    max_results: Optional[int] = None
+    cached_sources: List[str] = field(default_factory=list)  # Answered from stored listings instead
+    cache_max_age: Optional[float] = None  # Oldest complete scrape served for a cached source; None serves any listing
+
+    def key(self) -> str:
+        """Identify searches that would scrape exactly the same pages"""
+        base = search_key(self.location, self.min_price, self.max_price, self.sources)
+        cached = ','.join(sorted(self.cached_sources))
+        return f"job:{base}|{self.max_pages}|{self.max_results}|{cached}|{self.cache_max_age}"
+
+class JobQueue:
+    """Runs searches on a bounded set of background workers.
+
+    Submitting a search that is already queued or running returns the
+    existing job instead of scraping the same pages twice; with shared
+    single-flight leases this holds across worker processes as well. Each
+    source's results are saved as soon as it finishes, so clients can show
+    partial results while slower sources are still being scraped.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_QUEUE_MAX, flights: Optional[SingleFlight] = None):
+        self.store = store or JobStore()
+        self.flights = flights or get_single_flight()
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._versions: Dict[str, int] = {}  # job id -> number of updates so far
+        self._active = 0  # Jobs queued or running
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._stats = {'submitted': 0, 'coalesced': 0, 'completed': 0, 'failed': 0}
+
+    def _ensure_workers(self):
+        """Start the worker threads on first use"""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'search-worker-{len(self._threads)}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, params: SearchParams) -> Tuple[str, bool]:
+        """Queue a search; returns the job id and whether it joined an existing job"""
+        key = params.key()
+
+        with self._lock:
+            # The job row exists before the claim makes its id visible, so anyone coalesced onto it can read it
+            job_id = uuid.uuid4().hex
+            self.store.create(job_id, key, asdict(params))
+            try:
+                existing = self.flights.claim(key, job_id)
+            except Exception:
+                self.store.delete(job_id)
+                raise
+
+            if existing is not None:
+                self.store.delete(job_id)
+                self._stats['coalesced'] += 1
+                return existing, True
+
+            if params.sources and self._queue.full():
+                self.store.delete(job_id)
+                self.flights.release(key)
+                raise QueueFullError('Too many searches are waiting; try again shortly')
+
+            self._versions[job_id] = 0
+            # Update counters are only needed while clients may still be waiting on a job
+            while len(self._versions) > MAX_TRACKED_JOBS:
+                del self._versions[next(iter(self._versions))]
+            self._stats['submitted'] += 1
+
+        # Cached sources are recorded before the job is queued so they are in place when it finishes
+        if params.cached_sources:
+            self._record_cached(job_id, params)
+
+        if not params.sources:
+            # Everything was answered from stored listings, so there is nothing to scrape
+            self.store.finish(job_id, 'done')
+            self.flights.release(key)
+            with self._lock:
+                self._stats['completed'] += 1
+            return job_id, False
+
+        with self._lock:
+            try:
+                self._queue.put_nowait((job_id, key, params))
+            except queue.Full:
+                self.store.finish(job_id, 'failed', 'Too many searches are waiting')
+                self.flights.release(key)
+                raise QueueFullError('Too many searches are waiting; try again shortly')
+            self._active += 1
+            self._ensure_workers()
+
+        return job_id, False
+
+    def _record_cached(self, job_id: str, params: SearchParams):
+        """Record the stored listings for each cached source as that source's result"""
+        db = DatabaseHandler()
+        last_scraped = db.last_scraped(params.location, params.min_price, params.max_price, params.cached_sources)
+
+        for source in params.cached_sources:
+            scraped_at = last_scraped.get(source)
+            scraped_since = None
+            if params.cache_max_age is not None and scraped_at is not None:
+                # Listings that scrape saw unchanged keep a date_scraped up to one touch interval older
+                scraped_since = scraped_at - timedelta(seconds=LISTING_TOUCH_INTERVAL)
+
+            rows = db.get_properties(params.location, params.min_price, params.max_price,
+                                     sources=[source], scraped_since=scraped_since)
+            properties = [Property.from_dict(row).to_dict() for row in rows]
+            self.store.record_source(job_id, source, 'ok', properties, served_from='cache',
+                                     scraped_at=scraped_at.isoformat() if scraped_at else None)
+
+        self._notify(job_id)
+
+    def _notify(self, job_id: str):
+        """Wake up anyone waiting for this job to change"""
+        with self._changed:
+            self._versions[job_id] = self._versions.get(job_id, 0) + 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, job_id: str, version: int, timeout: float) -> int:
+        """Block until a job local to this process has more than version updates.
+
+        Returns the current version, which is unchanged if the timeout passed
+        first or the job is running in another process.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._versions.get(job_id, 0) > version, timeout)
+            return self._versions.get(job_id, 0)
+
+    def _work(self):
+        """Take jobs off the queue until the process exits"""
+        while True:
+            job_id, key, params = self._queue.get()
+            try:
+                self._run(job_id, params)
+            finally:
+                self.flights.release(key)
+                with self._lock:
+                    self._active -= 1
+                self._notify(job_id)
+                self._queue.task_done()
+
+    def _run(self, job_id: str, params: SearchParams):
+        """Scrape a search, saving each source's results as they arrive"""
+        self.store.start(job_id)
+        self._notify(job_id)
+        db = DatabaseHandler()
+        started_at = datetime.now()
+
+        def on_result(result: SourceResult):
+            db.insert_properties(result.properties)
+            if result.status == 'ok' and result.complete:
+                # Later searches within this one can now be answered from the database
+                db.record_scrape(params.location, params.min_price, params.max_price, result.source, started_at)
+            self.store.record_source(job_id, result.source, result.status,
+                                     [prop.to_dict() for prop in result.properties],
+                                     result.error, result.elapsed,
+                                     served_from='live', scraped_at=datetime.now().isoformat())
+            self._notify(job_id)
+
+        try:
+            run_search(params.location, params.min_price, params.max_price, params.sources,
+                       max_pages=params.max_pages, max_results=params.max_results,
+                       on_result=on_result)
+            self.store.finish(job_id, 'done')
+            status = 'completed'
+        except Exception as e:
+            print(f"Search job {job_id} failed: {e}")
+            self.store.finish(job_id, 'failed', str(e))
+            status = 'failed'
+
+        with self._lock:
+            self._stats[status] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Report queue depth and lifetime counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'active': self._active,
+                **self._stats
+            }
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue"""
+    global _job_queue
+
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
@@ -0,0 +1,157 @@
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable
+
+from scrapers.zillow_scraper import ZillowScraper
+from scrapers.realtor_scraper import RealtorScraper
+from scrapers.redfin_scraper import RedfinScraper
+from scrapers.http_client import get_fetch_loop
+from models.property import Property
+from config.settings import SEARCH_TIMEOUT, SOURCE_TIMEOUTS
+from utils.helpers import format_price
+
+# Registry of the available sources, in display order
+SCRAPERS = {
+    'zillow': ZillowScraper,
+    'realtor': RealtorScraper,
+    'redfin': RedfinScraper,
+}
+
+SOURCE_LABELS = {
+    'zillow': 'Zillow',
+    'realtor': 'Realtor.com',
+    'redfin': 'Redfin',
+}
+
+@dataclass
+class SourceResult:
+    source: str
+    status: str = 'pending'  # 'ok', 'error' or 'timeout'
+    properties: List[Property] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    complete: bool = False  # True if every result page was crawled, not cut short by a limit or error
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the outcome for a source without its properties"""
+        return {
+            'status': self.status,
+            'count': len(self.properties),
+            'error': self.error,
+            'elapsed': round(self.elapsed, 3),
+        }
+
+@dataclass
+class SearchResult:
+    sources: Dict[str, SourceResult] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def properties(self) -> List[Property]:
+        """All properties from the sources that finished, in source order"""
+        result = []
+        for source_result in self.sources.values():
+            result.extend(source_result.properties)
+        return result
+
+    @property
+    def partial(self) -> bool:
+        """True if any source failed or missed its deadline"""
+        return any(r.status != 'ok' for r in self.sources.values())
+
+def select_sources(sources: List[str]) -> List[str]:
+    """Return the known sources from a list of names, in registry order"""
+    requested = {s.strip().lower() for s in sources}
+    return [s for s in SCRAPERS if s in requested]
+
+async def _scrape_source(source: str, location: str, min_price: float, max_price: float,
+                         max_pages: Optional[int] = None, max_results: Optional[int] = None) -> SourceResult:
+    """Run a single scraper and capture its outcome"""
+    start = time.monotonic()
+    result = SourceResult(source=source)
+
+    try:
+        scraper = SCRAPERS[source]()
+        result.properties = await scraper.search_async(location, min_price, max_price, max_pages, max_results)
+        result.status = 'ok'
+        result.complete = scraper.crawl_complete
+    except Exception as e:
+        print(f"Error scraping {SOURCE_LABELS[source]}: {e}")
+        result.status = 'error'
+        result.error = str(e)
+    finally:
+        result.elapsed = time.monotonic() - start
+
+    return result
+
+def run_search(location: str, min_price: float, max_price: float, sources: List[str],
+               timeouts: Optional[Dict[str, float]] = None,
+               max_pages: Optional[int] = None, max_results: Optional[int] = None,
+               on_result: Optional[Callable[[SourceResult], None]] = None) -> SearchResult:
+    """Scrape the selected sources concurrently on the shared fetch loop.
+
+    Each source gets its own deadline, measured from the start of the search.
+    Sources that miss their deadline are cancelled and reported as 'timeout',
+    and the results from the other sources are returned without waiting for them.
+    max_pages and max_results bound how much of each source is crawled.
+    on_result is called with each source's outcome as soon as it is known.
+    """
+    selected = select_sources(sources)
+    timeouts = {**SOURCE_TIMEOUTS, **(timeouts or {})}
+    search_result = SearchResult()
+
+    if not selected:
+        return search_result
+
+    start = time.monotonic()
+    fetch_loop = get_fetch_loop()
+    pending = {}
+    outcomes = {}
+
+    for source in selected:
+        print(f"Scraping {SOURCE_LABELS[source]} for properties in {location} between {format_price(min_price)} and {format_price(max_price)}...")
+        future = fetch_loop.submit(_scrape_source(source, location, min_price, max_price,
+                                                  max_pages, max_results))
+        pending[future] = source
+
+    def deadline(source: str) -> float:
+        return start + timeouts.get(source, SEARCH_TIMEOUT)
+
+    while pending:
+        next_deadline = min(deadline(source) for source in pending.values())
+        done, _ = wait(pending, timeout=max(0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+
+        finished = []
+        for future in done:
+            source = pending.pop(future)
+            source_result = future.result()
+            if source_result.status == 'ok':
+                print(f"Found {len(source_result.properties)} properties on {SOURCE_LABELS[source]}")
+            finished.append(source_result)
+
+        now = time.monotonic()
+        for future, source in list(pending.items()):
+            if deadline(source) > now:
+                continue
+
+            # Stop the crawl so it doesn't keep fetching pages nobody will read
+            future.cancel()
+            del pending[future]
+            print(f"{SOURCE_LABELS[source]} did not finish within {timeouts.get(source, SEARCH_TIMEOUT)} seconds")
+            finished.append(SourceResult(
+                source=source,
+                status='timeout',
+                error='Source did not respond before its deadline',
+                elapsed=now - start
+            ))
+
+        for source_result in finished:
+            outcomes[source_result.source] = source_result
+            if on_result:
+                on_result(source_result)
+
+    # Report sources in registry order regardless of which finished first
+    search_result.sources = {source: outcomes[source] for source in selected}
+    search_result.elapsed = time.monotonic() - start
+    return search_result
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Any, Optional
+
+from config.settings import (
+    RATE_LIMIT_DEFAULT, RATE_LIMITS, RATE_LIMIT_SHARED, RATE_LIMIT_STATE_PATH
+)
+from database.db_handler import get_pool
+
+# Responses that mean the site wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# Bounds for the adaptive slowdown applied after throttling responses
+MIN_RATE_FACTOR = 1 / 16
+RATE_RECOVERY_STEP = 0.05
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+    rate_factor: float = 1.0
+    blocked_until: float = 0.0
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or an HTTP date) into seconds from now"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RateLimiter:
+    """A token bucket per host, shared by every scraper in the process.
+
+    Each host refills at its configured rate up to its burst size. A 429 or
+    503 response halves the host's rate and blocks it until Retry-After has
+    passed; successful responses slowly restore the configured rate. With
+    shared_path set, bucket state lives in SQLite so all worker processes
+    draw from the same buckets. clock returns the current time in seconds
+    and is only replaced in tests.
+    """
+
+    def __init__(self, limits: Dict[str, tuple] = None, default: tuple = RATE_LIMIT_DEFAULT,
+                 shared_path: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.limits = limits if limits is not None else RATE_LIMITS
+        self.default = default
+        self.shared_path = shared_path
+        self.clock = clock
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'delayed': 0, 'throttled': 0}
+
+        if shared_path:
+            os.makedirs(os.path.dirname(os.path.abspath(shared_path)), exist_ok=True)
+            self.pool = get_pool(shared_path)
+            with self.pool.connection() as conn:
+                conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    host TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    rate_factor REAL NOT NULL,
+                    blocked_until REAL NOT NULL
+                )
+                ''')
+                conn.commit()
+
+    def _limit(self, host: str) -> tuple:
+        """Return (rate, burst) for a host"""
+        return self.limits.get(host, self.default)
+
+    @contextmanager
+    def _bucket(self, host: str):
+        """Load a host's bucket, let the caller update it, then save it atomically"""
+        rate, burst = self._limit(host)
+        now = self.clock()
+
+        if not self.shared_path:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    bucket = self._buckets[host] = _Bucket(tokens=burst, updated_at=now)
+                yield bucket
+            return
+
+        with self.pool.connection() as conn:
+            # BEGIN IMMEDIATE serializes bucket updates across processes
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT tokens, updated_at, rate_factor, blocked_until FROM rate_limits WHERE host = ?',
+                    (host,)
+                ).fetchone()
+                bucket = _Bucket(**dict(row)) if row else _Bucket(tokens=burst, updated_at=now)
+
+                yield bucket
+
+                conn.execute('''
+                INSERT OR REPLACE INTO rate_limits (host, tokens, updated_at, rate_factor, blocked_until)
+                VALUES (?, ?, ?, ?, ?)
+                ''', (host, bucket.tokens, bucket.updated_at, bucket.rate_factor, bucket.blocked_until))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def reserve(self, host: str) -> float:
+        """Take a token for host and return how many seconds to wait before using it.
+
+        Tokens may go negative, which queues callers behind each other instead
+        of having them poll the bucket.
+        """
+        rate, burst = self._limit(host)
+
+        with self._bucket(host) as bucket:
+            now = self.clock()
+            effective_rate = rate * bucket.rate_factor
+
+            bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated_at) * effective_rate)
+            bucket.updated_at = now
+            bucket.tokens -= 1
+
+            wait = -bucket.tokens / effective_rate if bucket.tokens < 0 else 0.0
+            wait = max(wait, bucket.blocked_until - now)
+
+        with self._lock:
+            self._stats['requests'] += 1
+            if wait > 0:
+                self._stats['delayed'] += 1
+
+        return wait
+
+    def acquire(self, host: str):
+        """Block until a request to host is allowed"""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, host: str):
+        """Wait until a request to host is allowed without blocking the event loop"""
+        # Shared buckets live in SQLite, so take the token off the loop thread
+        wait = await asyncio.to_thread(self.reserve, host) if self.shared_path else self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record_response(self, host: str, status_code: int, retry_after: Optional[str] = None) -> float:
+        """Adapt the host's rate to a response; returns the backoff in seconds, if any"""
+        rate, _ = self._limit(host)
+
+        with self._bucket(host) as bucket:
+            now = self.clock()
+
+            if status_code not in THROTTLE_STATUSES:
+                bucket.rate_factor = min(1.0, bucket.rate_factor + RATE_RECOVERY_STEP)
+                return 0.0
+
+            bucket.rate_factor = max(MIN_RATE_FACTOR, bucket.rate_factor / 2)
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                delay = 1 / (rate * bucket.rate_factor)
+
+            bucket.blocked_until = max(bucket.blocked_until, now + delay)
+
+        with self._lock:
+            self._stats['throttled'] += 1
+
+        return delay
+
+    async def record_response_async(self, host: str, status_code: int, retry_after: Optional[str] = None) -> float:
+        """Adapt the host's rate to a response without blocking the event loop"""
+        # Shared buckets are updated in SQLite, so write them off the loop thread
+        if self.shared_path:
+            return await asyncio.to_thread(self.record_response, host, status_code, retry_after)
+        return self.record_response(host, status_code, retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report request counters and the state of this process's buckets"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['hosts'] = {
+                host: {
+                    'tokens': round(bucket.tokens, 2),
+                    'rate': round(self._limit(host)[0] * bucket.rate_factor, 3),
+                    'blocked_for': round(max(0.0, bucket.blocked_until - self.clock()), 1),
+                }
+                for host, bucket in self._buckets.items()
+            }
+        stats['shared'] = bool(self.shared_path)
+        return stats
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter"""
+    global _limiter
+
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(shared_path=RATE_LIMIT_STATE_PATH if RATE_LIMIT_SHARED else None)
+        return _limiter
@@ -1,23 +1,43 @@
-import json
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
 from datetime import datetime
-import urllib.parse
 
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.html_parser import CardParser
+from scrapers.embedded_data import (
+    extract_next_data, dig, to_float, to_int, to_datetime, to_coordinates, normalize_property_type,
+    normalize_status
+)
 from models.property import Property
+from utils.helpers import STATE_ABBREVIATIONS
+from utils.listing_parser import parse_address_line, parse_number, parse_price
+
+# Realtor.com result cards and the fields read from each one
+CARDS = CardParser(
+    strainer=SoupStrainer('div', attrs={'data-testid': 'property-card'}),
+    card_selector="div[data-testid='property-card']",
+    fields={
+        'price': "span[data-testid='property-price']",
+        'address': "div[data-testid='property-address']",
+        'link': "a[data-testid='property-anchor']",
+        'beds': "li[data-testid='property-meta-beds']",
+        'baths': "li[data-testid='property-meta-baths']",
+        'sqft': "li[data-testid='property-meta-sqft']",
+        'value': "span",
+    }
+)
 
 class RealtorScraper(BaseScraper):
+    source = 'realtor'
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.realtor.com"
 
-    def search(self, location: str, min_price: float, max_price: float) -> List[Property]:
+    async def search_async(self, location: str, min_price: float, max_price: float,
+                           max_pages: Optional[int] = None, max_results: Optional[int] = None) -> List[Property]:
         """Search for properties on Realtor.com with the given criteria"""
-        properties = []
-
         # Format the location for the URL (city-state format)
         formatted_location = self._format_location(location)
 
@@ -30,46 +50,137 @@ class RealtorScraper(BaseScraper):
             else:
                 search_url += f"?{price_param}"
         else:
+            price_param = None
             search_url = f"{self.base_url}/homes-for-sale/{formatted_location}"
 
-        print(f"Searching Realtor.com with URL: {search_url}")
+        alt_search_url = f"{self.base_url}/realestateandhomes-search/{formatted_location}"
+
+        async def fetch_page(page: int) -> Optional[str]:
+            if page > 1:
+                # Later pages are only served by the search URL format
+                page_url = f"{alt_search_url}/{price_param}/pg-{page}" if price_param else f"{alt_search_url}/pg-{page}"
+                return await self._make_request_async(page_url)
+
+            print(f"Searching Realtor.com with URL: {search_url}")
+
+            # Make the request
+            html = await self._make_request_async(search_url)
+            if not html:
+                # Try an alternative URL format if the first one fails
+                print(f"Trying alternative Realtor.com URL: {alt_search_url}")
+                html = await self._make_request_async(alt_search_url)
+
+            return html
+
+        return await self._crawl(fetch_page, self._parse_page, max_pages, max_results)
+
+    def _parse_page(self, html: str) -> List[Property]:
+        """Parse a Realtor.com results page, preferring its embedded JSON over the cards"""
+        properties = self._parse_embedded(html)
+        if properties is None:
+            properties = self._parse_cards(html)
+        return properties
+
+    def _parse_embedded(self, html: str) -> Optional[List[Property]]:
+        """Map the search results in Realtor.com's __NEXT_DATA__ payload to properties.
+
+        Returns None if the page has no search results payload, so the caller
+        can fall back to the property cards.
+        """
+        data = extract_next_data(html)
+        results = (dig(data, 'props', 'pageProps', 'properties')
+                   or dig(data, 'props', 'pageProps', 'searchResults', 'home_search', 'results'))
+        if not isinstance(results, list):
+            return None
+
+        properties = []
+
+        for result in results:
+            try:
+                location = dig(result, 'location', 'address', default={})
+                description = result.get('description') or {}
+
+                address = location.get('line') or ''
+                city = location.get('city') or ''
+                state = location.get('state_code') or location.get('state') or ''
+                zip_code = location.get('postal_code') or ''
+
+                price = to_float(result.get('list_price'))
+                if not address or price is None:
+                    continue
+
+                property_url = result.get('href') or ''
+                if not property_url and result.get('permalink'):
+                    property_url = f"/realestateandhomes-detail/{result['permalink']}"
+                if property_url and not property_url.startswith('http'):
+                    property_url = self.base_url + property_url
+
+                image_urls = [p['href'] for p in result.get('photos') or [] if p.get('href')]
+                if not image_urls and dig(result, 'primary_photo', 'href'):
+                    image_urls = [result['primary_photo']['href']]
 
-        # Make the request
-        response = self._make_request(search_url)
-        if not response:
-            # Try an alternative URL format if the first one fails
-            alt_search_url = f"{self.base_url}/realestateandhomes-search/{formatted_location}"
-            print(f"Trying alternative Realtor.com URL: {alt_search_url}")
-            response = self._make_request(alt_search_url)
-            if not response:
-                return properties
+                latitude, longitude = to_coordinates(dig(location, 'coordinate', 'lat'), dig(location, 'coordinate', 'lon'))
 
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+                property_id = self._generate_property_id(address, city, zip_code)
+
+                properties.append(Property(
+                    id=property_id,
+                    source='realtor',
+                    url=property_url,
+                    address=address,
+                    city=city,
+                    state=state,
+                    zip_code=zip_code,
+                    price=price,
+                    bedrooms=to_float(description.get('beds')) or 0,
+                    bathrooms=to_float(description.get('baths_consolidated') or description.get('baths')) or 0,
+                    square_feet=to_float(description.get('sqft')),
+                    lot_size=to_float(description.get('lot_sqft')),
+                    year_built=to_int(description.get('year_built')),
+                    property_type=normalize_property_type(description.get('type')),
+                    description=description.get('text'),
+                    image_urls=image_urls or None,
+                    date_listed=to_datetime(result.get('list_date')),
+                    date_scraped=datetime.now(),
+                    status=normalize_status(result.get('status')),
+                    latitude=latitude,
+                    longitude=longitude
+                ))
+
+            except Exception as e:
+                print(f"Error parsing Realtor.com search result: {e}")
+                continue
+
+        return properties
+
+    def _parse_cards(self, html: str) -> List[Property]:
+        """Parse the property cards on a Realtor.com results page"""
+        properties = []
 
         # Find the property cards - Realtor.com uses data attributes
-        property_cards = soup.select("div[data-testid='property-card']")
+        property_cards = CARDS.cards(html)
 
         for card in property_cards:
             try:
                 # Extract the price
-                price_elem = card.select_one("span[data-testid='property-price']")
+                price_elem = CARDS.field(card, 'price')
                 if not price_elem:
                     continue
 
-                price_text = price_elem.text.strip()
-                price = float(re.sub(r'[^\d.]', '', price_text))
+                price = parse_price(price_elem.text.strip())
+                if price is None:
+                    continue
 
                 # Extract the address
-                address_elem = card.select_one("div[data-testid='property-address']")
+                address_elem = CARDS.field(card, 'address')
                 if not address_elem:
                     continue
 
                 full_address = address_elem.text.strip()
-                address_parts = self._parse_address(full_address)
+                address_parts = parse_address_line(full_address)
 
                 # Extract the URL
-                link_elem = card.select_one("a[data-testid='property-anchor']")
+                link_elem = CARDS.field(card, 'link')
                 if not link_elem:
                     continue
 
@@ -78,46 +189,28 @@ class RealtorScraper(BaseScraper):
                     property_url = self.base_url + property_url
 
                 # Extract beds/baths/sqft
-                beds_elem = card.select_one("li[data-testid='property-meta-beds']")
-                baths_elem = card.select_one("li[data-testid='property-meta-baths']")
-                sqft_elem = card.select_one("li[data-testid='property-meta-sqft']")
+                beds_elem = CARDS.field(card, 'beds')
+                baths_elem = CARDS.field(card, 'baths')
+                sqft_elem = CARDS.field(card, 'sqft')
 
-                beds = float(beds_elem.select_one("span").text) if beds_elem else 0
-                baths = float(baths_elem.select_one("span").text) if baths_elem else 0
+                beds = float(CARDS.field(beds_elem, 'value').text) if beds_elem else 0
+                baths = float(CARDS.field(baths_elem, 'value').text) if baths_elem else 0
 
-                sqft = None
-                if sqft_elem:
-                    sqft_text = sqft_elem.select_one("span").text
-                    sqft_match = re.search(r'([\d,]+)', sqft_text)
-                    if sqft_match:
-                        sqft = float(sqft_match.group(1).replace(',', ''))
+                sqft = parse_number(CARDS.field(sqft_elem, 'value').text) if sqft_elem else None
 
                 # Create property data dictionary
-                property_data = {
-                    'address': address_parts['address'],
-                    'city': address_parts['city'],
-                    'state': address_parts['state'],
-                    'zip_code': address_parts['zip'],
-                    'price': price,
-                    'bedrooms': beds,
-                    'bathrooms': baths,
-                    'square_feet': sqft,
-                    'url': property_url,
-                    'source': 'realtor'
-                }
-
                 # Generate a unique ID
-                property_id = self._generate_property_id(property_data)
+                property_id = self._generate_property_id(address_parts.address, address_parts.city, address_parts.zip)
 
                 # Create the Property object
                 prop = Property(
                     id=property_id,
                     source='realtor',
                     url=property_url,
-                    address=address_parts['address'],
-                    city=address_parts['city'],
-                    state=address_parts['state'],
-                    zip_code=address_parts['zip'],
+                    address=address_parts.address,
+                    city=address_parts.city,
+                    state=address_parts.state,
+                    zip_code=address_parts.zip,
                     price=price,
                     bedrooms=beds,
                     bathrooms=baths,
@@ -140,56 +233,11 @@ class RealtorScraper(BaseScraper):
 
         if len(parts) >= 2:
             city = parts[0].strip().lower().replace(' ', '-')
-            state = parts[1].strip().lower().replace(' ', '-')
-
-            # Handle common state abbreviations
-            state_abbr_map = {
-                'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar',
-                'california': 'ca', 'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de',
-                'florida': 'fl', 'georgia': 'ga', 'hawaii': 'hi', 'idaho': 'id',
-                'illinois': 'il', 'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks',
-                'kentucky': 'ky', 'louisiana': 'la', 'maine': 'me', 'maryland': 'md',
-                'massachusetts': 'ma', 'michigan': 'mi', 'minnesota': 'mn', 'mississippi': 'ms',
-                'missouri': 'mo', 'montana': 'mt', 'nebraska': 'ne', 'nevada': 'nv',
-                'new-hampshire': 'nh', 'new-jersey': 'nj', 'new-mexico': 'nm', 'new-york': 'ny',
-                'north-carolina': 'nc', 'north-dakota': 'nd', 'ohio': 'oh', 'oklahoma': 'ok',
-                'oregon': 'or', 'pennsylvania': 'pa', 'rhode-island': 'ri', 'south-carolina': 'sc',
-                'south-dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx', 'utah': 'ut',
-                'vermont': 'vt', 'virginia': 'va', 'washington': 'wa', 'west-virginia': 'wv',
-                'wisconsin': 'wi', 'wyoming': 'wy'
-            }
+            state = parts[1].strip().lower()
 
             # If state is a full name, convert to abbreviation
-            if state in state_abbr_map:
-                state = state_abbr_map[state]
-
-            # If state is already an abbreviation (2 chars), keep it
-            if len(state) == 2:
-                return f"{city}-{state}"
-            else:
-                return f"{city}-{state}"
+            state = STATE_ABBREVIATIONS.get(state, state).replace(' ', '-')
+            return f"{city}-{state}"
         else:
             # Just use the whole string
             return location.lower().replace(' ', '-').replace(',', '')
-
-    def _parse_address(self, address_text: str) -> Dict[str, str]:
-        """Parse an address from Realtor.com"""
-        parts = {'address': '', 'city': '', 'state': '', 'zip': ''}
-
-        try:
-            # First try to match a typical US address format
-            pattern = r"(.*?),\s*(.*?),\s*([A-Z]{2})\s*(\d{5}(?:-\d{4})?)"
-            match = re.match(pattern, address_text)
-
-            if match:
-                parts['address'] = match.group(1).strip()
-                parts['city'] = match.group(2).strip()
-                parts['state'] = match.group(3).strip()
-                parts['zip'] = match.group(4).strip()
-            else:
-                # If it's just a street address, store that
-                parts['address'] = address_text
-        except Exception:
-            parts['address'] = address_text
-
-        return parts
@@ -1,26 +1,34 @@
-import json
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
 from datetime import datetime
-import urllib.parse
-
-from bs4 import BeautifulSoup
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.html_parser import CardParser, class_strainer
+from scrapers.embedded_data import extract_json_ld, dig, to_float, to_int, to_coordinates, normalize_property_type
 from models.property import Property
+from utils.listing_parser import parse_address_line, parse_listing_stats, parse_price
+
+# Redfin result cards and the fields read from each one
+CARDS = CardParser(
+    strainer=class_strainer('HomeCardContainer'),
+    card_selector=".HomeCardContainer",
+    fields={
+        'price': ".homecardV2Price",
+        'address': ".homeAddressV2",
+        'link': "a.homeCardV2__",
+        'stats': ".HomeStatsV2",
+    }
+)
 
 class RedfinScraper(BaseScraper):
+    source = 'redfin'
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.redfin.com"
 
-    def search(self, location: str, min_price: float, max_price: float) -> List[Property]:
+    async def search_async(self, location: str, min_price: float, max_price: float,
+                           max_pages: Optional[int] = None, max_results: Optional[int] = None) -> List[Property]:
         """Search for properties on Redfin with the given criteria"""
-        properties = []
-
         # Format the location for the URL
         formatted_location = self._format_location(location)
 
@@ -28,74 +36,143 @@ class RedfinScraper(BaseScraper):
         base_search_url = f"{self.base_url}/city/{formatted_location}"
         price_filtered_url = f"{base_search_url}/min-price-{int(min_price)},max-price-{int(max_price)}"
 
-        # Try to use Selenium if available, otherwise fall back to requests
-        if self.is_selenium_available():
-            driver = self._init_selenium()
-            if driver:
-                try:
-                    # Navigate to the search page
-                    driver.get(price_filtered_url)
-
-                    # Wait for the page to load
-                    try:
-                        WebDriverWait(driver, 20).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, ".HomeCardContainer"))
-                        )
-                    except Exception as e:
-                        print(f"Error waiting for Redfin results to load: {e}")
-
-                    # Get the page source and parse with BeautifulSoup
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                except Exception as e:
-                    print(f"Error using Selenium for Redfin: {e}")
-                    # Fall back to requests
-                    response = self._make_request(price_filtered_url)
-                    if response:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                    else:
-                        return properties
-            else:
-                # Fall back to requests
-                response = self._make_request(price_filtered_url)
-                if response:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                else:
-                    return properties
-        else:
-            # Fall back to requests
-            response = self._make_request(price_filtered_url)
-            if response:
-                soup = BeautifulSoup(response.text, 'html.parser')
-            else:
-                return properties
+        async def fetch_page(page: int) -> Optional[str]:
+            page_url = price_filtered_url if page == 1 else f"{price_filtered_url}/page-{page}"
+
+            # Render the page in a browser when one is available
+            return await self._fetch_html(page_url, wait_selector=".HomeCardContainer")
+
+        def parse_page(html: str) -> List[Property]:
+            return self._parse_page(html, min_price, max_price)
+
+        return await self._crawl(fetch_page, parse_page, max_pages, max_results)
+
+    def _parse_page(self, html: str, min_price: float, max_price: float) -> List[Property]:
+        """Parse a Redfin results page, preferring its embedded JSON-LD over the cards"""
+        properties = self._parse_embedded(html, min_price, max_price)
+        if properties is None:
+            properties = self._parse_cards(html, min_price, max_price)
+        return properties
+
+    def _has_embedded_data(self, html: str) -> bool:
+        """Check whether a page embeds its search results as JSON-LD"""
+        return 'application/ld+json' in html and '"PostalAddress"' in html
+
+    def _parse_embedded(self, html: str, min_price: float, max_price: float) -> Optional[List[Property]]:
+        """Map the JSON-LD listings on a Redfin results page to properties.
+
+        Redfin describes each home with a residence object (address, rooms,
+        floor size) and a product object (price) that share a URL. Returns
+        None if the page has no listings, so the caller can fall back to the
+        property cards.
+        """
+        homes = {}
+
+        for item in extract_json_ld(html):
+            url = item.get('url')
+            if not url:
+                continue
+
+            home = homes.setdefault(url, {})
+            if isinstance(item.get('address'), dict):
+                home['residence'] = item
+            if item.get('offers'):
+                home['offers'] = item['offers']
+
+        homes = {url: home for url, home in homes.items() if 'residence' in home}
+        if not homes:
+            return None
+
+        properties = []
 
-        # Find all property cards
-        property_cards = soup.select(".HomeCardContainer")
+        for url, home in homes.items():
+            try:
+                residence = home['residence']
+                offers = home.get('offers')
+                if isinstance(offers, list):
+                    offers = offers[0] if offers else {}
+
+                price = to_float(dig(offers, 'price'))
+                if price is None or price < min_price or price > max_price:
+                    continue
+
+                address_data = residence['address']
+                address = address_data.get('streetAddress') or ''
+                city = address_data.get('addressLocality') or ''
+                state = address_data.get('addressRegion') or ''
+                zip_code = address_data.get('postalCode') or ''
+                if not address:
+                    continue
+
+                property_url = url if url.startswith('http') else self.base_url + url
+
+                image = residence.get('image')
+                image_urls = [image] if isinstance(image, str) else [i for i in image or [] if isinstance(i, str)]
+
+                latitude, longitude = to_coordinates(dig(residence, 'geo', 'latitude'), dig(residence, 'geo', 'longitude'))
+
+                property_id = self._generate_property_id(address, city, zip_code)
+
+                properties.append(Property(
+                    id=property_id,
+                    source='redfin',
+                    url=property_url,
+                    address=address,
+                    city=city,
+                    state=state,
+                    zip_code=zip_code,
+                    price=price,
+                    bedrooms=to_float(residence.get('numberOfBedrooms') or residence.get('numberOfRooms')) or 0,
+                    bathrooms=to_float(residence.get('numberOfBathroomsTotal')) or 0,
+                    square_feet=to_float(dig(residence, 'floorSize', 'value')),
+                    year_built=to_int(residence.get('yearBuilt')),
+                    property_type=normalize_property_type(residence.get('@type')),
+                    description=residence.get('description'),
+                    image_urls=image_urls or None,
+                    date_scraped=datetime.now(),
+                    latitude=latitude,
+                    longitude=longitude
+                ))
+
+            except Exception as e:
+                print(f"Error parsing Redfin JSON-LD listing: {e}")
+                continue
+
+        return properties
+
+    def _parse_cards(self, html: str, min_price: float, max_price: float) -> List[Property]:
+        """Parse the property cards on a Redfin results page"""
+        properties = []
+
+        try:
+            # Find all property cards
+            property_cards = CARDS.cards(html)
 
             for card in property_cards:
                 try:
                     # Extract the price
-                    price_elem = card.select_one(".homecardV2Price")
+                    price_elem = CARDS.field(card, 'price')
                     if not price_elem:
                         continue
 
-                    price_text = price_elem.text.strip()
-                    price = float(re.sub(r'[^\d.]', '', price_text))
+                    price = parse_price(price_elem.text.strip())
+                    if price is None:
+                        continue
 
                     # Check if price is within range
                     if price < min_price or price > max_price:
                         continue
 
                     # Extract the address
-                    address_elem = card.select_one(".homeAddressV2")
+                    address_elem = CARDS.field(card, 'address')
                     if not address_elem:
                         continue
 
                     full_address = address_elem.text.strip()
-                    address_parts = self._parse_address(full_address)
+                    address_parts = parse_address_line(full_address)
 
                     # Extract the URL
-                    link_elem = card.select_one("a.homeCardV2__")
+                    link_elem = CARDS.field(card, 'link')
                     if not link_elem:
                         continue
 
@@ -104,39 +181,26 @@ class RedfinScraper(BaseScraper):
                         property_url = self.base_url + property_url
 
                     # Extract beds/baths/sqft
-                    stats_elem = card.select_one(".HomeStatsV2")
+                    stats_elem = CARDS.field(card, 'stats')
                     beds, baths, sqft = 0, 0, None
 
                     if stats_elem:
                         stats_text = stats_elem.text.strip()
-                        beds, baths, sqft = self._parse_stats(stats_text)
+                        beds, baths, sqft = parse_listing_stats(stats_text)
 
                     # Create property data dictionary
-                    property_data = {
-                        'address': address_parts['address'],
-                        'city': address_parts['city'],
-                        'state': address_parts['state'],
-                        'zip_code': address_parts['zip'],
-                        'price': price,
-                        'bedrooms': beds,
-                        'bathrooms': baths,
-                        'square_feet': sqft,
-                        'url': property_url,
-                        'source': 'redfin'
-                    }
-
                     # Generate a unique ID
-                    property_id = self._generate_property_id(property_data)
+                    property_id = self._generate_property_id(address_parts.address, address_parts.city, address_parts.zip)
 
                     # Create the Property object
                     prop = Property(
                         id=property_id,
                         source='redfin',
                         url=property_url,
-                        address=address_parts['address'],
-                        city=address_parts['city'],
-                        state=address_parts['state'],
-                        zip_code=address_parts['zip'],
+                        address=address_parts.address,
+                        city=address_parts.city,
+                        state=address_parts.state,
+                        zip_code=address_parts.zip,
                         price=price,
                         bedrooms=beds,
                         bathrooms=baths,
@@ -153,11 +217,6 @@ class RedfinScraper(BaseScraper):
         except Exception as e:
             print(f"Error searching Redfin: {e}")
 
-        finally:
-            # Clean up
-            if self.driver:
-                self.close()
-
         return properties
 
     def _format_location(self, location: str) -> str:
@@ -172,49 +231,3 @@ class RedfinScraper(BaseScraper):
         else:
             # Just use the whole string
             return location.lower().replace(' ', '-').replace(',', '/')
-
-    def _parse_address(self, address_text: str) -> Dict[str, str]:
-        """Parse an address from Redfin"""
-        parts = {'address': '', 'city': '', 'state': '', 'zip': ''}
-
-        try:
-            # Try to match a typical US address format
-            pattern = r"(.*?),\s*(.*?),\s*([A-Z]{2})\s*(\d{5}(?:-\d{4})?)"
-            match = re.match(pattern, address_text)
-
-            if match:
-                parts['address'] = match.group(1).strip()
-                parts['city'] = match.group(2).strip()
-                parts['state'] = match.group(3).strip()
-                parts['zip'] = match.group(4).strip()
-            else:
-                # If we can't parse the full address, just store what we have
-                parts['address'] = address_text
-        except Exception:
-            parts['address'] = address_text
-
-        return parts
-
-    def _parse_stats(self, stats_text: str) -> tuple:
-        """Parse beds, baths, and square footage from stats text"""
-        beds, baths, sqft = 0, 0, None
-
-        try:
-            # Try to extract beds
-            beds_match = re.search(r'(\d+(?:\.\d+)?)\s*Beds?', stats_text, re.IGNORECASE)
-            if beds_match:
-                beds = float(beds_match.group(1))
-
-            # Try to extract baths
-            baths_match = re.search(r'(\d+(?:\.\d+)?)\s*Baths?', stats_text, re.IGNORECASE)
-            if baths_match:
-                baths = float(baths_match.group(1))
-
-            # Try to extract square footage
-            sqft_match = re.search(r'([\d,]+)\s*Sq\s*Ft', stats_text, re.IGNORECASE)
-            if sqft_match:
-                sqft = float(sqft_match.group(1).replace(',', ''))
-        except Exception:
-            pass
-
-        return beds, baths, sqft
@@ -1,94 +1,163 @@
-import json
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
 from datetime import datetime
 import urllib.parse
 
-from bs4 import BeautifulSoup
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from bs4 import SoupStrainer
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.html_parser import CardParser
+from scrapers.embedded_data import (
+    extract_next_data, extract_comment_json, iter_key, dig, to_float, to_int, to_coordinates,
+    normalize_property_type, normalize_status, SQFT_PER_ACRE
+)
 from models.property import Property
+from utils.listing_parser import parse_address_line, parse_listing_stats, parse_price
+
+# Zillow result cards and the fields read from each one
+CARDS = CardParser(
+    strainer=SoupStrainer('div', attrs={'data-test': 'property-card'}),
+    card_selector="div[data-test='property-card']",
+    fields={
+        'price': ".property-card-price",
+        'address': "address",
+        'link': "a.property-card-link",
+        'details': ".property-card-details",
+    }
+)
 
 class ZillowScraper(BaseScraper):
+    source = 'zillow'
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.zillow.com"
 
-    def search(self, location: str, min_price: float, max_price: float) -> List[Property]:
+    async def search_async(self, location: str, min_price: float, max_price: float,
+                           max_pages: Optional[int] = None, max_results: Optional[int] = None) -> List[Property]:
         """Search for properties on Zillow with the given criteria"""
-        properties = []
-
         # Encode the location for the URL
         encoded_location = urllib.parse.quote(location)
 
         # Create the search URL
         search_url = f"{self.base_url}/homes/for_sale/{encoded_location}/{int(min_price)}-{int(max_price)}_price/"
 
-        # Try to use Selenium if available, otherwise fall back to requests
-        if self.is_selenium_available():
-            # For Zillow, we'll use Selenium since it's heavily JavaScript-based
-            driver = self._init_selenium()
-            if driver:
-                try:
-                    driver.get(search_url)
-
-                    # Wait for the search results to load
-                    try:
-                        WebDriverWait(driver, 20).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, ".property-card-data"))
-                        )
-                    except Exception as e:
-                        print(f"Error waiting for Zillow results to load: {e}")
-                        # If we timeout waiting for elements, still try to parse what we have
-
-                    # Get the page source and parse with BeautifulSoup
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                except Exception as e:
-                    print(f"Error using Selenium for Zillow: {e}")
-                    # Fall back to requests
-                    response = self._make_request(search_url)
-                    if response:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                    else:
-                        return properties
-            else:
-                # Fall back to requests
-                response = self._make_request(search_url)
-                if response:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                else:
-                    return properties
-        else:
-            # Fall back to requests
-            response = self._make_request(search_url)
-            if response:
-                soup = BeautifulSoup(response.text, 'html.parser')
-            else:
-                return properties
+        async def fetch_page(page: int) -> Optional[str]:
+            page_url = search_url if page == 1 else f"{search_url}{page}_p/"
+
+            # Zillow is heavily JavaScript-based, so render it in a browser when one is available
+            return await self._fetch_html(page_url, wait_selector=".property-card-data")
+
+        return await self._crawl(fetch_page, self._parse_page, max_pages, max_results)
+
+    def _parse_page(self, html: str) -> List[Property]:
+        """Parse a Zillow results page, preferring its embedded JSON over the cards"""
+        properties = self._parse_embedded(html)
+        if properties is None:
+            properties = self._parse_cards(html)
+        return properties
+
+    def _has_embedded_data(self, html: str) -> bool:
+        """Check whether a page embeds its search results as JSON"""
+        return '"listResults"' in html
+
+    def _parse_embedded(self, html: str) -> Optional[List[Property]]:
+        """Map the search results in Zillow's embedded page state to properties.
+
+        Returns None if the page has no search state, so the caller can fall
+        back to the property cards.
+        """
+        data = extract_next_data(html) or extract_comment_json(html, '"listResults"')
+        results = next(iter_key(data, 'listResults'), None) if data else None
+        if not isinstance(results, list):
+            return None
+
+        properties = []
+
+        for result in results:
+            try:
+                home = dig(result, 'hdpData', 'homeInfo', default={})
+
+                address = result.get('addressStreet') or home.get('streetAddress') or ''
+                city = result.get('addressCity') or home.get('city') or ''
+                state = result.get('addressState') or home.get('state') or ''
+                zip_code = result.get('addressZipcode') or home.get('zipcode') or ''
+
+                price = to_float(result.get('unformattedPrice')) or to_float(home.get('price'))
+                if not address or price is None:
+                    continue
+
+                property_url = result.get('detailUrl') or ''
+                if property_url and not property_url.startswith('http'):
+                    property_url = self.base_url + property_url
+
+                lot_size = to_float(home.get('lotAreaValue'))
+                if lot_size is not None and home.get('lotAreaUnit') == 'acres':
+                    lot_size *= SQFT_PER_ACRE
+
+                image_urls = [p['url'] for p in result.get('carouselPhotos') or [] if p.get('url')]
+                if not image_urls and result.get('imgSrc'):
+                    image_urls = [result['imgSrc']]
+
+                latitude, longitude = to_coordinates(
+                    dig(result, 'latLong', 'latitude', default=home.get('latitude')),
+                    dig(result, 'latLong', 'longitude', default=home.get('longitude'))
+                )
+
+                property_id = self._generate_property_id(address, city, zip_code)
+
+                properties.append(Property(
+                    id=property_id,
+                    source='zillow',
+                    url=property_url,
+                    address=address,
+                    city=city,
+                    state=state,
+                    zip_code=zip_code,
+                    price=price,
+                    bedrooms=to_float(result.get('beds') or home.get('bedrooms')) or 0,
+                    bathrooms=to_float(result.get('baths') or home.get('bathrooms')) or 0,
+                    square_feet=to_float(result.get('area') or home.get('livingArea')),
+                    lot_size=lot_size,
+                    year_built=to_int(home.get('yearBuilt')),
+                    property_type=normalize_property_type(home.get('homeType')),
+                    image_urls=image_urls or None,
+                    date_scraped=datetime.now(),
+                    status=normalize_status(result.get('statusType') or home.get('homeStatus')),
+                    latitude=latitude,
+                    longitude=longitude
+                ))
+
+            except Exception as e:
+                print(f"Error parsing Zillow search result: {e}")
+                continue
+
+        return properties
+
+    def _parse_cards(self, html: str) -> List[Property]:
+        """Parse the property cards on a Zillow results page"""
+        properties = []
 
         # Find all property cards
-        property_cards = soup.select("div[data-test='property-card']")
+        property_cards = CARDS.cards(html)
 
         for card in property_cards:
             try:
                 # Extract basic information
-                price_elem = card.select_one(".property-card-price")
-                address_elem = card.select_one("address")
-                link_elem = card.select_one("a.property-card-link")
-                details_elem = card.select_one(".property-card-details")
+                price_elem = CARDS.field(card, 'price')
+                address_elem = CARDS.field(card, 'address')
+                link_elem = CARDS.field(card, 'link')
+                details_elem = CARDS.field(card, 'details')
 
                 if not all([price_elem, address_elem, link_elem, details_elem]):
                     continue
 
                 # Parse the data
-                price_text = price_elem.text.strip()
-                price = float(re.sub(r'[^\d.]', '', price_text))
+                price = parse_price(price_elem.text.strip())
+                if price is None:
+                    continue
 
                 full_address = address_elem.text.strip()
-                address_parts = self._parse_address(full_address)
+                address_parts = parse_address_line(full_address)
 
                 # Get the property URL
                 property_url = link_elem.get('href')
@@ -97,34 +166,21 @@ class ZillowScraper(BaseScraper):
 
                 # Extract beds/baths/sqft
                 details_text = details_elem.text.strip()
-                beds, baths, sqft = self._parse_details(details_text)
+                beds, baths, sqft = parse_listing_stats(details_text)
 
                 # Create a property object
-                property_data = {
-                    'address': address_parts['address'],
-                    'city': address_parts['city'],
-                    'state': address_parts['state'],
-                    'zip_code': address_parts['zip'],
-                    'price': price,
-                    'bedrooms': beds,
-                    'bathrooms': baths,
-                    'square_feet': sqft,
-                    'url': property_url,
-                    'source': 'zillow'
-                }
-
                 # Generate a unique ID
-                property_id = self._generate_property_id(property_data)
+                property_id = self._generate_property_id(address_parts.address, address_parts.city, address_parts.zip)
 
                 # Create the Property object
                 prop = Property(
                     id=property_id,
                     source='zillow',
                     url=property_url,
-                    address=address_parts['address'],
-                    city=address_parts['city'],
-                    state=address_parts['state'],
-                    zip_code=address_parts['zip'],
+                    address=address_parts.address,
+                    city=address_parts.city,
+                    state=address_parts.state,
+                    zip_code=address_parts.zip,
                     price=price,
                     bedrooms=beds,
                     bathrooms=baths,
@@ -139,65 +195,3 @@ class ZillowScraper(BaseScraper):
                 continue
 
         return properties
-
-    def _parse_address(self, address_text: str) -> Dict[str, str]:
-        """Parse an address into components"""
-        # Example: "123 Main St, Anytown, CA 12345"
-        parts = {'address': '', 'city': '', 'state': '', 'zip': ''}
-
-        if not address_text:
-            return parts
-
-        try:
-            # First try to match a typical US address format
-            pattern = r"(.*?),\s*(.*?),\s*([A-Z]{2})\s*(\d{5}(?:-\d{4})?)"
-            match = re.match(pattern, address_text)
-
-            if match:
-                parts['address'] = match.group(1).strip()
-                parts['city'] = match.group(2).strip()
-                parts['state'] = match.group(3).strip()
-                parts['zip'] = match.group(4).strip()
-            else:
-                # Try a simpler pattern
-                pattern = r"(.*?),\s*(.*?),\s*([A-Z]{2})"
-                match = re.match(pattern, address_text)
-                if match:
-                    parts['address'] = match.group(1).strip()
-                    parts['city'] = match.group(2).strip()
-                    parts['state'] = match.group(3).strip()
-                else:
-                    # If we can't parse it, just store the whole address
-                    parts['address'] = address_text
-        except Exception as e:
-            print(f"Error parsing address '{address_text}': {e}")
-            parts['address'] = address_text or ''
-
-        return parts
-
-    def _parse_details(self, details_text: str) -> tuple:
-        """Parse beds, baths, and square footage from details text"""
-        beds, baths, sqft = 0, 0, None
-
-        if not details_text:
-            return beds, baths, sqft
-
-        try:
-            # Try to extract beds
-            beds_match = re.search(r'(\d+(?:\.\d+)?)\s*bd', details_text)
-            if beds_match:
-                beds = float(beds_match.group(1))
-
-            # Try to extract baths
-            baths_match = re.search(r'(\d+(?:\.\d+)?)\s*ba', details_text)
-            if baths_match:
-                baths = float(baths_match.group(1))
-
-            # Try to extract square footage
-            sqft_match = re.search(r'([\d,]+)\s*sqft', details_text)
-            if sqft_match:
-                sqft = float(sqft_match.group(1).replace(',', ''))
-        except Exception as e:
-            print(f"Error parsing details '{details_text}': {e}")
-
-        return beds, baths, sqft
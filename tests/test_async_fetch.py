@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import httpx
+import pytest
+
+from models.property import Property
+from scrapers import base_scraper
+from scrapers.base_scraper import BaseScraper
+from scrapers.http_client import FetchLoop
+from scrapers.rate_limiter import RateLimiter
+
+# Listings per results page; pages past LAST_PAGE are empty
+PAGE_SIZE = 2
+LAST_PAGE = 3
+
+class PagedScraper(BaseScraper):
+    source = 'test'
+
+    async def search_async(self, location, min_price, max_price, max_pages=None, max_results=None):
+        self.thread = threading.current_thread().name
+
+        async def fetch_page(page):
+            return await self._make_request_async(f"https://listings.test/{location}/{page}")
+
+        return await self._crawl(fetch_page, self._parse_page, max_pages, max_results)
+
+    def _parse_page(self, html):
+        return [
+            Property(id=property_id, source=self.source, url='', address='', city='', state='', zip_code='',
+                     price=300000.0, bedrooms=3.0, bathrooms=2.0, date_scraped=datetime(2024, 5, 1))
+            for property_id in html.split()
+        ]
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Serve result pages from a mock transport, odd pages slower than even ones; returns pages as they finish"""
+    fetched = []
+
+    async def handler(request):
+        page = int(request.url.path.rsplit('/', 1)[1])
+        await asyncio.sleep(0.05 if page % 2 else 0)
+        fetched.append(page)
+        ids = [f"{page}-{i}" for i in range(PAGE_SIZE)] if page <= LAST_PAGE else []
+        return httpx.Response(200, text=' '.join(ids))
+
+    clients = {}
+
+    def get_async_client():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return clients[loop]
+
+    loop = FetchLoop()
+    monkeypatch.setattr(base_scraper, 'get_fetch_loop', lambda: loop)
+    monkeypatch.setattr(base_scraper, 'get_async_client', get_async_client)
+    monkeypatch.setattr(base_scraper, 'async_fetch_available', lambda: True)
+    monkeypatch.setattr(base_scraper, 'get_rate_limiter', lambda: RateLimiter(limits={}, default=(1000.0, 100)))
+    monkeypatch.setattr(base_scraper, 'HTTP_CACHE_ENABLED', False)
+    yield fetched
+    for client in clients.values():
+        loop.run(client.aclose())
+    loop.shutdown()
+
+def test_search_crawls_on_the_fetch_loop_in_page_order(fetched):
+    scraper = PagedScraper()
+
+    properties = scraper.search('denver', 0, 1000000, max_pages=5)
+
+    assert scraper.thread == 'fetch-loop' != threading.current_thread().name
+    # Page 2 is prefetched while page 1 is still loading, but results keep page order
+    assert fetched[:2] == [2, 1]
+    assert [p.id for p in properties] == ['1-0', '1-1', '2-0', '2-1', '3-0', '3-1']
+    assert scraper.crawl_complete
+
+def test_crawl_stops_at_max_results_and_max_pages(fetched):
+    scraper = PagedScraper()
+
+    assert [p.id for p in scraper.search('denver', 0, 1000000, max_results=3)] == ['1-0', '1-1', '2-0']
+    assert not scraper.crawl_complete
+
+    assert [p.id for p in scraper.search('denver', 0, 1000000, max_pages=1)] == ['1-0', '1-1']
+    assert not scraper.crawl_complete
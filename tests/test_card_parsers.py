@@ -0,0 +1,59 @@
+import os
+from dataclasses import asdict
+
+import pytest
+
+from scrapers import html_parser
+from scrapers.realtor_scraper import RealtorScraper, CARDS as REALTOR_CARDS
+from scrapers.redfin_scraper import RedfinScraper, CARDS as REDFIN_CARDS
+from scrapers.zillow_scraper import ZillowScraper, CARDS as ZILLOW_CARDS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Scraper, its card parser, fixture page, how to parse the cards, and the addresses expected from them
+SOURCES = {
+    'zillow': (ZillowScraper, ZILLOW_CARDS, 'zillow_results.html', lambda s, html: s._parse_cards(html),
+               ['1423 Elm St', '77 Larimer St APT 4', '9 Court Pl & Annex', '310 S Pearl St']),
+    'redfin': (RedfinScraper, REDFIN_CARDS, 'redfin_results.html',
+               lambda s, html: s._parse_cards(html, 100000, 1000000),
+               ['1423 Elm St', '88 Blake St Unit 12', '1200 Grant St']),
+    'realtor': (RealtorScraper, REALTOR_CARDS, 'realtor_results.html', lambda s, html: s._parse_cards(html),
+                ['1423 Elm St', '600 Grant St Apt 7', '2 Clarkson St']),
+}
+
+def fields(properties):
+    """Property fields that depend on the page, leaving out when it was parsed"""
+    return [{k: v for k, v in asdict(p).items() if k != 'date_scraped'} for p in properties]
+
+@pytest.mark.parametrize('source', list(SOURCES))
+def test_strained_lxml_parse_matches_a_full_html_parser_parse(source, monkeypatch):
+    scraper_class, cards, fixture, parse_cards, addresses = SOURCES[source]
+    with open(os.path.join(FIXTURES, fixture), encoding='utf-8') as f:
+        html = f.read()
+    scraper = scraper_class()
+
+    assert html_parser.get_parser_backend() == 'lxml'
+    strained = parse_cards(scraper, html)
+
+    monkeypatch.setattr(html_parser, 'get_parser_backend', lambda: 'html.parser')
+    monkeypatch.setattr(cards, 'strainer', None)
+    full = parse_cards(scraper, html)
+
+    assert [p.address for p in strained] == addresses
+    assert fields(strained) == fields(full)
+
+def test_card_fields_are_read_from_the_fixture_pages():
+    with open(os.path.join(FIXTURES, 'zillow_results.html'), encoding='utf-8') as f:
+        zillow = ZillowScraper()._parse_cards(f.read())
+    with open(os.path.join(FIXTURES, 'realtor_results.html'), encoding='utf-8') as f:
+        realtor = RealtorScraper()._parse_cards(f.read())
+
+    larimer = zillow[1]
+    assert (larimer.price, larimer.bedrooms, larimer.bathrooms, larimer.square_feet) == (1200000, 4, 3.5, 3210)
+    assert (larimer.city, larimer.state, larimer.zip_code) == ('Denver', 'CO', '80205-1234')
+    assert larimer.url.startswith('https://www.zillow.com/homedetails/77-Larimer')
+    assert (zillow[2].price, zillow[2].square_feet) == (850000, None)
+    assert zillow[3].zip_code == ''
+
+    grant = realtor[1]
+    assert (grant.price, grant.bedrooms, grant.bathrooms, grant.square_feet) == (525000, 2, 0, 1120)
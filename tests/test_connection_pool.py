@@ -0,0 +1,18 @@
+import sqlite3
+
+import pytest
+
+from database import db_handler
+from database.db_handler import ConnectionPool
+
+def test_exhausted_pool_raises_a_database_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_handler, 'DATABASE_TIMEOUT', 0.01)
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=1)
+    conn = pool.acquire()
+
+    with pytest.raises(sqlite3.OperationalError, match='pool exhausted'):
+        pool.acquire()
+
+    pool.release(conn)
+    assert pool.acquire() is conn
+    pool.close()
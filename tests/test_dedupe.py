@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+from models.property import Property
+from utils.address import NormalizedAddress, normalize_address
+from utils.dedupe import EntityResolver, merge_properties, street_similarity
+
+def listing(property_id: str, source: str, address: str, zip_code: str = '80202', canonical_id=None) -> Property:
+    return Property(id=property_id, source=source, url='', address=address, city='Denver', state='CO',
+                    zip_code=zip_code, price=300000.0, bedrooms=3.0, bathrooms=2.0,
+                    date_scraped=datetime(2024, 5, 1), canonical_id=canonical_id)
+
+@pytest.mark.parametrize('address', [
+    '123 North Main Street, Apt. 4',
+    '123 N Main St #4',
+    '123 n. main st., unit 04',
+    '123 North Main Street, Suite 4, Denver, CO 80202',
+])
+def test_suffixes_directions_and_units_are_normalized(address):
+    assert normalize_address(address) == NormalizedAddress('123', 'n main st', '4')
+
+def test_ordinals_are_normalized():
+    assert normalize_address('45 West First Avenue') == NormalizedAddress('45', 'w 1st ave', '')
+
+def test_streets_differing_only_in_optional_tokens_are_similar():
+    assert street_similarity('n main st', 'n main st') == 1.0
+    assert street_similarity('n main st', 'main st') == 0.95
+    assert street_similarity('main', 'main st') == 0.95
+    assert street_similarity('main st', 'elm st') < 0.85
+
+def test_units_must_match():
+    resolver = EntityResolver()
+    first = resolver.resolve(listing('a', 'zillow', '10 Main St Apt 1'))
+
+    assert resolver.resolve(listing('b', 'redfin', '10 Main Street #1')) == first
+    assert resolver.resolve(listing('c', 'redfin', '10 Main Street #2')) != first
+    assert resolver.resolve(listing('d', 'redfin', '10 Main Street')) != first
+
+def test_listings_are_blocked_by_zip5_and_house_number():
+    resolver = EntityResolver()
+    first = resolver.resolve(listing('a', 'zillow', '10 Main St', zip_code='80202'))
+
+    assert resolver.resolve(listing('b', 'redfin', '10 Main St', zip_code='80202-1234')) == first
+    assert resolver.resolve(listing('c', 'redfin', '10 Main St', zip_code='80203')) != first
+    assert resolver.resolve(listing('d', 'redfin', '12 Main St', zip_code='80202')) != first
+    # Listings without a ZIP code or house number are never merged
+    assert resolver.resolve(listing('e', 'redfin', 'Main St', zip_code='80202')) == 'e'
+    assert resolver.resolve(listing('f', 'redfin', '10 Main St', zip_code='')) == 'f'
+
+def test_merge_keeps_first_seen_order_and_prefers_trusted_sources():
+    listings = [
+        listing('r1', 'realtor', '10 Main St'),
+        listing('z2', 'zillow', '20 Elm St'),
+        listing('z1', 'zillow', '10 Main Street'),
+        listing('f1', 'redfin', '10 N Main St'),
+        listing('r3', 'realtor', '30 Oak St', canonical_id='stored'),
+    ]
+
+    merged = merge_properties(listings)
+
+    assert [home.primary.id for home in merged] == ['z1', 'z2', 'r3']
+    assert merged[0].sources == ['zillow', 'redfin', 'realtor']
+    assert merged[2].canonical_id == 'stored'
+    assert all(prop.canonical_id is None for prop in listings[:4])
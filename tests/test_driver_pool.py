@@ -0,0 +1,78 @@
+import pytest
+
+from scrapers import base_scraper
+from scrapers.driver_pool import (
+    BrowserCapability, DriverStartError, DriverUnavailableError, LeaseTimeoutError, WebDriverPool
+)
+
+class FakeDriver:
+    current_url = 'about:blank'
+    page_source = '<html><div class="card"></div></html>'
+
+    def get(self, url):
+        self.current_url = url
+
+    def execute_script(self, script):
+        return 0
+
+    def quit(self):
+        pass
+
+class FakePool(WebDriverPool):
+    def __init__(self, size=1, fail=False):
+        super().__init__(size=size)
+        self.fail = fail
+
+    def _create_driver(self):
+        if self.fail:
+            raise OSError('chrome not found')
+        return FakeDriver()
+
+class Scraper(base_scraper.BaseScraper):
+    source = 'test'
+
+    async def search_async(self, location, min_price, max_price, max_pages=None, max_results=None):
+        return []
+
+@pytest.fixture
+def capability(monkeypatch):
+    def use(pool):
+        capability = BrowserCapability(pool)
+        capability._result = {'mode': 'selenium', 'error': None, 'probed_at': 0}
+        monkeypatch.setattr(base_scraper, 'get_driver_pool', lambda: pool)
+        monkeypatch.setattr(base_scraper, 'get_browser_capability', lambda: capability)
+        monkeypatch.setattr(base_scraper, 'HTTP_CACHE_ENABLED', False)
+        return capability
+    return use
+
+def test_a_busy_pool_times_out_and_a_failed_start_is_reported():
+    pool = FakePool(size=1)
+    with pool.lease():
+        with pytest.raises(LeaseTimeoutError):
+            pool.acquire(timeout=0.05)
+
+    failing = FakePool(fail=True)
+    with pytest.raises(DriverStartError):
+        failing.acquire(timeout=0.05)
+    assert failing.stats()['running'] == 0
+
+    pool.shutdown()
+    with pytest.raises(DriverUnavailableError):
+        pool.acquire(timeout=0.05)
+
+def test_render_html_keeps_selenium_mode_when_every_browser_is_busy(capability, monkeypatch):
+    pool = FakePool(size=1)
+    state = capability(pool)
+
+    with pool.lease():
+        # Don't wait the full lease timeout for the browser held above
+        monkeypatch.setattr(pool, 'acquire', lambda: WebDriverPool.acquire(pool, timeout=0.05))
+        assert Scraper()._render_html('https://example.com/', '.card') is None
+    assert state.status()['mode'] == 'selenium'
+
+def test_render_html_falls_back_for_good_when_chrome_fails_to_start(capability):
+    state = capability(FakePool(fail=True))
+
+    assert Scraper()._render_html('https://example.com/', '.card') is None
+    assert state.status()['mode'] == 'requests'
+    assert 'chrome not found' in state.status()['error']
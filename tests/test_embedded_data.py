@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from scrapers.realtor_scraper import RealtorScraper
+from scrapers.redfin_scraper import RedfinScraper
+from scrapers.zillow_scraper import ZillowScraper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Truncated payloads, as served when a page is cut off mid-script
+BROKEN_NEXT_DATA = '<script id="__NEXT_DATA__" type="application/json">{"props": {"listResults": [</script>'
+BROKEN_COMMENT_JSON = '<script type="application/json"><!--{"cat1": {"listResults": [{"zpid": -->"</script>'
+BROKEN_JSON_LD = '<script type="application/ld+json">{"@type": "PostalAddress", "streetAddress": </script>'
+
+def read(fixture: str) -> str:
+    with open(os.path.join(FIXTURES, fixture), encoding='utf-8') as f:
+        return f.read()
+
+def with_payload(fixture: str, payload: str) -> str:
+    """A card fixture page with a script block injected before </body>"""
+    return read(fixture).replace('</body>', payload + '\n</body>')
+
+def test_zillow_next_data():
+    properties = ZillowScraper()._parse_page(read('zillow_next_data.html'))
+
+    # The result without a price is skipped
+    assert [p.address for p in properties] == ['1423 Elm St', '77 Larimer St APT 4']
+    house, condo = properties
+
+    assert (house.city, house.state, house.zip_code, house.price) == ('Denver', 'CO', '80202', 450000.0)
+    assert (house.bedrooms, house.bathrooms, house.square_feet, house.year_built) == (3.0, 2.0, 1500.0, 1924)
+    assert house.lot_size == 0.25 * 43560
+    assert (house.property_type, house.status) == ('single_family', 'for_sale')
+    assert (house.latitude, house.longitude) == (39.7508, -104.9966)
+    assert house.url == 'https://www.zillow.com/homedetails/1423-Elm-St-Denver-CO-80202/13001_zpid/'
+    assert len(house.image_urls) == 2
+
+    # Listings with only hdpData fall back to homeInfo, whose coordinates are in millionths of a degree
+    assert (condo.zip_code, condo.price, condo.bedrooms, condo.bathrooms) == ('80205', 1200000.0, 4.0, 3.5)
+    assert (condo.property_type, condo.status) == ('condo', 'pending')
+    assert (condo.latitude, condo.longitude) == pytest.approx((39.7521, -104.9998))
+    assert condo.lot_size is None and condo.image_urls is None
+
+def test_zillow_comment_json():
+    properties = ZillowScraper()._parse_page(read('zillow_comment_json.html'))
+
+    assert [(p.address, p.zip_code, p.price) for p in properties] == [('310 S Pearl St', '80209', 615000.0)]
+    assert properties[0].image_urls == ['https://photos.zillowstatic.com/4.jpg']
+    assert properties[0].latitude is None
+
+def test_realtor_next_data():
+    properties = RealtorScraper()._parse_page(read('realtor_next_data.html'))
+
+    assert [p.address for p in properties] == ['1423 Elm St', '600 Grant St Apt 7']
+    house, condo = properties
+
+    assert (house.state, house.price, house.bedrooms, house.bathrooms) == ('CO', 450000.0, 3.0, 2.5)
+    assert (house.square_feet, house.lot_size, house.year_built) == (1500.0, 6250.0, 1924)
+    assert (house.property_type, house.status) == ('single_family', 'for_sale')
+    assert house.description == 'Renovated kitchen and a detached garage.'
+    assert house.url == 'https://www.realtor.com/realestateandhomes-detail/1423-Elm-St_Denver_CO_80202_M4001'
+    assert (house.latitude, house.longitude) == (39.7508, -104.9966)
+    assert house.date_listed.date().isoformat() == '2024-04-28'
+
+    assert condo.state == 'Colorado' and condo.status == 'pending'
+    assert condo.image_urls == ['https://ap.rdcpix.com/2.jpg']
+    assert condo.latitude is None and condo.date_listed is None
+
+def test_redfin_json_ld():
+    properties = RedfinScraper()._parse_page(read('redfin_json_ld.html'), 100000, 1000000)
+
+    # The listing priced above max_price is filtered out and the truncated BreadcrumbList is ignored
+    assert [p.address for p in properties] == ['1423 Elm St', '88 Blake St Unit 12']
+    house, condo = properties
+
+    assert (house.price, house.bedrooms, house.bathrooms, house.square_feet) == (450000.0, 3.0, 2.0, 1500.0)
+    assert (house.property_type, house.year_built) == ('single_family_residence', 1924)
+    assert house.url == 'https://www.redfin.com/CO/Denver/1423-Elm-St-80202/home/1001'
+    assert house.image_urls == ['https://ssl.cdn-redfin.com/photo/1.jpg']
+    assert (house.latitude, house.longitude) == (39.7508, -104.9966)
+
+    # Offers given as a list with a formatted price, from an @graph block
+    assert (condo.price, condo.bedrooms, condo.property_type) == (389000.0, 2.0, 'condominium')
+    assert condo.url == 'https://www.redfin.com/CO/Denver/88-Blake-St-80202/unit-12/home/1002'
+
+ZILLOW_ADDRESSES = ['1423 Elm St', '77 Larimer St APT 4', '9 Court Pl & Annex', '310 S Pearl St']
+
+# Scraper, card fixture page, broken payload, extra _parse_page arguments and the addresses on the cards
+FALLBACKS = {
+    'zillow-next-data': (ZillowScraper, 'zillow_results.html', BROKEN_NEXT_DATA, (), ZILLOW_ADDRESSES),
+    'zillow-comment-json': (ZillowScraper, 'zillow_results.html', BROKEN_COMMENT_JSON, (), ZILLOW_ADDRESSES),
+    'realtor-next-data': (RealtorScraper, 'realtor_results.html', BROKEN_NEXT_DATA, (),
+                          ['1423 Elm St', '600 Grant St Apt 7', '2 Clarkson St']),
+    'redfin-json-ld': (RedfinScraper, 'redfin_results.html', BROKEN_JSON_LD, (100000, 1000000),
+                       ['1423 Elm St', '88 Blake St Unit 12', '1200 Grant St']),
+}
+
+@pytest.mark.parametrize('case', list(FALLBACKS))
+def test_malformed_json_falls_back_to_the_cards(case):
+    scraper_class, fixture, payload, args, addresses = FALLBACKS[case]
+    scraper = scraper_class()
+    html = with_payload(fixture, payload)
+
+    assert scraper._parse_embedded(html, *args) is None
+    assert [p.address for p in scraper._parse_page(html, *args)] == addresses
@@ -0,0 +1,169 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+import web_app
+from database.db_handler import DatabaseHandler
+from database.result_store import ResultStore
+from models.property import Property
+from utils import columnar, exporters
+from utils.exporters import EXPORT_COLUMNS, export_row, stream_export
+from web_app import app
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc as ipc  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+def listing(i: int, **fields) -> Property:
+    values = dict(square_feet=1500.0 + i, year_built=1990 + i, property_type='single_family',
+                  features=['garage', 'yard'], image_urls=[f"https://photos.test/{i}.jpg"],
+                  date_listed=datetime(2024, 4, 1 + i), status='for_sale', latitude=39.74, longitude=-104.99)
+    values.update(fields)
+    return Property(id=f"p{i}", source='zillow' if i % 2 else 'redfin', url=f"https://listings.test/{i}",
+                    address=f"{i} Main St", city='Denver', state='CO', zip_code='80202', price=300000.0 + i * 1000,
+                    bedrooms=3.0, bathrooms=2.0, date_scraped=datetime(2024, 5, 1, 12, 0), **values)
+
+# One listing with every optional field empty, and a description that needs quoting in CSV
+PROPERTIES = [listing(i) for i in range(3)] + [
+    listing(3, square_feet=None, year_built=None, property_type=None, features=None, image_urls=None,
+            date_listed=None, status=None, latitude=None, longitude=None, description='Corner lot, "as is"\nno HOA')
+]
+
+def read_export(data: bytes, format_type: str) -> list:
+    """Decode CSV, JSON or NDJSON export bytes back into row dictionaries"""
+    text = data.decode('utf-8')
+    if format_type == 'csv':
+        reader = csv.DictReader(io.StringIO(text))
+        assert reader.fieldnames == EXPORT_COLUMNS
+        return list(reader)
+    if format_type == 'json':
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines()]
+
+def as_csv(row: dict) -> dict:
+    """How a row reads back from CSV, where every value is a string and None is empty"""
+    return {column: '' if value is None else str(value) for column, value in row.items()}
+
+@pytest.mark.parametrize('compress', [False, True], ids=['plain', 'gzip'])
+@pytest.mark.parametrize('format_type', ['csv', 'json', 'ndjson'])
+def test_text_exports_round_trip(format_type, compress, monkeypatch):
+    # Small chunks, so rows are split across several of them
+    monkeypatch.setattr(exporters, 'EXPORT_CHUNK_SIZE', 100)
+    chunks = list(stream_export(iter(PROPERTIES), format_type, compress))
+    data = b''.join(chunks)
+    if compress:
+        data = gzip.decompress(data)
+
+    rows = read_export(data, format_type)
+
+    expected = [export_row(p) for p in PROPERTIES]
+    if format_type == 'csv':
+        expected = [as_csv(row) for row in expected]
+    assert rows == expected
+    assert rows[0]['features'] == 'garage,yard'
+    # Gzip buffers small chunks itself
+    assert compress or len(chunks) > 2
+
+@pytest.mark.parametrize('compress', [False, True], ids=['plain', 'gzip'])
+@pytest.mark.parametrize('format_type', ['csv', 'json', 'ndjson'])
+def test_text_exports_of_no_results(format_type, compress):
+    data = b''.join(stream_export(iter([]), format_type, compress))
+    if compress:
+        data = gzip.decompress(data)
+
+    # CSV still has its header row, which read_export checks
+    assert read_export(data, format_type) == []
+
+def read_columnar(data: bytes, format_type: str) -> 'pa.Table':
+    """Decode Parquet or Arrow export bytes, checking the schema"""
+    if format_type == 'parquet':
+        table = pq.read_table(io.BytesIO(data))
+        # Parquet keeps the columns and types but widens dictionary indices
+        assert table.column_names == EXPORT_COLUMNS
+    else:
+        table = ipc.open_file(pa.BufferReader(data)).read_all()
+        assert table.schema.equals(columnar.property_schema())
+    return table
+
+@pytest.mark.parametrize('format_type', ['parquet', 'arrow'])
+def test_columnar_exports_round_trip(format_type):
+    table = read_columnar(b''.join(columnar.stream_columnar(iter(PROPERTIES), format_type)), format_type)
+
+    rows = table.to_pylist()
+    assert [row['id'] for row in rows] == ['p0', 'p1', 'p2', 'p3']
+    assert rows[0]['features'] == ['garage', 'yard']
+    assert rows[0]['date_listed'] == datetime(2024, 4, 1)
+    assert rows[1]['source'] == 'zillow' and rows[1]['year_built'] == 1991
+    assert rows[3]['features'] is None and rows[3]['year_built'] is None and rows[3]['date_listed'] is None
+    assert rows[3]['description'] == 'Corner lot, "as is"\nno HOA'
+
+@pytest.mark.parametrize('format_type', ['parquet', 'arrow'])
+def test_columnar_exports_of_no_results(format_type):
+    table = read_columnar(b''.join(columnar.stream_columnar(iter([]), format_type)), format_type)
+
+    assert table.num_rows == 0
+
+def test_record_batches_are_bounded():
+    batches = list(columnar.iter_record_batches(iter(PROPERTIES), batch_size=3))
+
+    assert [batch.num_rows for batch in batches] == [3, 1]
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    db = DatabaseHandler(str(tmp_path / 'properties.db'))
+    db.insert_properties(PROPERTIES)
+    monkeypatch.setattr(web_app, 'DatabaseHandler', lambda: db)
+    return db
+
+def test_db_scope_exports_the_filtered_stored_properties(client, db):
+    response = client.get('/export/csv?scope=db&min_price=301000&sort=price&order=desc')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].endswith('.csv')
+    rows = read_export(response.data, 'csv')
+    assert [row['id'] for row in rows] == ['p3', 'p2', 'p1']
+    assert rows[2] == as_csv(export_row(PROPERTIES[1]))
+
+def test_db_scope_exports_gzip_and_parquet(client, db):
+    response = client.get('/export/ndjson?scope=db&gzip=1&location=Denver, CO')
+
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'].endswith('.ndjson.gz')
+    assert [row['id'] for row in read_export(gzip.decompress(response.data), 'ndjson')] == ['p0', 'p1', 'p2', 'p3']
+
+    response = client.get('/export/parquet?scope=db&max_price=301000')
+
+    assert response.mimetype == 'application/vnd.apache.parquet'
+    assert read_columnar(response.data, 'parquet').column('id').to_pylist() == ['p0', 'p1']
+
+def test_db_scope_exports_of_no_matches(client, db):
+    response = client.get('/export/json?scope=db&min_price=10000000')
+
+    assert response.status_code == 200
+    assert read_export(response.data, 'json') == []
+
+def test_db_scope_rejects_bad_filters(client, db):
+    response = client.get('/export/csv?scope=db&sort=favorite_color')
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+def test_result_id_exports_a_stored_result_set(client, monkeypatch):
+    store = ResultStore()
+    store.put('result', PROPERTIES)
+    monkeypatch.setattr(web_app, 'get_result_store', lambda: store)
+
+    response = client.get('/export/json?result_id=result')
+    assert read_export(response.data, 'json') == [export_row(p) for p in PROPERTIES]
+
+    response = client.get('/export/json?result_id=expired')
+    assert response.status_code == 404
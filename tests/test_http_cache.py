@@ -0,0 +1,87 @@
+import pytest
+import requests
+
+from scrapers import base_scraper
+from scrapers.base_scraper import BaseScraper
+from scrapers.http_cache import HttpCache
+from scrapers.rate_limiter import RateLimiter
+
+URL = 'https://listings.test/search'
+
+class StubSession:
+    """Answers each request with the next (status, headers, body) triple and records the request headers"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, timeout=None, headers=None):
+        status_code, response_headers, body = self.responses.pop(0)
+        self.sent_headers.append(dict(headers or {}))
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(response_headers)
+        response.url = url
+        response.encoding = 'utf-8'
+        response._content = body
+        return response
+
+class PageScraper(BaseScraper):
+    source = 'test'
+
+    async def search_async(self, location, min_price, max_price, max_pages=None, max_results=None):
+        return []
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / 'http_cache.db'))
+    monkeypatch.setattr(base_scraper, 'get_http_cache', lambda: cache)
+    monkeypatch.setattr(base_scraper, 'HTTP_CACHE_ENABLED', True)
+    monkeypatch.setattr(base_scraper, 'get_rate_limiter', lambda: RateLimiter(limits={}, default=(1000.0, 100)))
+    return cache
+
+def expire(cache: HttpCache, key: str):
+    """Age an entry past any TTL"""
+    with cache.pool.connection() as conn:
+        conn.execute('UPDATE http_cache SET stored_at = stored_at - 86400 WHERE key = ?', (key,))
+        conn.commit()
+
+def test_fresh_entries_are_served_without_a_request(cache):
+    scraper = PageScraper()
+    scraper.session = StubSession([(200, {'ETag': '"v1"'}, b'first')])
+
+    assert scraper._make_request(URL).text == 'first'
+    assert scraper._make_request(URL).text == 'first'
+    assert len(scraper.session.sent_headers) == 1
+    assert cache.stats()['hits'] == 1
+
+def test_not_modified_serves_the_cached_body(cache):
+    scraper = PageScraper()
+    scraper.session = StubSession([
+        (200, {'ETag': '"v1"', 'Last-Modified': 'Wed, 01 May 2024 12:00:00 GMT'}, b'first'),
+        (304, {}, b''),
+    ])
+    scraper._make_request(URL)
+    expire(cache, URL)
+
+    response = scraper._make_request(URL)
+
+    assert response.status_code == 200 and response.text == 'first'
+    assert scraper.session.sent_headers[1] == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 01 May 2024 12:00:00 GMT'
+    }
+    # Revalidation restarts the TTL
+    assert cache.is_fresh(cache.get(URL), PageScraper.source)
+    assert cache.stats()['revalidated'] == 1
+
+def test_expired_entries_are_refetched(cache):
+    scraper = PageScraper()
+    scraper.session = StubSession([(200, {'ETag': '"v1"'}, b'first'), (200, {'ETag': '"v2"'}, b'second')])
+    scraper._make_request(URL)
+    expire(cache, URL)
+
+    assert scraper._make_request(URL).text == 'second'
+    assert scraper.session.sent_headers[1] == {'If-None-Match': '"v1"'}
+    entry = cache.get(URL)
+    assert (entry.body, entry.etag) == (b'second', '"v2"')
+    assert cache.is_fresh(entry, PageScraper.source)
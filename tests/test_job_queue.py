@@ -0,0 +1,51 @@
+import pytest
+
+from database.job_store import JobStore
+from scrapers.job_queue import JobQueue, QueueFullError, SearchParams
+from utils.single_flight import SingleFlight
+
+class CheckedFlights(SingleFlight):
+    """Asserts that every claimed job id can already be read from the store"""
+
+    def __init__(self, store: JobStore):
+        super().__init__()
+        self.store = store
+
+    def claim(self, key, value):
+        assert self.store.get(value) is not None
+        return super().claim(key, value)
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.db'))
+
+def job_count(store: JobStore) -> int:
+    with store.pool.connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM scrape_jobs').fetchone()[0]
+
+def search(location='Denver, CO'):
+    return SearchParams(location=location, min_price=200000, max_price=500000, sources=['zillow'])
+
+def test_jobs_exist_before_they_can_be_joined(store):
+    # No workers, so submitted jobs stay queued
+    jobs = JobQueue(store=store, workers=0, flights=CheckedFlights(store))
+
+    job_id, coalesced = jobs.submit(search())
+    joined_id, joined = jobs.submit(search())
+
+    assert not coalesced and joined
+    assert joined_id == job_id
+    assert store.get(job_id)['status'] == 'queued'
+    assert job_count(store) == 1
+
+def test_a_rejected_search_leaves_no_job_behind(store):
+    jobs = JobQueue(store=store, workers=0, max_queued=1, flights=CheckedFlights(store))
+    jobs.submit(search())
+
+    with pytest.raises(QueueFullError):
+        jobs.submit(search('Boulder, CO'))
+
+    assert job_count(store) == 1
+    # The rejected search's claim was released, so a later submission isn't joined onto a missing job
+    store.create('later', 'key', {})
+    assert jobs.flights.claim(search('Boulder, CO').key(), 'later') is None
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from database.job_store import JobStore
+from models.property import Property
+
+def listings(source: str, count: int):
+    return [
+        Property(id=f"{source}-{i}", source=source, url='', address=f"{i} Main St", city='Denver', state='CO',
+                 zip_code='80202', price=300000.0 + i, bedrooms=3.0, bathrooms=2.0,
+                 features=['Garage'], date_scraped=datetime(2024, 5, 1, 12, 0)).to_dict()
+        for i in range(count)
+    ]
+
+def test_get_batch_reuses_the_batch_until_a_source_finishes(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    store.create('job', 'key', {})
+    store.record_source('job', 'zillow', 'ok', listings('zillow', 3))
+
+    first = store.get_batch('job')
+    assert store.get_batch('job') is first
+    assert [row.id for row in first] == ['zillow-0', 'zillow-1', 'zillow-2']
+
+    store.record_source('job', 'redfin', 'ok', listings('redfin', 2))
+    second = store.get_batch('job')
+
+    assert second is not first
+    assert len(first) == 3
+    assert [row.to_dict() for row in second] == store.get_properties('job')
+
+def test_get_batch_of_a_job_without_results_is_empty(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    store.create('job', 'key', {})
+
+    assert len(store.get_batch('job')) == 0
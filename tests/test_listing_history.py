@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.db_handler import DatabaseHandler
+from models.property import Property
+
+FIRST_SCRAPE = datetime.now().replace(microsecond=0)
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseHandler(str(tmp_path / 'history.db'))
+
+def listing(property_id: str, price: float, minutes: int = 0, **fields) -> Property:
+    values = dict(status='for_sale', latitude=39.74, longitude=-104.99)
+    values.update(fields)
+    return Property(id=property_id, source='zillow', url='', address=f"{property_id} Main St", city='Denver',
+                    state='CO', zip_code='80202', price=price, bedrooms=3.0, bathrooms=2.0,
+                    date_scraped=FIRST_SCRAPE + timedelta(minutes=minutes), **values)
+
+def events(db: DatabaseHandler):
+    with db.pool.connection() as conn:
+        return [tuple(row) for row in conn.execute('''
+            SELECT property_id, event, old_price, new_price, old_status, new_status FROM listing_events ORDER BY id
+        ''')]
+
+def stored(db: DatabaseHandler, property_id: str):
+    with db.pool.connection() as conn:
+        return conn.execute('SELECT * FROM properties WHERE id = ?', (property_id,)).fetchone()
+
+def test_unchanged_rescrape_leaves_rows_alone(db):
+    db.insert_properties([listing('1', 300000.0), listing('2', 400000.0)])
+    db.insert_properties([listing('1', 300000.0, minutes=1), listing('2', 400000.0, minutes=1)])
+
+    assert stored(db, '1')['date_scraped'] == FIRST_SCRAPE.isoformat()
+    assert [event for _, event, *_ in events(db)] == ['listed', 'listed']
+
+def test_price_and_status_changes_are_logged(db):
+    db.insert_properties([listing('1', 300000.0), listing('2', 400000.0)])
+    db.insert_properties([listing('1', 290000.0, minutes=1), listing('2', 400000.0, minutes=1, status='pending')])
+
+    assert stored(db, '1')['date_scraped'] == (FIRST_SCRAPE + timedelta(minutes=1)).isoformat()
+    assert events(db)[2:] == [
+        ('1', 'price_change', 300000.0, 290000.0, None, None),
+        ('2', 'status_change', None, None, 'for_sale', 'pending'),
+    ]
+
+def test_get_price_changes_filters_drops(db):
+    db.insert_properties([listing('1', 300000.0), listing('2', 400000.0)])
+    db.insert_properties([listing('1', 290000.0, minutes=1), listing('2', 410000.0, minutes=1)])
+
+    assert sorted(change['id'] for change in db.get_price_changes(FIRST_SCRAPE)) == ['1', '2']
+    drops = db.get_price_changes(FIRST_SCRAPE, drops_only=True)
+    assert [(change['id'], change['old_price'], change['new_price']) for change in drops] == [
+        ('1', 300000.0, 290000.0)
+    ]
+
+def test_missing_status_and_coordinates_keep_stored_values(db):
+    db.insert_properties([listing('1', 300000.0)])
+    db.insert_properties([listing('1', 300000.0, minutes=1, status=None, latitude=None, longitude=None)])
+
+    row = stored(db, '1')
+    assert (row['status'], row['latitude'], row['longitude']) == ('for_sale', 39.74, -104.99)
+    assert row['date_scraped'] == FIRST_SCRAPE.isoformat()
+    assert len(events(db)) == 1
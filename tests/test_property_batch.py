@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+from models.property import Property
+from models.property_batch import PropertyBatch
+from scrapers.embedded_data import to_datetime
+
+def make_property(**overrides) -> Property:
+    values = dict(id='1', source='realtor', url='', address='1 Main St', city='Denver', state='CO',
+                  zip_code='80202', price=450000.0, bedrooms=3.0, bathrooms=2.0,
+                  date_scraped=datetime(2024, 5, 1, 12, 0))
+    values.update(overrides)
+    return Property(**values)
+
+def test_aware_dates_are_stored_as_utc():
+    listed = to_datetime('2024-04-30T18:30:00Z')
+    assert listed.tzinfo is not None
+
+    batch = PropertyBatch.from_properties([make_property(date_listed=listed)])
+
+    assert batch[0].date_listed == datetime(2024, 4, 30, 18, 30)
+    assert batch[0].date_scraped == datetime(2024, 5, 1, 12, 0)
+
+def test_aware_dates_with_an_offset_and_naive_dates_share_a_column():
+    denver = timezone(timedelta(hours=-6))
+    batch = PropertyBatch.from_properties([
+        make_property(id='1', date_listed=datetime(2024, 4, 30, 12, 30, tzinfo=denver)),
+        make_property(id='2', date_listed=datetime(2024, 4, 30, 18, 30)),
+        make_property(id='3', date_listed=None),
+    ])
+
+    assert [row.date_listed for row in batch] == [datetime(2024, 4, 30, 18, 30)] * 2 + [None]
+
+def test_setting_an_aware_date_stores_it_as_utc():
+    batch = PropertyBatch.from_properties([make_property()])
+    batch[0].date_listed = datetime(2024, 4, 30, 18, 30, tzinfo=timezone.utc)
+
+    assert batch[0].date_listed == datetime(2024, 4, 30, 18, 30)
+    assert batch[0].to_dict()['date_listed'] == '2024-04-30T18:30:00'
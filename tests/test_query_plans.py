@@ -0,0 +1,46 @@
+import pytest
+
+from database.db_handler import DatabaseHandler
+
+@pytest.fixture(scope='module')
+def db(tmp_path_factory):
+    return DatabaseHandler(str(tmp_path_factory.mktemp('plans') / 'plans.db'))
+
+def query_plan(db: DatabaseHandler, **filters):
+    """Return SQLite's query plan for a get_properties call, one detail per step"""
+    query, params = db._build_query(**filters)
+    with db.pool.connection() as conn:
+        return [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+def full_scans(plan):
+    """Steps that read every row of properties; walking an index in order doesn't count"""
+    return [detail for detail in plan if detail.split(' ')[:2] == ['SCAN', 'properties'] and 'USING' not in detail]
+
+@pytest.mark.parametrize('filters, index', [
+    (dict(location='Denver, CO'), 'idx_properties_city'),
+    (dict(location='Denver'), 'idx_properties_city'),
+    (dict(location='80202'), 'idx_properties_zip'),
+    (dict(location='123 Main St, Denver, CO 80202'), 'idx_properties_zip'),
+    (dict(min_price=200000, max_price=500000), 'idx_properties_price'),
+    (dict(location='Denver, CO', min_price=200000, max_price=500000, min_beds=3), 'idx_properties_city'),
+    (dict(min_beds=3, min_baths=2), 'idx_properties_rooms'),
+    (dict(sort='price', limit=50), 'idx_properties_price_id'),
+    (dict(sort='date_scraped', descending=True, limit=50), 'idx_properties_date_scraped_id'),
+])
+def test_lookups_use_their_index(db, filters, index):
+    plan = query_plan(db, **filters)
+
+    assert any(f'USING INDEX {index}' in detail for detail in plan), plan
+    assert not full_scans(plan), plan
+
+@pytest.mark.parametrize('filters', [
+    dict(keywords='garage'),
+    dict(keywords='garage renovat*'),
+    dict(bounds=(39.6, -105.1, 39.8, -104.9)),
+    dict(near=(39.74, -104.99), radius_miles=5),
+])
+def test_search_and_map_queries_start_from_their_virtual_tables(db, filters):
+    plan = query_plan(db, **filters)
+
+    assert any('VIRTUAL TABLE' in detail for detail in plan), plan
+    assert not full_scans(plan), plan
@@ -0,0 +1,107 @@
+import pytest
+import requests
+
+from scrapers import base_scraper
+from scrapers.base_scraper import BaseScraper
+from scrapers.rate_limiter import RateLimiter
+
+HOST = 'listings.test'
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def limiter(clock, **options) -> RateLimiter:
+    # Two requests a second with bursts of three
+    return RateLimiter(limits={HOST: (2.0, 3)}, clock=clock, **options)
+
+def test_bursts_are_free_then_requests_queue_at_the_rate(clock):
+    limits = limiter(clock)
+
+    assert [limits.reserve(HOST) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limits.reserve(HOST) == pytest.approx(0.5)
+    assert limits.reserve(HOST) == pytest.approx(1.0)
+
+def test_tokens_refill_up_to_the_burst_size(clock):
+    limits = limiter(clock)
+    for _ in range(3):
+        limits.reserve(HOST)
+
+    clock.now += 1.0
+    assert [limits.reserve(HOST) for _ in range(2)] == [0.0, 0.0]
+    assert limits.reserve(HOST) > 0
+
+    clock.now += 3600
+    assert [limits.reserve(HOST) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limits.reserve(HOST) == pytest.approx(0.5)
+
+def test_throttling_blocks_the_host_and_halves_its_rate(clock):
+    limits = limiter(clock)
+
+    assert limits.record_response(HOST, 429, '5') == 5.0
+    assert limits.reserve(HOST) == pytest.approx(5.0)
+    assert limits.stats()['hosts'][HOST]['rate'] == 1.0
+
+    limits.record_response(HOST, 200)
+    assert limits.stats()['hosts'][HOST]['rate'] == pytest.approx(1.1)
+
+def test_shared_buckets_are_drawn_from_by_every_process(clock, tmp_path):
+    path = str(tmp_path / 'rate_limits.db')
+    first, second = limiter(clock, shared_path=path), limiter(clock, shared_path=path)
+
+    assert [first.reserve(HOST), second.reserve(HOST), first.reserve(HOST)] == [0.0, 0.0, 0.0]
+    assert second.reserve(HOST) == pytest.approx(0.5)
+
+    clock.now += 10
+    first.record_response(HOST, 503, '30')
+    assert second.reserve(HOST) == pytest.approx(30.0)
+
+class StubSession:
+    """Answers each request with the next (status, headers) pair"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = 0
+
+    def get(self, url, timeout=None, headers=None):
+        status_code, response_headers = self.responses.pop(0)
+        self.requests += 1
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(response_headers)
+        response.url = url
+        response._content = b'<html></html>'
+        return response
+
+class PageScraper(BaseScraper):
+    source = 'test'
+
+    async def search_async(self, location, min_price, max_price, max_pages=None, max_results=None):
+        return []
+
+@pytest.fixture
+def scraper(clock, monkeypatch):
+    monkeypatch.setattr(base_scraper, 'get_rate_limiter', lambda: limiter(clock))
+    monkeypatch.setattr(base_scraper, 'HTTP_CACHE_ENABLED', False)
+    return PageScraper()
+
+def test_throttled_requests_are_retried(scraper):
+    scraper.session = StubSession([(429, {'Retry-After': '0'}), (503, {'Retry-After': '0'}), (200, {})])
+
+    response = scraper._make_request(f"https://{HOST}/search")
+
+    assert response.status_code == 200
+    assert scraper.session.requests == 3
+
+def test_requests_give_up_on_long_retry_after(scraper):
+    scraper.session = StubSession([(429, {'Retry-After': '3600'})])
+
+    assert scraper._make_request(f"https://{HOST}/search") is None
+    assert scraper.session.requests == 1
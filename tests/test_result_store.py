@@ -0,0 +1,70 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from database import result_store
+from database.result_store import ResultStore
+from models.property import Property
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_store, 'time', SimpleNamespace(time=clock))
+    return clock
+
+def listings(prefix: str, count: int):
+    return [
+        Property(id=f"{prefix}-{i}", source='zillow', url='', address=f"{i} Main St", city='Denver', state='CO',
+                 zip_code='80202', price=300000.0 + i, bedrooms=3.0, bathrooms=2.0, features=['Garage'],
+                 date_scraped=datetime(2024, 5, 1, 12, 0))
+        for i in range(count)
+    ]
+
+def ids(rows):
+    return [row.id for row in rows]
+
+def test_least_recently_used_result_sets_are_evicted(clock):
+    store = ResultStore(max_rows=5, ttl=60)
+    store.put('a', listings('a', 2))
+    store.put('b', listings('b', 2))
+    assert ids(store.get('a')) == ['a-0', 'a-1']
+
+    store.put('c', listings('c', 2))
+
+    assert store.get('b') is None
+    assert ids(store.get('a')) == ['a-0', 'a-1'] and ids(store.get('c')) == ['c-0', 'c-1']
+    assert store.stats()['rows'] == 4 and store.stats()['evictions'] == 1
+
+def test_result_sets_expire_after_ttl(clock):
+    store = ResultStore(max_rows=100, ttl=60)
+    store.put('a', listings('a', 1))
+
+    clock.now += 60
+    assert store.exists('a')
+    clock.now += 1
+    assert not store.exists('a') and store.get('a') is None
+
+def test_evicted_result_sets_are_read_back_from_the_spill(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_store, 'SPILL_READ_SIZE', 2)
+    store = ResultStore(max_rows=3, ttl=60, spill_path=str(tmp_path / 'results.db'))
+    store.put('a', listings('a', 3))
+    store.put('b', listings('b', 1))
+
+    spilled = store.get('a')
+    assert [p.to_dict() for p in spilled] == [p.to_dict() for p in listings('a', 3)]
+    assert store.stats()['spill_hits'] == 1
+
+    # Another worker sees the same spill but nothing in memory
+    other = ResultStore(max_rows=3, ttl=60, spill_path=str(tmp_path / 'results.db'))
+    assert ids(other.get('b')) == ['b-0']
+
+    clock.now += 61
+    assert other.get('a') is None
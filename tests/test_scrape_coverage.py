@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.db_handler import DatabaseHandler
+from models.property import Property
+from scrapers.base_scraper import BaseScraper
+
+class PagedScraper(BaseScraper):
+    """Serves result pages from a dict of page number -> listing ids"""
+    source = 'test'
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    async def search_async(self, location, min_price, max_price, max_pages=None, max_results=None):
+        async def fetch_page(page):
+            return ','.join(self.pages[page]) if page in self.pages else None
+
+        return await self._crawl(fetch_page, self._parse_page, max_pages, max_results)
+
+    def _parse_page(self, html):
+        return [Property(id=i, source=self.source, url='', address=f"{i} Main St", city='Denver', state='CO',
+                         zip_code='80202', price=300000.0, bedrooms=3.0, bathrooms=2.0)
+                for i in html.split(',') if i]
+
+def crawl(pages, **limits):
+    scraper = PagedScraper(pages)
+    properties = asyncio.run(scraper.search_async('Denver, CO', 0, 1000000, **limits))
+    return len(properties), scraper.crawl_complete
+
+def test_crawl_is_complete_when_a_page_adds_nothing_new():
+    assert crawl({1: ['a', 'b'], 2: ['c'], 3: []}, max_pages=5) == (3, True)
+    # Sites often repeat the last page past the end of the results
+    assert crawl({1: ['a', 'b'], 2: ['c'], 3: ['c']}, max_pages=5) == (3, True)
+
+def test_crawl_cut_short_is_not_complete():
+    assert crawl({1: ['a', 'b'], 2: ['c'], 3: []}, max_pages=2) == (3, False)
+    assert crawl({1: ['a', 'b'], 2: ['c'], 3: []}, max_pages=5, max_results=2) == (2, False)
+    # Page 2 failed to load
+    assert crawl({1: ['a', 'b'], 3: ['c']}, max_pages=5) == (2, False)
+    # Nothing at all is more likely a block page than an empty search
+    assert crawl({1: []}, max_pages=5) == (0, False)
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseHandler(str(tmp_path / 'coverage.db'))
+
+def test_a_scrape_covers_searches_within_its_price_range(db):
+    started = datetime(2024, 5, 1, 12, 0)
+    db.record_scrape('Denver, CO', 200000, 800000, 'zillow', started)
+
+    assert db.last_scraped('denver co', 300000, 500000) == {'zillow': started}
+    assert db.last_scraped('Denver, CO', 200000, 800000, ['zillow', 'redfin']) == {'zillow': started}
+    assert db.last_scraped('Denver, CO', 100000, 500000) == {}
+    assert db.last_scraped('Boulder, CO', 300000, 500000) == {}
+
+def test_the_latest_covering_scrape_wins(db):
+    earlier = datetime(2024, 5, 1, 12, 0)
+    later = earlier + timedelta(hours=1)
+    db.record_scrape('Denver, CO', 300000, 400000, 'zillow', earlier)
+    db.record_scrape('Denver, CO', 200000, 800000, 'zillow', later)
+    db.record_scrape('Denver, CO', 300000, 400000, 'redfin', earlier)
+
+    assert db.last_scraped('Denver, CO', 300000, 400000) == {'zillow': later, 'redfin': earlier}
+    with db.pool.connection() as conn:
+        # The narrower zillow scrape is superseded and dropped
+        assert conn.execute("SELECT COUNT(*) FROM scrapes WHERE source = 'zillow'").fetchone()[0] == 1
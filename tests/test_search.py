@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import pytest
+
+from database import db_handler
+from database.db_handler import DatabaseHandler, search_expressions
+from models.property import Property
+
+DESCRIPTIONS = {
+    '1': 'Renovated kitchen and a detached garage.',
+    '2': 'Renovation finished this spring. Two garages.',
+    '3': 'Original kitchen with a finished basement.',
+    '4': 'Quiet street close to schools.',
+}
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseHandler(str(tmp_path / 'search.db'))
+    db.insert_properties([
+        Property(id=property_id, source='zillow', url='', address=f"{property_id} Main St", city='Denver',
+                 state='CO', zip_code='80202', price=300000.0 + int(property_id), bedrooms=3.0, bathrooms=2.0,
+                 description=description, date_scraped=datetime.now())
+        for property_id, description in DESCRIPTIONS.items()
+    ])
+    return db
+
+def ids(rows):
+    return sorted(row['id'] for row in rows)
+
+def test_search_expressions_split_words_from_prefixes():
+    assert search_expressions('garage "finished basement" renovat*') == ('"garage" "finished basement"', '"renovat"*')
+    assert search_expressions('kitch*') == ('', '"kitch"*')
+    with pytest.raises(ValueError):
+        search_expressions('* "" -')
+
+def test_exact_words_match_other_forms_of_the_word(db):
+    assert ids(db.get_properties(keywords='garage')) == ['1', '2']
+    assert ids(db.get_properties(keywords='"finished basement"')) == ['3']
+
+def test_prefixes_match_unstemmed_words(db):
+    assert ids(db.get_properties(keywords='renovat*')) == ['1', '2']
+    assert ids(db.get_properties(keywords='renovation*')) == ['2']
+    assert ids(db.get_properties(keywords='kitch* renov*')) == ['1']
+
+def test_words_and_prefixes_combine(db):
+    assert ids(db.get_properties(keywords='garages renovat*')) == ['1', '2']
+    assert ids(db.get_properties(keywords='kitchen renovat*')) == ['1']
+    assert ids(db.get_properties(keywords='kitchen garage renovat*', sort='rank')) == ['1']
+
+def test_prefix_index_follows_updated_descriptions(db):
+    db.insert_properties([
+        Property(id='4', source='zillow', url='', address='4 Main St', city='Denver', state='CO',
+                 zip_code='80202', price=300004.0, bedrooms=3.0, bathrooms=2.0,
+                 description='Newly renovated bathrooms.', date_scraped=datetime.now())
+    ])
+
+    assert ids(db.get_properties(keywords='renovat*')) == ['1', '2', '4']
+    assert ids(db.get_properties(keywords='quie*')) == []
+
+def test_indexes_are_keyed_by_a_declared_primary_key(db):
+    with db.pool.connection() as conn:
+        columns = {column['name']: column for column in conn.execute('PRAGMA table_info(properties)')}
+        assert columns['listing_key']['pk'] == 1 and columns['listing_key']['type'] == 'INTEGER'
+
+        conn.execute("DELETE FROM properties WHERE id = '1'")
+        conn.commit()
+        conn.execute('VACUUM')
+
+    assert ids(db.get_properties(keywords='garage')) == ['2']
+    assert ids(db.get_properties(keywords='renovat*')) == ['2']
+
+def test_migration_rekeys_indexes_after_rowids_moved(tmp_path, monkeypatch):
+    path = str(tmp_path / 'old.db')
+    monkeypatch.setattr(db_handler, 'MIGRATIONS', db_handler.MIGRATIONS[:8])
+    old = DatabaseHandler(path)
+    old.insert_properties([
+        Property(id=property_id, source='zillow', url='', address=f"{property_id} Main St", city='Denver',
+                 state='CO', zip_code='80202', price=300000.0, bedrooms=3.0, bathrooms=2.0,
+                 description=description, latitude=39.7 + int(property_id) / 100, longitude=-105.0,
+                 date_scraped=datetime.now())
+        for property_id, description in DESCRIPTIONS.items()
+    ])
+    # What a VACUUM may do to a table without an INTEGER PRIMARY KEY
+    with old.pool.connection() as conn:
+        conn.execute('UPDATE properties SET rowid = rowid + 100')
+        conn.commit()
+
+    monkeypatch.undo()
+    db_handler._initialized_paths.discard(path)
+    db = DatabaseHandler(path)
+
+    assert ids(db.get_properties(keywords='garage')) == ['1', '2']
+    assert ids(db.get_properties(keywords='kitchen renovat*')) == ['1']
+    assert ids(db.get_properties(bounds=(39.715, -105.1, 39.735, -104.9))) == ['2', '3']
+
+    db.insert_properties([
+        Property(id='4', source='zillow', url='', address='4 Main St', city='Denver', state='CO', zip_code='80202',
+                 price=290000.0, bedrooms=3.0, bathrooms=2.0, description=DESCRIPTIONS['4'], date_scraped=datetime.now())
+    ])
+    changes = db.get_price_changes(datetime(2000, 1, 1))
+    assert [change['id'] for change in changes] == ['4'] and 'listing_key' not in changes[0]
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import pytest
+
+import web_app
+from database.job_store import JobStore
+from models.property import Property
+from scrapers.job_queue import JobQueue
+from web_app import app
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+@pytest.mark.parametrize('body, message', [
+    ({'maxPages': 'two'}, 'maxPages must be a number'),
+    ({'maxPages': 0}, 'maxPages must be at least 1'),
+    ({'maxResults': [50]}, 'maxResults must be a number'),
+    ({'maxAge': 'an hour'}, 'maxAge must be a number'),
+    ({'maxAge': -60}, 'maxAge must be at least 0'),
+])
+def test_malformed_limits_are_rejected_before_queueing(client, body, message):
+    response = client.post('/search', json={'location': 'Denver, CO', **body})
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert message in response.get_json()['error']
+
+def test_dedupe_polls_leave_the_cached_batch_unchanged(client, tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(web_app, 'get_job_queue', lambda: JobQueue(store=store))
+    store.create('job', 'key', {})
+    for source in ('zillow', 'redfin'):
+        store.record_source('job', source, 'ok', [
+            Property(id=f"{source}-{i}", source=source, url='', address=f"{i} Main St", city='Denver', state='CO',
+                     zip_code='80202', price=300000.0 + i, bedrooms=3.0, bathrooms=2.0,
+                     date_scraped=datetime(2024, 5, 1, 12, 0)).to_dict()
+            for i in range(3)
+        ])
+    before = [row.to_dict() for row in store.get_batch('job')]
+
+    for _ in range(2):
+        response = client.get('/jobs/job?dedupe=1')
+        assert response.get_json()['count'] == 3
+        assert response.get_json()['listing_count'] == 6
+
+    assert [row.to_dict() for row in store.get_batch('job')] == before
+    assert all(row['canonical_id'] is None for row in before)
+
+def test_event_stream_ends_with_an_error_when_the_job_is_deleted(client, tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    job_queue = JobQueue(store=store)
+    monkeypatch.setattr(web_app, 'get_job_queue', lambda: job_queue)
+    store.create('job', 'key', {})
+
+    def delete_job(job_id, version, timeout):
+        store.delete(job_id)
+        return version + 1
+
+    monkeypatch.setattr(job_queue, 'wait_for_change', delete_job)
+    response = client.get('/jobs/job/events')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert body.startswith('event: error\n')
+    assert 'Unknown job: job' in body
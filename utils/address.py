@@ -0,0 +1,77 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+# USPS standard abbreviations for the street suffixes that show up in listings
+STREET_SUFFIXES = {
+    'alley': 'aly', 'avenue': 'ave', 'av': 'ave', 'boulevard': 'blvd', 'circle': 'cir',
+    'court': 'ct', 'cove': 'cv', 'crossing': 'xing', 'drive': 'dr', 'expressway': 'expy',
+    'freeway': 'fwy', 'highway': 'hwy', 'lane': 'ln', 'loop': 'loop', 'parkway': 'pkwy',
+    'place': 'pl', 'plaza': 'plz', 'point': 'pt', 'road': 'rd', 'route': 'rte',
+    'square': 'sq', 'street': 'st', 'str': 'st', 'terrace': 'ter', 'trail': 'trl',
+    'way': 'way',
+}
+
+DIRECTIONALS = {
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+
+ORDINALS = {
+    'first': '1st', 'second': '2nd', 'third': '3rd', 'fourth': '4th', 'fifth': '5th',
+    'sixth': '6th', 'seventh': '7th', 'eighth': '8th', 'ninth': '9th', 'tenth': '10th',
+}
+
+UNIT_PATTERN = re.compile(
+    r'(?:#|\b(?:apt|apartment|unit|ste|suite|bldg|building|fl|floor|rm|room|lot|spc|space)\b)\s*#?\s*([a-z0-9-]+)\s*$'
+)
+NUMBER_PATTERN = re.compile(r'^(\d+[a-z]?(?:-\d+)?)\b\s*')
+PUNCTUATION_PATTERN = re.compile(r"[^a-z0-9#\s-]")
+
+@dataclass(frozen=True)
+class NormalizedAddress:
+    number: str  # House number, e.g. '123' or '12b'
+    street: str  # Street name with standard abbreviations, e.g. 'n main st'
+    unit: str  # Apartment or unit number, '' if none
+
+    def key(self) -> str:
+        """Return a string that is equal for equivalent spellings of an address"""
+        return f"{self.number}|{self.street}|{self.unit}"
+
+@lru_cache(maxsize=65536)
+def normalize_address(address: str) -> NormalizedAddress:
+    """Split a street address into house number, standardized street name and unit.
+
+    "123 North Main Street, Apt. 4" and "123 N Main St #4" both become
+    NormalizedAddress('123', 'n main st', '4'). Anything after the street
+    and unit (city, state, ZIP code) is ignored.
+    """
+    address = (address or '').lower().replace('.', '').replace("'", '')
+    parts = [p.strip() for p in address.split(',')]
+    text = parts[0] if parts else ''
+
+    # A unit is sometimes listed after the street, as its own comma-separated part
+    if len(parts) > 1 and UNIT_PATTERN.search(parts[1]):
+        text = f"{text} {parts[1]}"
+
+    text = PUNCTUATION_PATTERN.sub(' ', text)
+
+    unit = ''
+    unit_match = UNIT_PATTERN.search(text)
+    if unit_match:
+        unit = unit_match.group(1).lstrip('0') or '0'
+        text = text[:unit_match.start()]
+
+    number = ''
+    number_match = NUMBER_PATTERN.match(text.strip())
+    if number_match:
+        number = number_match.group(1)
+        text = text.strip()[number_match.end():]
+
+    words = []
+    for word in text.split():
+        word = word.strip('-#')
+        if word:
+            words.append(DIRECTIONALS.get(word) or ORDINALS.get(word) or STREET_SUFFIXES.get(word, word))
+
+    return NormalizedAddress(number, ' '.join(words), unit)
@@ -0,0 +1,185 @@
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from database.db_handler import DatabaseHandler, PROPERTY_COLUMNS
+from utils.exporters import ExportRow
+
+# Rows converted to Arrow at a time, bounding memory for large exports
+COLUMNAR_BATCH_SIZE = 50000
+
+# Export format -> (MIME type, file extension)
+COLUMNAR_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+}
+
+FLOAT_COLUMNS = ['price', 'bedrooms', 'bathrooms', 'square_feet', 'lot_size', 'latitude', 'longitude']
+LIST_COLUMNS = ['features', 'image_urls']
+DATE_COLUMNS = ['date_listed', 'date_scraped']
+
+def columnar_available() -> bool:
+    """True if Parquet and Arrow files can be written"""
+    return pa is not None
+
+def property_schema() -> 'pa.Schema':
+    """Arrow schema for properties, in PROPERTY_COLUMNS order"""
+    types = {column: pa.string() for column in PROPERTY_COLUMNS}
+    types.update({column: pa.float64() for column in FLOAT_COLUMNS})
+    types.update({column: pa.list_(pa.string()) for column in LIST_COLUMNS})
+    types.update({column: pa.timestamp('us') for column in DATE_COLUMNS})
+    types['year_built'] = pa.int32()
+    types['source'] = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([pa.field(column, types[column], nullable=column not in ('id', 'source', 'price'))
+                      for column in PROPERTY_COLUMNS])
+
+def _split(value: Any) -> Optional[List[str]]:
+    """Return a list column value from a list or comma-joined string"""
+    if value is None or isinstance(value, list):
+        return value
+    return value.split(',') if value else []
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Return a timestamp column value from a datetime or ISO string"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+def _column_values(items: List[ExportRow]) -> Dict[str, list]:
+    """Transpose properties or database rows into typed column lists"""
+    columns: Dict[str, list] = {column: [] for column in PROPERTY_COLUMNS}
+
+    for item in items:
+        if not isinstance(item, dict):
+            item = item.to_dict()
+        for column in PROPERTY_COLUMNS:
+            columns[column].append(item.get(column))
+
+    for column in LIST_COLUMNS:
+        columns[column] = [_split(value) for value in columns[column]]
+    for column in DATE_COLUMNS:
+        columns[column] = [_timestamp(value) for value in columns[column]]
+    columns['year_built'] = [int(value) if value is not None else None for value in columns['year_built']]
+    return columns
+
+def iter_record_batches(items: Iterable[ExportRow], batch_size: int = COLUMNAR_BATCH_SIZE) -> Iterator['pa.RecordBatch']:
+    """Convert properties to Arrow record batches of at most batch_size rows"""
+    if pa is None:
+        raise RuntimeError('Parquet and Arrow export require pyarrow')
+
+    schema = property_schema()
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, batch_size))
+        if not chunk:
+            break
+        columns = _column_values(chunk)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(columns[field.name], type=field.type) for field in schema], schema=schema
+        )
+
+class _ChunkSink:
+    """A write-only file object that collects what a writer produces until it is drained"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_columnar(items: Iterable[ExportRow], format_type: str) -> Iterator[bytes]:
+    """Encode properties as Parquet or Arrow IPC, yielding bytes after each record batch"""
+    if format_type not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {format_type}")
+    if pa is None:
+        raise RuntimeError('Parquet and Arrow export require pyarrow')
+
+    sink = _ChunkSink()
+    schema = property_schema()
+    if format_type == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = ipc.new_file(sink, schema)
+
+    for batch in iter_record_batches(items):
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+
+    writer.close()
+    yield sink.drain()
+
+def write_columnar(items: Iterable[ExportRow], format_type: str, path: str) -> int:
+    """Write properties to a Parquet or Arrow IPC file and return the number written"""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    with open(path, 'wb') as f:
+        for chunk in stream_columnar(counted(), format_type):
+            f.write(chunk)
+
+    return count
+
+def to_dataframe(items: Iterable[ExportRow]) -> pd.DataFrame:
+    """Build a typed DataFrame: float prices and sizes, nullable int year_built, datetime dates, list features"""
+    if pa is not None:
+        batches = list(iter_record_batches(items))
+        table = pa.Table.from_batches(batches, schema=property_schema())
+        return table.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+
+    columns = _column_values(list(items))
+    frame = pd.DataFrame(columns, columns=PROPERTY_COLUMNS)
+    for column in FLOAT_COLUMNS:
+        frame[column] = frame[column].astype('float64')
+    for column in DATE_COLUMNS:
+        frame[column] = pd.to_datetime(frame[column])
+    frame['year_built'] = frame['year_built'].astype('Int32')
+    frame['source'] = frame['source'].astype('category')
+    return frame
+
+def load_properties_dataframe(db: Optional[DatabaseHandler] = None,
+                              chunk_size: int = COLUMNAR_BATCH_SIZE,
+                              **filters) -> pd.DataFrame:
+    """Read stored properties into a DataFrame, one keyset page at a time.
+
+    filters are passed to DatabaseHandler.iter_properties, e.g.
+    load_properties_dataframe(location='Denver, CO', min_price=300000).
+    """
+    db = db or DatabaseHandler()
+    rows = db.iter_properties(page_size=chunk_size, **filters)
+    return to_dataframe(rows)
@@ -0,0 +1,99 @@
+import hashlib
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import DEDUPE_STREET_SIMILARITY, SOURCE_PRIORITY
+from models.property import Property, CanonicalProperty
+from utils.address import NormalizedAddress, normalize_address, STREET_SUFFIXES, DIRECTIONALS
+
+# Street tokens that sites often drop or add, e.g. "Main St" vs "Main" or "N Main St" vs "Main St"
+OPTIONAL_STREET_TOKENS = set(STREET_SUFFIXES.values()) | set(DIRECTIONALS.values())
+
+def street_similarity(a: str, b: str) -> float:
+    """Score how likely two normalized street names are the same street, from 0 to 1"""
+    if a == b:
+        return 1.0
+
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if tokens_a and tokens_b and (tokens_a <= tokens_b or tokens_b <= tokens_a):
+        if (tokens_a ^ tokens_b) <= OPTIONAL_STREET_TOKENS:
+            return 0.95
+
+    return SequenceMatcher(None, a, b).ratio()
+
+def block_key(zip_code: str, address: NormalizedAddress) -> Optional[Tuple[str, str]]:
+    """Return the (ZIP5, house number) block a listing is compared within, or None if it can't be blocked"""
+    zip5 = (zip_code or '')[:5]
+    if not zip5 or not address.number:
+        return None
+    return zip5, address.number
+
+def canonical_id_for(zip_code: str, address: NormalizedAddress) -> str:
+    """Derive a canonical id from the first address seen for a property"""
+    key = f"{(zip_code or '')[:5]}|{address.key()}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+class EntityResolver:
+    """Assigns the same canonical id to listings of the same home from different sites.
+
+    Listings are only compared within their block, i.e. with listings that
+    share a ZIP code and house number, so resolving n listings costs
+    O(n * block size) instead of O(n^2). Within a block, listings match when
+    their units are equal and their street names are similar enough.
+    """
+
+    def __init__(self, threshold: float = DEDUPE_STREET_SIMILARITY):
+        self.threshold = threshold
+        self._blocks: Dict[Tuple[str, str], List[Tuple[str, str, str]]] = defaultdict(list)
+
+    def add_known(self, zip_code: str, address: NormalizedAddress, canonical_id: str):
+        """Seed the resolver with a listing whose canonical id is already known"""
+        key = block_key(zip_code, address)
+        if key is not None:
+            self._blocks[key].append((address.street, address.unit, canonical_id))
+
+    def resolve_address(self, zip_code: str, address: NormalizedAddress) -> Optional[str]:
+        """Return the canonical id for an address, registering a new one if nothing matches.
+
+        Returns None for addresses without a ZIP code or house number.
+        """
+        key = block_key(zip_code, address)
+        if key is None:
+            return None
+
+        block = self._blocks[key]
+        for street, unit, canonical_id in block:
+            if unit == address.unit and street_similarity(street, address.street) >= self.threshold:
+                return canonical_id
+
+        canonical_id = canonical_id_for(zip_code, address)
+        block.append((address.street, address.unit, canonical_id))
+        return canonical_id
+
+    def resolve(self, prop: Property) -> str:
+        """Return a property's canonical id without setting it; unblockable listings keep their own id"""
+        return self.resolve_address(prop.zip_code, normalize_address(prop.address)) or prop.id
+
+def merge_properties(properties: Iterable[Property],
+                     resolver: Optional[EntityResolver] = None) -> List[CanonicalProperty]:
+    """Group listings of the same home into canonical properties, keeping first-seen order.
+
+    Listings that already carry a canonical id (e.g. from the database) keep
+    it; the rest are resolved with the given or a fresh resolver. The
+    listings themselves are left unchanged.
+    """
+    resolver = resolver or EntityResolver()
+    groups: Dict[str, List[Property]] = {}
+
+    for prop in properties:
+        canonical_id = prop.canonical_id or resolver.resolve(prop)
+        groups.setdefault(canonical_id, []).append(prop)
+
+    rank = {source: i for i, source in enumerate(SOURCE_PRIORITY)}
+
+    return [
+        CanonicalProperty(canonical_id=canonical_id,
+                          listings=sorted(listings, key=lambda prop: rank.get(prop.source, len(rank))))
+        for canonical_id, listings in groups.items()
+    ]
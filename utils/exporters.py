@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, Union
+
+from database.db_handler import PROPERTY_COLUMNS
+from models.property import Property
+
+# Exported fields, in column order
+EXPORT_COLUMNS = list(PROPERTY_COLUMNS)
+
+# Bytes of output gathered before a chunk is handed to the response
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# A Property, a PropertyRow or a database row dictionary
+ExportRow = Union[Property, Dict[str, Any]]
+
+def export_row(item: ExportRow) -> Dict[str, Any]:
+    """Turn a Property, PropertyRow or database row into a flat dictionary of EXPORT_COLUMNS"""
+    data = item if isinstance(item, dict) else item.to_dict()
+    row = {}
+    for column in EXPORT_COLUMNS:
+        value = data.get(column)
+        row[column] = ','.join(value) if isinstance(value, list) else value
+    return row
+
+def _chunked(pieces: Iterable[str]) -> Iterator[str]:
+    """Join small pieces of text into chunks of about EXPORT_CHUNK_SIZE"""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def _take(buffer: io.StringIO) -> str:
+    """Return and clear the contents of a text buffer"""
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+def iter_csv(items: Iterable[ExportRow]) -> Iterator[str]:
+    """Encode properties as CSV with a header row, one chunk at a time"""
+    line = io.StringIO()
+    writer = csv.DictWriter(line, fieldnames=EXPORT_COLUMNS)
+
+    def rows():
+        writer.writeheader()
+        yield _take(line)
+        for item in items:
+            writer.writerow(export_row(item))
+            yield _take(line)
+
+    return _chunked(rows())
+
+def iter_json(items: Iterable[ExportRow]) -> Iterator[str]:
+    """Encode properties as a JSON array, one chunk at a time"""
+    def pieces():
+        yield '['
+        for i, item in enumerate(items):
+            yield (',\n' if i else '\n') + json.dumps(export_row(item))
+        yield '\n]\n'
+
+    return _chunked(pieces())
+
+def iter_ndjson(items: Iterable[ExportRow]) -> Iterator[str]:
+    """Encode properties as newline-delimited JSON, one object per line"""
+    return _chunked(json.dumps(export_row(item)) + '\n' for item in items)
+
+# Export format -> (MIME type, file extension, encoder)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    'csv': ('text/csv', 'csv', iter_csv),
+    'json': ('application/json', 'json', iter_json),
+    'ndjson': ('application/x-ndjson', 'ndjson', iter_ndjson),
+}
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip a stream of text chunks without holding more than one chunk in memory"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def stream_export(items: Iterable[ExportRow], format_type: str, compress: bool = False) -> Iterator[bytes]:
+    """Encode properties in an export format as a stream of bytes, optionally gzipped"""
+    if format_type not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format_type}")
+
+    encoder: Callable[[Iterable[ExportRow]], Iterator[str]] = EXPORT_FORMATS[format_type][2]
+    chunks = encoder(items)
+    if compress:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
+
+def export_filename(base: str, format_type: str, compress: bool = False) -> str:
+    """Return the file name for an export, e.g. properties.csv.gz"""
+    extension = EXPORT_FORMATS[format_type][1]
+    return f"{base}.{extension}.gz" if compress else f"{base}.{extension}"
+
+def write_export(items: Iterable[ExportRow], format_type: str, path: str, compress: bool = False) -> int:
+    """Stream properties to a file and return the number written"""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    with open(path, 'wb') as f:
+        for chunk in stream_export(counted(), format_type, compress):
+            f.write(chunk)
+
+    return count
@@ -0,0 +1,57 @@
+import math
+from typing import Optional, Tuple
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LATITUDE = math.pi * EARTH_RADIUS_MILES / 180
+
+# (south, west, north, east) in degrees; west > east for a box that crosses the 180th meridian
+Bounds = Tuple[float, float, float, float]
+
+def distance_miles(lat1: Optional[float], lon1: Optional[float],
+                   lat2: Optional[float], lon2: Optional[float]) -> Optional[float]:
+    """Great-circle distance between two points, or None if either is missing"""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+def check_point(latitude: float, longitude: float):
+    """Raise ValueError unless a point is a valid latitude and longitude"""
+    if not -90 <= latitude <= 90:
+        raise ValueError(f"Latitude must be between -90 and 90: {latitude}")
+    if not -180 <= longitude <= 180:
+        raise ValueError(f"Longitude must be between -180 and 180: {longitude}")
+
+def check_bounds(bounds: Bounds):
+    """Raise ValueError unless a box has valid corners with its south edge below its north edge"""
+    south, west, north, east = bounds
+    check_point(south, west)
+    check_point(north, east)
+    if south > north:
+        raise ValueError(f"South edge {south} is north of the north edge {north}")
+
+def radius_bounds(latitude: float, longitude: float, miles: float) -> Bounds:
+    """Return the smallest box containing every point within miles of a point.
+
+    A circle reaching a pole spans every longitude; one crossing the 180th
+    meridian gives a box with west > east.
+    """
+    check_point(latitude, longitude)
+    if miles <= 0:
+        raise ValueError(f"Radius must be positive: {miles}")
+
+    delta_lat = miles / MILES_PER_DEGREE_LATITUDE
+    south, north = latitude - delta_lat, latitude + delta_lat
+    if south <= -90 or north >= 90:
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+
+    # Circles of latitude shrink towards the poles, widening the box in degrees
+    delta_lon = math.degrees(math.asin(math.sin(math.radians(delta_lat)) / math.cos(math.radians(latitude))))
+    west, east = longitude - delta_lon, longitude + delta_lon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
@@ -1,6 +1,9 @@
 import re
 from typing import Dict, Any, List
 
+WHITESPACE_PATTERN = re.compile(r'\s+')
+ZIP_CODE_PATTERN = re.compile(r'\b\d{5}(?:-\d{4})?\b')
+
 def format_price(price: float) -> str:
     """Format a price as currency"""
     return f"${price:,.2f}"
@@ -26,12 +29,11 @@ def clean_text(text: str) -> str:
         return ""
     
     # Replace all whitespace with a single space
-    return re.sub(r'\s+', ' ', text).strip()
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
 
 def extract_zip_code(text: str) -> str:
     """Extract a ZIP code from text"""
-    zip_pattern = r'\b\d{5}(?:-\d{4})?\b'
-    match = re.search(zip_pattern, text)
+    match = ZIP_CODE_PATTERN.search(text or '')
     
     return match.group(0) if match else ""
 
@@ -47,3 +49,52 @@ def validate_price_range(min_price: float, max_price: float) -> Dict[str, float]
         result['min_price'] = 0
     
     return result
+
+# Full state names mapped to their USPS abbreviations
+STATE_ABBREVIATIONS = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar',
+    'california': 'ca', 'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de',
+    'florida': 'fl', 'georgia': 'ga', 'hawaii': 'hi', 'idaho': 'id',
+    'illinois': 'il', 'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks',
+    'kentucky': 'ky', 'louisiana': 'la', 'maine': 'me', 'maryland': 'md',
+    'massachusetts': 'ma', 'michigan': 'mi', 'minnesota': 'mn', 'mississippi': 'ms',
+    'missouri': 'mo', 'montana': 'mt', 'nebraska': 'ne', 'nevada': 'nv',
+    'new hampshire': 'nh', 'new jersey': 'nj', 'new mexico': 'nm', 'new york': 'ny',
+    'north carolina': 'nc', 'north dakota': 'nd', 'ohio': 'oh', 'oklahoma': 'ok',
+    'oregon': 'or', 'pennsylvania': 'pa', 'rhode island': 'ri', 'south carolina': 'sc',
+    'south dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx', 'utah': 'ut',
+    'vermont': 'vt', 'virginia': 'va', 'washington': 'wa', 'west virginia': 'wv',
+    'wisconsin': 'wi', 'wyoming': 'wy', 'district of columbia': 'dc'
+}
+
+def normalize_location_part(text: str) -> str:
+    """Normalize a city or state for indexed lookups"""
+    return clean_text(text).lower() if text else ""
+
+def normalize_state(text: str) -> str:
+    """Normalize a state name or abbreviation to a lowercase abbreviation"""
+    state = normalize_location_part(text)
+    return STATE_ABBREVIATIONS.get(state, state)
+
+def normalize_search_location(location: str) -> str:
+    """Normalize a search location so "Denver, Colorado" and "denver co" compare equal"""
+    parts = [normalize_location_part(p) for p in location.split(',')]
+    parts = [p for p in parts if p]
+    
+    if len(parts) == 1:
+        # Without a comma, treat a trailing state name or abbreviation as the state
+        words = parts[0].split(' ')
+        for size in (2, 1):
+            state = normalize_state(' '.join(words[-size:]))
+            if len(words) > size and state in STATE_ABBREVIATIONS.values():
+                parts = [' '.join(words[:-size]), state]
+                break
+    elif len(parts) > 1:
+        parts[-1] = normalize_state(parts[-1])
+    
+    return ', '.join(parts)
+
+def search_key(location: str, min_price: float, max_price: float, sources: List[str]) -> str:
+    """Identify searches that would scrape the same listings"""
+    sources = ','.join(sorted({s.strip().lower() for s in sources}))
+    return f"{normalize_search_location(location)}|{min_price:g}|{max_price:g}|{sources}"
@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# Parsed strings remembered per function; rescrapes mostly see text parsed before
+PARSE_CACHE_SIZE = 65536
+
+# "123 Main St, Anytown, CA 12345"
+ADDRESS_LINE_PATTERN = re.compile(r'(.*?),\s*(.*?),\s*([A-Z]{2})\s*(\d{5}(?:-\d{4})?)')
+# "123 Main St, Anytown, CA", for cards that leave out the ZIP code
+ADDRESS_LINE_NO_ZIP_PATTERN = re.compile(r'(.*?),\s*(.*?),\s*([A-Z]{2})\b')
+
+# Card stats run together, e.g. "3 bds2 ba1,500 sqft" or "3 Beds 2.5 Baths 1,500 Sq Ft"
+BEDS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:bedrooms?|beds?|bds?)', re.IGNORECASE)
+BATHS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:bathrooms?|baths?|ba)', re.IGNORECASE)
+SQFT_PATTERN = re.compile(r'(\d[\d,]*)\s*(?:sq\.?\s*ft|sqft|square\s*feet)', re.IGNORECASE)
+
+NUMBER_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+# "$450,000", "$1.2M" or "$850K"
+PRICE_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([KkMm](?![A-Za-z]))?')
+PRICE_MULTIPLIERS = {'k': 1000, 'm': 1000000}
+
+class AddressParts(NamedTuple):
+    address: str  # Street address, or the whole text if it couldn't be split
+    city: str
+    state: str  # Two-letter abbreviation
+    zip: str  # ZIP or ZIP+4 code
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_address_line(text: str) -> AddressParts:
+    """Split a one-line US address like "123 Main St, Anytown, CA 12345" into its parts"""
+    if not text:
+        return AddressParts('', '', '', '')
+
+    match = ADDRESS_LINE_PATTERN.match(text)
+    if match:
+        return AddressParts(*(group.strip() for group in match.groups()))
+
+    match = ADDRESS_LINE_NO_ZIP_PATTERN.match(text)
+    if match:
+        return AddressParts(*(group.strip() for group in match.groups()), '')
+
+    # If we can't parse it, just store the whole address
+    return AddressParts(text, '', '', '')
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_listing_stats(text: str) -> Tuple[float, float, Optional[float]]:
+    """Parse beds, baths and square footage from card text, with 0, 0 and None for any missing"""
+    beds, baths, sqft = 0, 0, None
+    if not text:
+        return beds, baths, sqft
+
+    beds_match = BEDS_PATTERN.search(text)
+    if beds_match:
+        beds = float(beds_match.group(1))
+
+    baths_match = BATHS_PATTERN.search(text)
+    if baths_match:
+        baths = float(baths_match.group(1))
+
+    sqft_match = SQFT_PATTERN.search(text)
+    if sqft_match:
+        sqft = float(sqft_match.group(1).replace(',', ''))
+
+    return beds, baths, sqft
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_number(text: str) -> Optional[float]:
+    """Return the first number in text, ignoring thousands separators"""
+    match = NUMBER_PATTERN.search(text or '')
+    return float(match.group(0).replace(',', '')) if match else None
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_price(text: str) -> Optional[float]:
+    """Parse a listed price like "$450,000" or "$1.2M", or None if there is no number"""
+    match = PRICE_PATTERN.search(text or '')
+    if not match:
+        return None
+
+    price = float(match.group(1).replace(',', ''))
+    if match.group(2):
+        price *= PRICE_MULTIPLIERS[match.group(2).lower()]
+    return price
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from models.property import Property
+from models.property_batch import PropertyBatch, MISSING_YEAR
+
+# Keys results can be ranked by
+SORT_KEYS = ['price', 'bedrooms', 'bathrooms', 'square_feet', 'price_per_sqft', 'year_built', 'date_scraped']
+
+@dataclass
+class PropertyFilter:
+    """Criteria a property must meet; None means no limit.
+
+    Properties missing a field that a criterion depends on (e.g. square
+    footage for min_sqft) don't match it.
+    """
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_beds: Optional[float] = None
+    max_beds: Optional[float] = None
+    min_baths: Optional[float] = None
+    max_baths: Optional[float] = None
+    min_sqft: Optional[float] = None
+    max_sqft: Optional[float] = None
+    min_price_per_sqft: Optional[float] = None
+    max_price_per_sqft: Optional[float] = None
+    min_year_built: Optional[int] = None
+    max_year_built: Optional[int] = None
+    property_types: Optional[Sequence[str]] = None  # Normalized types, e.g. 'single_family'
+    zip_codes: Optional[Sequence[str]] = None  # 5-digit ZIP codes
+
+    def is_empty(self) -> bool:
+        """True if every property matches"""
+        return all(getattr(self, f.name) is None for f in fields(self))
+
+    def mask(self, batch: PropertyBatch) -> np.ndarray:
+        """Evaluate every criterion over the whole batch at once, returning a boolean match array"""
+        matches = np.ones(len(batch), dtype=bool)
+
+        ranges = [
+            ('price', self.min_price, self.max_price),
+            ('bedrooms', self.min_beds, self.max_beds),
+            ('bathrooms', self.min_baths, self.max_baths),
+            ('square_feet', self.min_sqft, self.max_sqft),
+        ]
+        for column, low, high in ranges:
+            if low is not None:
+                matches &= batch.column(column) >= low
+            if high is not None:
+                matches &= batch.column(column) <= high
+
+        if self.min_price_per_sqft is not None or self.max_price_per_sqft is not None:
+            per_sqft = price_per_sqft(batch)
+            if self.min_price_per_sqft is not None:
+                matches &= per_sqft >= self.min_price_per_sqft
+            if self.max_price_per_sqft is not None:
+                matches &= per_sqft <= self.max_price_per_sqft
+
+        if self.min_year_built is not None or self.max_year_built is not None:
+            years = batch.column('year_built')
+            matches &= years != MISSING_YEAR
+            if self.min_year_built is not None:
+                matches &= years >= self.min_year_built
+            if self.max_year_built is not None:
+                matches &= years <= self.max_year_built
+
+        if self.property_types is not None:
+            wanted = set(self.property_types)
+            matches &= _category_mask(batch, 'property_type', lambda value: value in wanted)
+
+        if self.zip_codes is not None:
+            wanted = {zip_code[:5] for zip_code in self.zip_codes}
+            matches &= _category_mask(batch, 'zip_code', lambda value: (value or '')[:5] in wanted)
+
+        return matches
+
+def _category_mask(batch: PropertyBatch, column: str, accept: Callable[[Any], bool]) -> np.ndarray:
+    """Boolean array marking rows whose value is accepted, testing each distinct value once"""
+    codes, categories = batch.codes(column)
+    accepted = np.fromiter((accept(value) for value in categories), dtype=bool, count=len(categories))
+    return accepted[codes]
+
+def price_per_sqft(batch: PropertyBatch) -> np.ndarray:
+    """Price divided by square footage, NaN where the size is unknown or zero"""
+    sqft = batch.column('square_feet')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(sqft > 0, batch.column('price') / sqft, np.nan)
+
+def _sort_values(batch: PropertyBatch, sort: str, descending: bool) -> np.ndarray:
+    """Float ranking keys for a sort column, with missing values ranked last either way"""
+    if sort == 'price_per_sqft':
+        values = price_per_sqft(batch)
+    elif sort == 'year_built':
+        years = batch.column('year_built')
+        values = np.where(years == MISSING_YEAR, np.nan, years.astype(np.float64))
+    elif sort == 'date_scraped':
+        values = batch.column('date_scraped').astype(np.int64).astype(np.float64)
+    else:
+        values = batch.column(sort)
+
+    values = -values if descending else values.copy()
+    values[np.isnan(values)] = np.inf
+    return values
+
+def rank(batch: PropertyBatch, indices: np.ndarray, sort: str, descending: bool = False,
+         limit: Optional[int] = None) -> np.ndarray:
+    """Order the given rows by a sort key, keeping only the top limit.
+
+    With a limit, the top rows are picked with a partial selection in O(n)
+    and only those are sorted, instead of sorting every match.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unsupported sort key: {sort}")
+
+    keys = _sort_values(batch, sort, descending)[indices]
+    if limit is not None and limit < len(indices):
+        if limit <= 0:
+            return indices[:0]
+        # Everything below the limit-th key makes the cut, then the earliest rows tied with it
+        cutoff = np.partition(keys, limit - 1)[limit - 1]
+        below = np.flatnonzero(keys < cutoff)
+        tied = np.flatnonzero(keys == cutoff)[:limit - len(below)]
+        top = np.sort(np.concatenate([below, tied]))
+        return indices[top[np.argsort(keys[top], kind='stable')]]
+
+    return indices[np.argsort(keys, kind='stable')]
+
+def select(properties: Union[PropertyBatch, Sequence[Property]],
+           criteria: Optional[PropertyFilter] = None,
+           sort: Optional[str] = None,
+           descending: bool = False,
+           limit: Optional[int] = None) -> np.ndarray:
+    """Return the indices of the properties matching criteria, best first when sorted"""
+    unfiltered = criteria is None or criteria.is_empty()
+    if unfiltered and not sort:
+        # Nothing to evaluate, so don't build columns just to return every row
+        indices = np.arange(len(properties))
+        return indices[:limit] if limit is not None else indices
+
+    batch = properties if isinstance(properties, PropertyBatch) else PropertyBatch.from_properties(properties)
+    indices = np.arange(len(batch)) if unfiltered else np.flatnonzero(criteria.mask(batch))
+
+    if sort:
+        return rank(batch, indices, sort, descending, limit)
+    return indices[:limit] if limit is not None else indices
+
+def filter_properties(properties: Iterable[Property],
+                      criteria: Optional[PropertyFilter] = None,
+                      sort: Optional[str] = None,
+                      descending: bool = False,
+                      limit: Optional[int] = None) -> List[Property]:
+    """Return the matching properties themselves, best first when sorted"""
+    properties = properties if isinstance(properties, (list, tuple, PropertyBatch)) else list(properties)
+    return [properties[i] for i in select(properties, criteria, sort, descending, limit)]
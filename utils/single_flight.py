@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from config.settings import SINGLE_FLIGHT_SHARED, SINGLE_FLIGHT_LEASE_PATH, SINGLE_FLIGHT_LEASE_TTL
+from database.db_handler import get_pool
+
+# Seconds between checks while another process holds a lease
+LEASE_POLL_INTERVAL = 0.5
+
+class LeaseTable:
+    """Named, expiring leases in SQLite that worker processes use to see who is already doing what.
+
+    Leases expire after ttl seconds so a crashed worker can't hold one forever.
+    """
+
+    def __init__(self, path: str = SINGLE_FLIGHT_LEASE_PATH, ttl: float = SINGLE_FLIGHT_LEASE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        self.pool = get_pool(path)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.pool.connection() as conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                value TEXT,
+                expires_at REAL NOT NULL
+            )
+            ''')
+            conn.commit()
+
+    def acquire(self, key: str, value: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """Try to take the lease for key; returns whether we got it and the holder's value"""
+        now = time.time()
+
+        with self.pool.connection() as conn:
+            conn.execute('''
+            INSERT INTO leases (key, owner, value, expires_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, value = excluded.value,
+                                           expires_at = excluded.expires_at
+            WHERE leases.expires_at < ?
+            ''', (key, self.owner, value, now + self.ttl, now))
+            row = conn.execute('SELECT owner, value FROM leases WHERE key = ?', (key,)).fetchone()
+            conn.commit()
+
+        return row['owner'] == self.owner, row['value']
+
+    def release(self, key: str):
+        """Give up a lease held by this process"""
+        with self.pool.connection() as conn:
+            conn.execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, self.owner))
+            conn.commit()
+
+class _Call:
+    """A call in flight and the callers waiting for its result"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one piece of work.
+
+    do() runs a function once per key at a time and hands its result to every
+    caller that arrived while it was running. claim()/release() do the same
+    for work that runs in the background, such as search jobs. With a lease
+    table, other worker processes are coalesced too.
+    """
+
+    def __init__(self, leases: Optional[LeaseTable] = None):
+        self.leases = leases
+        self._calls: Dict[str, _Call] = {}
+        self._claims: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'coalesced': 0, 'coalesced_remote': 0}
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """Call fn unless the same key is already in flight; returns the result and whether it was shared.
+
+        When another process holds the key's lease, this waits for it to
+        finish and then calls fn, which by then is served from the page cache
+        that process filled.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['leaders'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            if self.leases:
+                self._wait_for_lease(key)
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            if self.leases:
+                self.leases.release(key)
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _wait_for_lease(self, key: str):
+        """Block until this process holds the lease for key, or the holder's lease expires"""
+        waited = False
+
+        while True:
+            acquired, _ = self.leases.acquire(key)
+            if acquired:
+                return
+
+            if not waited:
+                waited = True
+                with self._lock:
+                    self._stats['coalesced_remote'] += 1
+            time.sleep(LEASE_POLL_INTERVAL)
+
+    def claim(self, key: str, value: str) -> Optional[str]:
+        """Register value (e.g. a job id) as the work in flight for key.
+
+        Returns None if the caller should go ahead, or the value registered
+        by whoever, in this process or another, is already doing the work.
+        """
+        with self._lock:
+            if key in self._claims:
+                self._stats['coalesced'] += 1
+                return self._claims[key]
+
+            if self.leases:
+                acquired, holder = self.leases.acquire(key, value)
+                if not acquired:
+                    self._stats['coalesced_remote'] += 1
+                    return holder
+
+            self._claims[key] = value
+            self._stats['leaders'] += 1
+            return None
+
+    def release(self, key: str):
+        """Mark claimed work as finished"""
+        with self._lock:
+            self._claims.pop(key, None)
+
+        if self.leases:
+            self.leases.release(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report how many callers did the work and how many shared someone else's"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls) + len(self._claims)
+        stats['shared'] = self.leases is not None
+        return stats
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group"""
+    global _single_flight
+
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight(LeaseTable() if SINGLE_FLIGHT_SHARED else None)
+        return _single_flight
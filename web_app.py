@@ -1,17 +1,31 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import os
 import json
-import tempfile
-from datetime import datetime
-import csv
+import time
+import hashlib
+from typing import Dict, Any, Optional, Tuple
+from dataclasses import asdict
+from datetime import datetime, timedelta
 
-from scrapers.zillow_scraper import ZillowScraper
-from scrapers.realtor_scraper import RealtorScraper
-from scrapers.redfin_scraper import RedfinScraper
+from scrapers.job_queue import get_job_queue, SearchParams, QueueFullError, SEARCH_CACHE_MODES
+from scrapers.orchestrator import select_sources
+from scrapers.driver_pool import get_driver_pool, get_browser_capability
+from scrapers.http_cache import get_http_cache
+from scrapers.rate_limiter import get_rate_limiter
+from scrapers.http_client import get_fetch_loop
 from database.db_handler import DatabaseHandler
-from models.property import Property
-from config.settings import DEFAULT_LOCATION, DEFAULT_MIN_PRICE, DEFAULT_MAX_PRICE
+from database.result_store import get_result_store
+from utils.dedupe import merge_properties
+from utils.exporters import EXPORT_FORMATS, stream_export, export_filename
+from utils.columnar import COLUMNAR_FORMATS, columnar_available, stream_columnar
+from utils.property_filter import PropertyFilter, SORT_KEYS, select
+from config.settings import (
+    DEFAULT_LOCATION, DEFAULT_MIN_PRICE, DEFAULT_MAX_PRICE, SELENIUM_PREWARM, HTTP_CACHE_ENABLED,
+    JOB_EVENT_HEARTBEAT, SEARCH_CACHE_MODE, SEARCH_CACHE_MAX_AGE
+)
 from utils.helpers import format_price, format_address, validate_price_range
+from utils.geo import check_bounds, radius_bounds
+from utils.single_flight import get_single_flight
 
 app = Flask(__name__)
 app.config['TEMPLATES_AUTO_RELOAD'] = True
@@ -19,26 +33,86 @@ app.config['TEMPLATES_AUTO_RELOAD'] = True
 # Create templates directory if it doesn't exist
 os.makedirs(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates'), exist_ok=True)
 
-# Global variable to store the latest search results
-current_properties = []
+# Decide between Selenium and requests-only mode while the worker boots,
+# pre-warming browsers for the first searches if Chrome is available
+get_browser_capability().probe_in_background(warm=SELENIUM_PREWARM)
+
+# Largest page the properties API will return
+MAX_PAGE_SIZE = 500
+
+def _optional_float(name: str):
+    """Read an optional float query parameter"""
+    value = request.args.get(name)
+    return float(value) if value not in (None, '') else None
+
+def _body_number(data: Dict[str, Any], name: str, convert=float, minimum: float = 0, default=None):
+    """Read an optional number from a request body, raising ValueError if it is malformed or below minimum"""
+    value = data.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        number = convert(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number: {value!r}")
+    if number < minimum:
+        raise ValueError(f"{name} must be at least {minimum}: {value!r}")
+    return number
+
+def _geo_filters() -> Dict[str, Any]:
+    """Read the lat, lon and radius (miles) or bbox=south,west,north,east query parameters"""
+    filters = {}
+    
+    point = [_optional_float(name) for name in ('lat', 'lon', 'radius')]
+    if any(value is not None for value in point):
+        if any(value is None for value in point):
+            raise ValueError('lat, lon and radius must be given together')
+        latitude, longitude, radius = point
+        radius_bounds(latitude, longitude, radius)
+        filters.update(near=(latitude, longitude), radius_miles=radius)
+    
+    if request.args.get('bbox'):
+        bounds = tuple(float(value) for value in request.args['bbox'].split(','))
+        if len(bounds) != 4:
+            raise ValueError('bbox must be south,west,north,east')
+        check_bounds(bounds)
+        filters['bounds'] = bounds
+    
+    return filters
+
+def _default_sort(keywords: Optional[str], geo_filters: Dict[str, Any]) -> str:
+    """Sort database searches by relevance, then distance, then price unless asked otherwise"""
+    if keywords:
+        return 'rank'
+    return 'distance' if 'near' in geo_filters else 'price'
 
 @app.route('/')
 def index():
     """Render the home page"""
     return render_template('index.html')
 
+@app.route('/status')
+def status():
+    """Report the scraping mode and shared resource usage"""
+    return jsonify({
+        'success': True,
+        'browser': get_browser_capability().status(),
+        'driver_pool': get_driver_pool().stats(),
+        'http_cache': get_http_cache().stats() if HTTP_CACHE_ENABLED else None,
+        'rate_limits': get_rate_limiter().stats(),
+        'fetch_loop': get_fetch_loop().stats(),
+        'jobs': get_job_queue().stats(),
+        'single_flight': get_single_flight().stats(),
+        'result_store': get_result_store().stats()
+    })
+
 @app.route('/search', methods=['POST'])
 def search():
-    """Handle property search requests"""
-    global current_properties
-    
+    """Queue a property search and return its job id without waiting for the scrape"""
     # Get search parameters
     data = request.json
     location = data.get('location', DEFAULT_LOCATION)
     min_price = float(data.get('minPrice', DEFAULT_MIN_PRICE))
     max_price = float(data.get('maxPrice', DEFAULT_MAX_PRICE))
-    min_beds = float(data.get('bedrooms', 0)) if data.get('bedrooms') else None
-    min_baths = float(data.get('bathrooms', 0)) if data.get('bathrooms') else None
     sources = data.get('sources', ['zillow', 'realtor', 'redfin'])
     
     # Validate price range
@@ -46,139 +120,356 @@ def search():
     min_price = price_range['min_price']
     max_price = price_range['max_price']
     
-    # Initialize scrapers and database
-    properties = []
-    db = DatabaseHandler()
+    # Reject malformed limits and result filters before scraping anything
+    try:
+        max_pages = _body_number(data, 'maxPages', int, minimum=1)
+        max_results = _body_number(data, 'maxResults', int, minimum=1)
+        max_age = _body_number(data, 'maxAge', default=SEARCH_CACHE_MAX_AGE)
+        _result_options(data)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    # Decide which sources can be answered from stored listings
+    cache_mode = data.get('cache', SEARCH_CACHE_MODE)
+    if cache_mode not in SEARCH_CACHE_MODES:
+        return jsonify({
+            'success': False,
+            'error': f'Unsupported cache mode: {cache_mode}'
+        }), 400
+    
+    selected = select_sources(sources)
+    cached_sources = []
+    if cache_mode == 'only':
+        # Never scrape; serve whatever is stored, however old
+        cached_sources, max_age = selected, None
+    elif cache_mode == 'auto':
+        scraped_since = datetime.now() - timedelta(seconds=max_age)
+        last_scraped = DatabaseHandler().last_scraped(location, min_price, max_price, selected)
+        cached_sources = [s for s in selected if s in last_scraped and last_scraped[s] >= scraped_since]
+    
+    job_queue = get_job_queue()
+    params = SearchParams(
+        location=location,
+        min_price=min_price,
+        max_price=max_price,
+        sources=[s for s in selected if s not in cached_sources],
+        max_pages=max_pages,
+        max_results=max_results,
+        cached_sources=cached_sources,
+        cache_max_age=max_age
+    )
     
     try:
-        # Scrape from each selected source
-        if 'zillow' in sources:
-            try:
-                zillow = ZillowScraper()
-                zillow_properties = zillow.search(location, min_price, max_price)
-                
-                # Save to database
-                for prop in zillow_properties:
-                    db.insert_property(prop)
-                    
-                properties.extend(zillow_properties)
-                zillow.close()
-                
-            except Exception as e:
-                print(f"Error scraping Zillow: {e}")
-        
-        if 'realtor' in sources:
-            try:
-                realtor = RealtorScraper()
-                realtor_properties = realtor.search(location, min_price, max_price)
-                
-                # Save to database
-                for prop in realtor_properties:
-                    db.insert_property(prop)
-                    
-                properties.extend(realtor_properties)
-                
-            except Exception as e:
-                print(f"Error scraping Realtor.com: {e}")
-        
-        if 'redfin' in sources:
-            try:
-                redfin = RedfinScraper()
-                redfin_properties = redfin.search(location, min_price, max_price)
-                
-                # Save to database
-                for prop in redfin_properties:
-                    db.insert_property(prop)
-                    
-                properties.extend(redfin_properties)
-                redfin.close()
-                
-            except Exception as e:
-                print(f"Error scraping Redfin: {e}")
-        
-        # Filter properties
-        filtered_properties = properties
+        # A job we were coalesced onto may be gone by the time we read it, so submit once more
+        for _ in range(2):
+            job_id, coalesced = job_queue.submit(params)
+            job = job_queue.store.get(job_id)
+            if job is not None:
+                break
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job: {job_id}'
+        }), 404
+    
+    if job['status'] in ('done', 'failed'):
+        # Answered entirely from the database, so reply with the results right away
+        return jsonify({**_job_response(job, data), 'coalesced': coalesced})
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'coalesced': coalesced,
+        'status': job['status'],
+        'cached_sources': cached_sources,
+        'status_url': f'/jobs/{job_id}',
+        'events_url': f'/jobs/{job_id}/events'
+    }), 202
+
+def _result_options(filters: Dict[str, Any]) -> Tuple[PropertyFilter, Optional[str], bool, Optional[int], bool]:
+    """Read filter, ranking and dedupe options from a search body or query string.
+    
+    Returns (criteria, sort, descending, limit, dedupe); raises ValueError
+    for malformed values.
+    """
+    def number(name, convert=float):
+        value = filters.get(name)
+        return convert(value) if value not in (None, '') else None
+    
+    def strings(name):
+        value = filters.get(name)
+        if value in (None, '', []):
+            return None
+        return [v.strip() for v in value.split(',')] if isinstance(value, str) else list(value)
+    
+    criteria = PropertyFilter(
+        min_beds=number('bedrooms'),
+        max_beds=number('maxBedrooms'),
+        min_baths=number('bathrooms'),
+        max_baths=number('maxBathrooms'),
+        min_sqft=number('minSqft'),
+        max_sqft=number('maxSqft'),
+        min_price_per_sqft=number('minPricePerSqft'),
+        max_price_per_sqft=number('maxPricePerSqft'),
+        min_year_built=number('minYearBuilt', int),
+        max_year_built=number('maxYearBuilt', int),
+        property_types=strings('propertyTypes'),
+        zip_codes=strings('zipCodes')
+    )
+    
+    sort = filters.get('sort') or None
+    if sort is not None and sort not in SORT_KEYS:
+        raise ValueError(f"Unsupported sort key: {sort}")
+    descending = str(filters.get('order', 'asc')).lower() == 'desc'
+    limit = number('limit', int)
+    dedupe = str(filters.get('dedupe', '')).lower() in ('1', 'true', 'yes')
+    
+    return criteria, sort, descending, limit, dedupe
+
+def _job_response(job: Dict[str, Any], filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the poll response for a job, filtered and ranked by options from filters or the query string.
+    
+    With dedupe set, listings of the same home from different sources are
+    merged into one entry that links to each of them. Once the job has
+    finished, the filtered results are kept for export under result_id.
+    """
+    filters = filters if filters is not None else request.args
+    criteria, sort, descending, limit, dedupe = _result_options(filters)
+    
+    batch = get_job_queue().store.get_batch(job['id'])
+    
+    # Filter and rank in one pass over the columns; merging may still shrink a ranked list, so cut it afterwards
+    indices = select(batch, criteria, sort, descending, None if dedupe else limit)
+    properties = [batch[i] for i in indices]
+    
+    listing_count = len(properties)
+    if dedupe:
+        merged = merge_properties(properties)[:limit]
+        position = {id(row): i for row, i in zip(properties, indices)}
+        indices = [position[id(home.primary)] for home in merged]
+        properties = [home.primary for home in merged]
+    
+    finished = job['status'] in ('done', 'failed')
+    result_id = None
+    if finished:
+        # Keep the results for export; the same job and filters always map to the same result set
+        options = json.dumps([job['id'], asdict(criteria), sort, descending, limit, dedupe], sort_keys=True)
+        result_id = hashlib.md5(options.encode()).hexdigest()
+        result_store = get_result_store()
+        if not result_store.exists(result_id):
+            result_store.put(result_id, batch.take(indices))
+    
+    return {
+        'success': True,
+        'job_id': job['id'],
+        'status': job['status'],
+        'finished': finished,
+        'result_id': result_id,
+        'error': job['error'],
+        'count': len(properties),
+        'listing_count': listing_count,
+        'properties': [home.to_dict() for home in merged] if dedupe else [p.to_dict() for p in properties],
+        'partial': not finished or any(r['status'] != 'ok' for r in job['sources'].values()),
+        'elapsed': round((job['finished_at'] or time.time()) - job['created_at'], 3),
+        'sources': job['sources'],
+        'served_from': {
+            'cache': [s for s, r in job['sources'].items() if r['served_from'] == 'cache'],
+            'live': [s for s, r in job['sources'].items() if r['served_from'] == 'live'],
+        }
+    }
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report a search job's progress and the properties found so far"""
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job: {job_id}'
+        }), 404
+    
+    try:
+        return jsonify(_job_response(job))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a search job's progress as server-sent events"""
+    job_queue = get_job_queue()
+    if job_queue.store.get(job_id) is None:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job: {job_id}'
+        }), 404
+    
+    # The final event applies the result filters, so check them before the stream starts
+    try:
+        _result_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    def generate():
+        version = -1
+        sent_sources = set()
         
-        if min_beds is not None:
-            filtered_properties = [p for p in filtered_properties if p.bedrooms >= min_beds]
+        while True:
+            job = job_queue.store.get(job_id)
+            if job is None:
+                # Pruned or deleted while the stream was open
+                yield f"event: error\ndata: {json.dumps({'success': False, 'error': f'Unknown job: {job_id}'})}\n\n"
+                return
             
-        if min_baths is not None:
-            filtered_properties = [p for p in filtered_properties if p.bathrooms >= min_baths]
-        
-        # Store results for export
-        current_properties = filtered_properties
-        
-        # Convert to dictionaries for JSON response
-        property_dicts = [prop.to_dict() for prop in filtered_properties]
-        
-        return jsonify({
-            'success': True,
-            'count': len(property_dicts),
-            'properties': property_dicts
-        })
+            # One event per source as it finishes, with just that source's properties
+            for source, summary in job['sources'].items():
+                if source not in sent_sources:
+                    sent_sources.add(source)
+                    payload = {'source': source, **summary,
+                               'properties': job_queue.store.get_properties(job_id, [source])}
+                    yield f"event: source\ndata: {json.dumps(payload)}\n\n"
+            
+            if job['status'] in ('done', 'failed'):
+                yield f"event: done\ndata: {json.dumps({k: v for k, v in _job_response(job).items() if k != 'properties'})}\n\n"
+                return
+            
+            new_version = job_queue.wait_for_change(job_id, version, JOB_EVENT_HEARTBEAT)
+            if new_version == version:
+                # Keep proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            version = new_version
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/properties')
+def list_properties():
+    """Stream a page of stored properties using keyset pagination.
+    
+    q searches descriptions and features, e.g. q=garage or
+    q="finished basement", and sorts by relevance unless sort is given.
+    lat, lon and radius find listings within radius miles of a point,
+    nearest first, and bbox=south,west,north,east those in a map view.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_PAGE_SIZE)
+        keywords = request.args.get('q') or None
+        geo_filters = _geo_filters()
         
-    except Exception as e:
+        db = DatabaseHandler()
+        properties, next_cursor = db.get_properties_page(
+            location=request.args.get('location') or None,
+            min_price=_optional_float('min_price'),
+            max_price=_optional_float('max_price'),
+            min_beds=_optional_float('min_beds'),
+            min_baths=_optional_float('min_baths'),
+            sort=request.args.get('sort') or _default_sort(keywords, geo_filters),
+            descending=request.args.get('order', 'asc').lower() == 'desc',
+            limit=limit,
+            cursor=request.args.get('cursor') or None,
+            keywords=keywords,
+            **geo_filters
+        )
+    except ValueError as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        })
+        }), 400
+    
+    def generate():
+        # Encode one row at a time so the first bytes go out immediately
+        yield '{"success": true, "properties": ['
+        for i, prop in enumerate(properties):
+            yield (',' if i else '') + json.dumps(prop)
+        yield f'], "count": {len(properties)}, "next_cursor": {json.dumps(next_cursor)}}}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/export/<format_type>')
 def export(format_type):
-    """Export properties to CSV or JSON"""
-    global current_properties
+    """Stream properties as CSV, JSON or NDJSON (optionally gzipped), Parquet or Arrow.
     
-    if not current_properties:
+    result_id selects the results of a finished search; with scope=db,
+    every stored property matching the location/price/bedroom/bathroom
+    filters, the q keyword search and the lat/lon/radius or bbox area is
+    streamed from the database one keyset page at a time instead.
+    """
+    if format_type not in EXPORT_FORMATS and format_type not in COLUMNAR_FORMATS:
         return jsonify({
             'success': False,
-            'error': 'No properties to export. Perform a search first.'
-        })
+            'error': f'Unsupported export format: {format_type}'
+        }), 400
     
-    try:
-        if format_type == 'csv':
-            # Create a temp file
-            fd, path = tempfile.mkstemp(suffix='.csv')
-            
-            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as csvfile:
-                # Get all possible fields
-                fieldnames = [
-                    'id', 'source', 'url', 'address', 'city', 'state', 'zip_code',
-                    'price', 'bedrooms', 'bathrooms', 'square_feet', 'lot_size',
-                    'year_built', 'property_type', 'description', 'features',
-                    'image_urls', 'date_listed', 'date_scraped'
-                ]
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for prop in current_properties:
-                    writer.writerow(prop.to_dict())
-            
-            return send_file(path, as_attachment=True, download_name=f'properties_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
-            
-        elif format_type == 'json':
-            # Create a temp file
-            fd, path = tempfile.mkstemp(suffix='.json')
-            
-            with os.fdopen(fd, 'w', encoding='utf-8') as jsonfile:
-                # Convert all properties to dictionaries
-                property_dicts = [prop.to_dict() for prop in current_properties]
-                
-                json.dump(property_dicts, jsonfile, indent=2)
-            
-            return send_file(path, as_attachment=True, download_name=f'properties_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-            
-        else:
+    if format_type in COLUMNAR_FORMATS and not columnar_available():
+        return jsonify({
+            'success': False,
+            'error': 'Parquet and Arrow export require pyarrow'
+        }), 501
+    
+    # Columnar files are compressed internally
+    compress = format_type in EXPORT_FORMATS and request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    
+    if request.args.get('scope') == 'db':
+        try:
+            db = DatabaseHandler()
+            keywords = request.args.get('q') or None
+            geo_filters = _geo_filters()
+            # iter_properties reads the first page now, so bad filters fail before the response starts
+            items = db.iter_properties(
+                location=request.args.get('location') or None,
+                min_price=_optional_float('min_price'),
+                max_price=_optional_float('max_price'),
+                min_beds=_optional_float('min_beds'),
+                min_baths=_optional_float('min_baths'),
+                sort=request.args.get('sort') or _default_sort(keywords, geo_filters),
+                descending=request.args.get('order', 'asc').lower() == 'desc',
+                keywords=keywords,
+                **geo_filters
+            )
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'error': f'Unsupported export format: {format_type}'
-            })
-            
-    except Exception as e:
+                'error': str(e)
+            }), 400
+    elif request.args.get('result_id'):
+        items = get_result_store().iter(request.args['result_id'])
+        if items is None:
+            return jsonify({
+                'success': False,
+                'error': 'These results have expired. Run the search again to export them.'
+            }), 404
+    else:
         return jsonify({
             'success': False,
-            'error': f'Export error: {str(e)}'
-        })
+            'error': 'No properties to export. Perform a search first.'
+        }), 400
+    
+    base = f'properties_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    if format_type in COLUMNAR_FORMATS:
+        mimetype, extension = COLUMNAR_FORMATS[format_type]
+        filename = f'{base}.{extension}'
+        body = stream_columnar(items, format_type)
+    else:
+        mimetype = 'application/gzip' if compress else EXPORT_FORMATS[format_type][0]
+        filename = export_filename(base, format_type, compress)
+        body = stream_export(items, format_type, compress)
+    
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)